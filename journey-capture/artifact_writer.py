@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Artifact Writer - Rewrite generated files only when their content changes
+Content is compared by hash, ignoring volatile lines, and replaced atomically
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - writes stay atomic, just unlocked
+    fcntl = None
+
+
+def atomic_write(path: Path, text: str, durable: bool = True):
+    """Replace path with text so readers only ever see the old or new file
+
+    ``durable`` fsyncs before the rename; regenerable artifacts can skip it.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an advisory lock on path's sidecar lock file"""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(f".{path.name}.lock")
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def stable_text(text: str, volatile: Iterable[str] = ()) -> str:
+    """Text without lines starting with any volatile prefix, for change detection"""
+    volatile = tuple(volatile)
+    if not volatile:
+        return text
+    return '\n'.join(
+        line for line in text.split('\n')
+        if not line.lstrip().startswith(volatile)
+    )
+
+
+def content_hash(text: str) -> str:
+    """blake2b digest used to skip unchanged writes"""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+
+
+def write_artifact(path: Path, content: str, volatile: Iterable[str] = (),
+                   durable: bool = False) -> bool:
+    """Write content unless the file already holds it; returns True if written
+
+    Lines starting with a ``volatile`` prefix (timestamps and the like) are
+    ignored when comparing, so they alone never trigger a rewrite.
+    """
+    path = Path(path)
+    volatile = tuple(volatile)
+    existing = _read(path)
+    if existing is not None and (
+            content_hash(stable_text(existing, volatile)) == content_hash(stable_text(content, volatile))):
+        return False
+    atomic_write(path, content, durable=durable)
+    return True
+
+
+def _without_keys(data: Any, keys: Iterable[str]) -> Any:
+    """data with every occurrence of keys removed, however deeply nested"""
+    if isinstance(data, dict):
+        return {k: _without_keys(v, keys) for k, v in data.items() if k not in keys}
+    if isinstance(data, list):
+        return [_without_keys(v, keys) for v in data]
+    return data
+
+
+def write_json_artifact(path: Path, data: Any, volatile_keys: Iterable[str] = (),
+                        indent: Optional[int] = None, durable: bool = False) -> bool:
+    """Write JSON unless the file already holds the same data; returns True if written
+
+    Compact separators are used unless an ``indent`` is asked for.
+    ``volatile_keys`` are ignored when comparing, at any depth - a
+    timestamp nested in an embedded summary changes on every render too.
+    """
+    path = Path(path)
+    volatile_keys = frozenset(volatile_keys)
+    separators = (',', ':') if indent is None else (',', ': ')
+    content = json.dumps(data, indent=indent, separators=separators)
+
+    existing = _read(path)
+    if existing is not None:
+        try:
+            current = json.loads(existing)
+        except ValueError:
+            current = None
+        if current is not None:
+            canonical = lambda value: json.dumps(_without_keys(value, volatile_keys),
+                                                 sort_keys=True, separators=(',', ':'))
+            if content_hash(canonical(current)) == content_hash(canonical(data)):
+                return False
+
+    atomic_write(path, content, durable=durable)
+    return True
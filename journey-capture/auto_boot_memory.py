@@ -4,10 +4,23 @@ Automatic Memory Boot Protocol
 Ensures organizational memory loads even if initialization fails
 """
 
+import atexit
+import itertools
 import os
+import select
+import signal
 import sys
-import subprocess
+import threading
+import time
 from pathlib import Path
+from typing import Optional
+
+BOOT_TIMEOUT = 30  # seconds
+
+JOURNEY_CAPTURE_PATH = Path.home() / "vibe-coding-system" / "journey-capture"
+
+# An in-process boot that overran its timeout - it cannot be stopped, only waited out
+_abandoned_boot: Optional[threading.Thread] = None
 
 def auto_boot_memory():
     """Automatic memory initialization with fallback handling"""
@@ -16,7 +29,7 @@ def auto_boot_memory():
     print("="*60)
     
     # Change to correct directory
-    journey_capture_path = Path.home() / "vibe-coding-system" / "journey-capture"
+    journey_capture_path = JOURNEY_CAPTURE_PATH
     
     if not journey_capture_path.exists():
         print("⚠️  Journey capture directory not found")
@@ -32,33 +45,214 @@ def auto_boot_memory():
         print("   The collective soul will begin forming from this session")
         return False
     
-    # Try to run the full initialization
+    # Run the full initialization in this interpreter
+    return boot_in_process(journey_capture_path)
+
+def _import_session_init(journey_capture_path: Path):
+    """Import claude_session_init from the journey-capture directory"""
+    if str(journey_capture_path) not in sys.path:
+        sys.path.insert(0, str(journey_capture_path))
+    import claude_session_init
+    return claude_session_init
+
+def boot_in_process(journey_capture_path: Path = JOURNEY_CAPTURE_PATH,
+                    timeout: float = BOOT_TIMEOUT) -> bool:
+    """Run the session boot in this interpreter, streaming its output as it goes
+    
+    A boot that overruns ``timeout`` keeps running on its daemon thread; no
+    second boot starts in this interpreter until it has finished.
+    """
+    global _abandoned_boot
+    if _abandoned_boot is not None:
+        if _abandoned_boot.is_alive():
+            print("⚠️  A timed-out memory boot is still running - not starting another")
+            return False
+        _abandoned_boot = None
+    
     try:
-        result = subprocess.run(
-            [sys.executable, "claude_session_init.py"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            print(result.stdout)
-            return True
-        else:
-            print("⚠️  Memory initialization had warnings:")
-            print(result.stderr)
-            # Continue anyway - partial memory is better than none
-            return True
-            
-    except subprocess.TimeoutExpired:
-        print("⚠️  Memory loading timed out (>30s)")
-        print("   Proceeding with partial context")
-        return False
-        
+        session_init = _import_session_init(journey_capture_path)
     except Exception as e:
         print(f"⚠️  Memory system error: {e}")
         print("   Proceeding without memory context")
         return False
+    
+    outcome = {}
+    
+    def run():
+        try:
+            outcome['context'] = session_init.run_session_boot()
+        except Exception as e:
+            outcome['error'] = e
+    
+    # A daemon thread lets a hung boot be abandoned without blocking exit
+    worker = threading.Thread(target=run, name="session-boot", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    
+    if worker.is_alive():
+        _abandoned_boot = worker
+        print(f"⚠️  Memory loading timed out (>{timeout:.0f}s)")
+        print("   The boot is still running in the background and may write memory files later")
+        print("   Proceeding with partial context")
+        return False
+    
+    if 'error' in outcome:
+        print("⚠️  Memory initialization had warnings:")
+        print(f"   {outcome['error']}")
+    # Continue anyway - partial memory is better than none
+    return True
+
+class WarmBootWorker:
+    """Pre-forked process that keeps the memory system imported between boots
+    
+    start() forks a worker that imports claude_session_init once. Each
+    boot() asks it to fork a fresh child from that warm state, so repeated
+    boots skip interpreter start-up and imports but never share state.
+    Output streams straight to the caller's stdout. Unix only.
+    
+    Requests and replies carry an id, so a reply that arrives after its
+    boot was given up on is discarded rather than read as the next one's.
+    """
+    
+    def __init__(self, journey_capture_path: Path = JOURNEY_CAPTURE_PATH):
+        self.journey_capture_path = journey_capture_path
+        self.pid: Optional[int] = None
+        self._commands = None
+        self._results: Optional[int] = None
+        self._received = b''
+        self._request_ids = itertools.count(1)
+    
+    def start(self) -> 'WarmBootWorker':
+        """Fork the worker and wait until its imports are done"""
+        if self.pid is not None:
+            return self
+        
+        command_read, command_write = os.pipe()
+        result_read, result_write = os.pipe()
+        sys.stdout.flush()
+        
+        pid = os.fork()
+        if pid == 0:
+            os.close(command_write)
+            os.close(result_read)
+            self._serve(os.fdopen(command_read, 'r'), os.fdopen(result_write, 'w'))
+            os._exit(0)
+        
+        os.close(command_read)
+        os.close(result_write)
+        self.pid = pid
+        self._commands = os.fdopen(command_write, 'w')
+        self._results = result_read
+        atexit.register(self.close)
+        
+        if self._read_reply(None) != 'ready':
+            self.close()
+            raise RuntimeError("Warm boot worker failed to start")
+        return self
+    
+    def boot(self, timeout: float = BOOT_TIMEOUT) -> bool:
+        """Run one session boot in a child of the warm worker"""
+        if self.pid is None:
+            self.start()
+        
+        request_id = next(self._request_ids)
+        sys.stdout.flush()
+        self._commands.write(f"boot {request_id} {timeout}\n")
+        self._commands.flush()
+        
+        # Skip replies to earlier boots that were given up on
+        deadline = time.monotonic() + timeout + 5
+        while True:
+            reply = self._read_reply(deadline)
+            if reply is None:
+                status = 'timeout'
+                break
+            reply_id, _, status = reply.partition(' ')
+            if reply_id == str(request_id):
+                break
+        
+        if status == 'timeout':
+            print(f"⚠️  Memory loading timed out (>{timeout:.0f}s)")
+            print("   Proceeding with partial context")
+            return False
+        if status != 'ok':
+            print("⚠️  Memory initialization had warnings")
+        return status in ('ok', 'warnings')
+    
+    def _read_reply(self, deadline: Optional[float]) -> Optional[str]:
+        """Next line from the worker, or None at the deadline or if it has exited"""
+        while b'\n' not in self._received:
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._results], [], [], wait)
+            if not ready:
+                return None
+            chunk = os.read(self._results, 4096)
+            if not chunk:
+                return None
+            self._received += chunk
+        line, _, self._received = self._received.partition(b'\n')
+        return line.decode().strip()
+    
+    def close(self):
+        """Stop the worker process"""
+        if self.pid is None:
+            return
+        try:
+            self._commands.close()
+            os.close(self._results)
+            os.waitpid(self.pid, 0)
+        except (OSError, ChildProcessError):
+            pass
+        self.pid = None
+        self._received = b''
+    
+    def _serve(self, commands, results):
+        """Worker loop - import once, then fork a child per boot request"""
+        try:
+            os.chdir(self.journey_capture_path)
+            _import_session_init(self.journey_capture_path)
+            results.write("ready\n")
+        except Exception as e:
+            results.write(f"failed {e}\n")
+        results.flush()
+        
+        for line in commands:
+            _, request_id, timeout = line.split()
+            results.write(f"{request_id} {self._boot_child(float(timeout))}\n")
+            results.flush()
+    
+    @staticmethod
+    def _boot_child(timeout: float) -> str:
+        """Fork a child from the warm state, run the boot, report how it went"""
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                import claude_session_init
+                code = 0 if claude_session_init.run_session_boot() else 2
+            except Exception as e:
+                print(f"⚠️  Memory system error: {e}")
+            finally:
+                # os._exit skips atexit - render the pending metrics update first
+                try:
+                    from internal_memory import flush_metrics_renderers
+                    flush_metrics_renderers()
+                except Exception as e:
+                    print(f"⚠️  Memory metrics not written: {e}")
+                sys.stdout.flush()
+                os._exit(code)
+        
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return 'ok' if os.waitstatus_to_exitcode(status) == 0 else 'warnings'
+            time.sleep(0.01)
+        
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        return 'timeout'
 
 def quick_memory_summary():
     """Provide quick summary even if full init fails"""
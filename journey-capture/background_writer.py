@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Background Writer - Buffered, batched persistence off the hot path
+Callers enqueue records; a daemon thread flushes them in batches
+"""
+
+import atexit
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BackgroundBatchWriter:
+    """In-process write queue drained by a single background thread
+
+    Records submitted from any thread are buffered and handed to
+    ``flush_fn`` as a list, either once ``batch_size`` records are waiting
+    or after ``flush_interval`` seconds. ``sample_rate`` drops a fraction of
+    records up front, and ``overflow`` chooses the backpressure policy when
+    the queue is full: ``'drop'`` discards the new record, ``'block'`` waits
+    up to ``block_timeout`` seconds for space before dropping it. At exit the
+    queue is drained for up to ``close_timeout`` seconds.
+    """
+
+    def __init__(self,
+                 flush_fn: Callable[[List[Any]], None],
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 max_queue: int = 1000,
+                 sample_rate: float = 1.0,
+                 overflow: str = 'drop',
+                 block_timeout: float = 0.5,
+                 close_timeout: Optional[float] = 5.0,
+                 name: str = 'background-writer'):
+        if overflow not in ('drop', 'block'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.close_timeout = close_timeout
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {
+            'submitted': 0,
+            'sampled_out': 0,
+            'dropped': 0,
+            'written': 0,
+            'failed': 0,
+            'batches': 0
+        }
+
+        # Never lose buffered records on a normal interpreter exit
+        atexit.register(lambda: self.close(self.close_timeout))
+
+    def submit(self, record: Any) -> bool:
+        """Enqueue a record without waiting on I/O - returns False if not queued"""
+        if self._closed:
+            return False
+
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._count('sampled_out')
+            return False
+
+        self._ensure_started()
+
+        # Checked and queued under the lock close() takes, so nothing can
+        # land behind its sentinel
+        with self._lock:
+            if self._closed:
+                return False
+            try:
+                if self.overflow == 'block':
+                    self._queue.put(record, timeout=self.block_timeout)
+                else:
+                    self._queue.put_nowait(record)
+            except queue.Full:
+                self._count('dropped')
+                return False
+
+        self._count('submitted')
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been written"""
+        if self._thread is None:
+            return True
+        if self._closed:
+            # close() already queued the final flush - just wait for it
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        if not self._thread.is_alive():
+            return self._queue.empty()
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush remaining records and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"  ⚠ {self.name} still writing after {timeout}s - "
+                      f"{self.pending()} queued records may be lost")
+
+    def pending(self) -> int:
+        """Approximate number of records waiting to be written"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for submitted, dropped and written records"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, pending=self.pending())
+
+    def _count(self, key: str, n: int = 1):
+        """Bump a counter - callers and the writer thread update them concurrently"""
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _ensure_started(self):
+        """Start the daemon thread lazily on first submit"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Drain the queue, flushing on size, interval, flush() or close()"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            waiter = None
+            if item is None:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiter = item
+            elif item is not False:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._write(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if waiter is not None:
+                waiter.set()
+
+    def _write(self, batch: List[Any]):
+        """Hand one batch to flush_fn, isolating failures from callers"""
+        try:
+            self.flush_fn(batch)
+            self._count('written', len(batch))
+        except Exception as e:
+            self._count('failed', len(batch))
+            print(f"  ⚠ {self.name} failed to write {len(batch)} records: {e}")
+        self._count('batches')
+
+
+class DebouncedCall:
+    """Coalesce bursts of requests into one deferred call
+
+    ``schedule()`` arms a timer on the first request; any further requests
+    inside the window are absorbed. Pending work always runs at interpreter
+    exit, and a delay of zero runs the call immediately.
+    """
+
+    def __init__(self, fn: Callable[[], None], delay: float):
+        self.fn = fn
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def schedule(self):
+        """Request a call - runs once the current window closes"""
+        if self.delay <= 0:
+            self.fn()
+            return
+
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Run a pending call now instead of waiting for the timer"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is None:
+            return
+
+        timer.cancel()
+        try:
+            self.fn()
+        except Exception as e:
+            print(f"  ⚠ Deferred update failed: {e}")
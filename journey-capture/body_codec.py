@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Body Codec - Dictionary compression for journey query/response/context text
+zstd with a trained dictionary when zstandard is installed, zlib with a preset dictionary otherwise
+"""
+
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = 'zstd' if zstandard is not None else 'zlib'
+
+# zlib can only reference the last 32KB of a preset dictionary
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 64 * 1024
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+
+def _zlib_dictionary(samples: List[str]) -> bytes:
+    """Recurring phrases from the samples, most common last where zlib finds them cheapest"""
+    phrases = Counter()
+    for sample in samples:
+        for line in sample.splitlines():
+            for phrase in line.split('. '):
+                if len(phrase) >= 8:
+                    phrases[phrase] += 1
+
+    dictionary = b"".join(
+        phrase.encode() + b"\n"
+        for phrase, count in sorted(phrases.items(), key=lambda item: item[1])
+        if count >= 2
+    )
+    if not dictionary:
+        dictionary = "\n".join(samples).encode()
+    return dictionary[-ZLIB_DICT_SIZE:]
+
+
+def train_dictionary(samples: Iterable[str], codec: str = DEFAULT_CODEC) -> bytes:
+    """Build a compression dictionary from representative bodies"""
+    samples = [sample for sample in samples if sample]
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd dictionaries need the zstandard package")
+        try:
+            return zstandard.train_dictionary(
+                ZSTD_DICT_SIZE, [sample.encode() for sample in samples]
+            ).as_bytes()
+        except zstandard.ZstdError:
+            # Too few samples to train on - use their raw content instead
+            return "\n".join(samples).encode()[-ZSTD_DICT_SIZE:]
+    return _zlib_dictionary(samples)
+
+
+class BodyCodec:
+    """Compresses and decompresses text against one stored dictionary"""
+
+    def __init__(self, dictionary_id: Optional[int], codec: str, dictionary: bytes):
+        self.dictionary_id = dictionary_id
+        self.codec = codec
+        self.dictionary = dictionary
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Journey bodies are zstd-compressed - install zstandard to read them")
+            zdict = zstandard.ZstdCompressionDict(dictionary)
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zdict)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=zdict)
+        elif codec != 'zlib':
+            raise ValueError(f"Unknown body codec: {codec}")
+
+    def compress(self, text: str) -> bytes:
+        data = text.encode()
+        if self.codec == 'zstd':
+            return self._compressor.compress(data)
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=self.dictionary) if self.dictionary else zlib.compressobj(ZLIB_LEVEL)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> str:
+        if self.codec == 'zstd':
+            return self._decompressor.decompress(blob).decode()
+        decompressor = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return (decompressor.decompress(blob) + decompressor.flush()).decode()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Boot Profiler - Per-phase timing for session boot
+Appends one JSON record per boot and flags phases slower than the baseline
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+TIMINGS_PATH = Path("BOOT_TIMINGS.jsonl")
+BASELINE_PATH = Path("BOOT_BASELINE.json")
+
+# A phase regresses when it is this much slower than baseline...
+REGRESSION_FACTOR = 1.5
+# ...and the slowdown is big enough to matter
+REGRESSION_MIN_MS = 5.0
+
+BOOT_BUDGET_MS = 30_000
+
+_active: Optional['BootProfiler'] = None
+
+
+class BootProfiler:
+    """Collects nested timing spans from any thread during one boot
+
+    Span names are joined with '/' to their enclosing span on the same
+    thread, e.g. ``load_session_context/graph_build``.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.spans: List[Dict] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = '/'.join(stack + [name])
+        stack.append(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            record = {
+                'name': path,
+                'start_ms': round((start - self._origin) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3),
+                'thread': threading.current_thread().name
+            }
+            if error:
+                record['error'] = error
+            with self._lock:
+                self.spans.append(record)
+
+    def record(self, status: str = 'ok') -> Dict:
+        """Timing record for this boot, spans in start order"""
+        return {
+            'timestamp': self.started_at.isoformat(),
+            'status': status,
+            'total_ms': round((time.perf_counter() - self._origin) * 1000, 3),
+            'spans': sorted(self.spans, key=lambda s: s['start_ms'])
+        }
+
+
+@contextmanager
+def profile_boot() -> Iterator[BootProfiler]:
+    """Make a fresh profiler the target of span() for the enclosed boot"""
+    global _active
+    previous, _active = _active, BootProfiler()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def span(name: str):
+    """Time a block against the active boot profiler - free when none is active"""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span_totals(record: Dict) -> Dict[str, float]:
+    """Milliseconds per span name, summing repeats"""
+    totals: Dict[str, float] = {'total': record['total_ms']}
+    for s in record['spans']:
+        totals[s['name']] = totals.get(s['name'], 0.0) + s['duration_ms']
+    return totals
+
+
+def save_record(record: Dict, path: Path = TIMINGS_PATH):
+    """Append one boot's timing record as a JSON line"""
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+
+def load_records(path: Path = TIMINGS_PATH, last: Optional[int] = None) -> List[Dict]:
+    """Timing records from the log, oldest first"""
+    if not path.exists():
+        return []
+    lines = path.read_text().splitlines()
+    if last:
+        lines = lines[-last:]
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def save_baseline(records: List[Dict], path: Path = BASELINE_PATH) -> Dict[str, float]:
+    """Store the median time per span across records as the new baseline"""
+    samples: Dict[str, List[float]] = {}
+    for record in records:
+        for name, ms in span_totals(record).items():
+            samples.setdefault(name, []).append(ms)
+
+    baseline = {}
+    for name, values in samples.items():
+        values.sort()
+        baseline[name] = round(values[len(values) // 2], 3)
+
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+    return baseline
+
+
+def check_regressions(record: Dict, path: Path = BASELINE_PATH,
+                      factor: float = REGRESSION_FACTOR,
+                      min_ms: float = REGRESSION_MIN_MS) -> List[str]:
+    """Phases of this boot that are markedly slower than the stored baseline"""
+    if not path.exists():
+        return []
+    try:
+        baseline = json.loads(path.read_text())
+    except ValueError:
+        return []
+
+    regressions = []
+    for name, ms in span_totals(record).items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if ms > expected * factor and ms - expected > min_ms:
+            regressions.append(f"{name}: {ms:.1f}ms (baseline {expected:.1f}ms)")
+    return regressions
+
+
+def format_report(record: Dict, top: int = 10) -> str:
+    """Slowest spans of one boot and its share of the boot budget"""
+    lines = [f"⏱️  Boot took {record['total_ms']:.1f}ms "
+             f"({record['total_ms'] / BOOT_BUDGET_MS:.1%} of the {BOOT_BUDGET_MS // 1000}s budget)"]
+    slowest = sorted(record['spans'], key=lambda s: s['duration_ms'], reverse=True)[:top]
+    for s in slowest:
+        lines.append(f"   {s['duration_ms']:>9.1f}ms  {s['name']}")
+    return "\n".join(lines)
+
+
+def finish_boot(profiler: BootProfiler, status: str = 'ok') -> Dict:
+    """Persist this boot's timings and report any regressions"""
+    record = profiler.record(status)
+    try:
+        save_record(record)
+    except OSError as e:
+        print(f"  ⚠ Could not save boot timings: {e}")
+
+    regressions = check_regressions(record)
+    if regressions:
+        print("\n🐢 Boot phases slower than baseline:")
+        for regression in regressions:
+            print(f"   - {regression}")
+    return record
+
+
+if __name__ == "__main__":
+    records = load_records()
+    if not records:
+        print("No boot timings recorded yet")
+        sys.exit(0)
+
+    if '--baseline' in sys.argv:
+        baseline = save_baseline(load_records(last=10))
+        print(f"✓ Baseline saved from the last {min(10, len(records))} boots ({len(baseline)} phases)")
+    else:
+        print(format_report(records[-1]))
+        for regression in check_regressions(records[-1]):
+            print(f"🐢 {regression}")
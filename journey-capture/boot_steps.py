@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Boot Steps - Run session-boot steps as a dependency graph
+Independent steps run concurrently; a failing or hung step only takes its dependents down
+"""
+
+import io
+import queue
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, Iterable, Optional, TextIO
+
+from boot_profiler import span
+
+DEFAULT_STEP_TIMEOUT = 30.0  # seconds
+
+# Terminal states that stop dependents from running
+BLOCKING_STATES = ('failed', 'timeout', 'skipped')
+
+
+class BootStep:
+    """One unit of boot work
+
+    ``fn`` receives the results of completed steps, keyed by step name, and
+    may rely on every step named in ``deps`` having succeeded. Steps named
+    in ``after`` are waited for but not required - their result is there
+    only if they succeeded.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any],
+                 deps: Iterable[str] = (), timeout: float = DEFAULT_STEP_TIMEOUT,
+                 after: Iterable[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.after = tuple(after)
+        self.timeout = timeout
+
+
+class _StepOutput(io.TextIOBase):
+    """stdout that sends each step thread's writes to that step's own buffer
+
+    Writes from any other thread go straight to the real stream.
+    """
+
+    def __init__(self, target: TextIO):
+        self.target = target
+        self._buffers: Dict[int, io.StringIO] = {}
+        self._lock = threading.Lock()
+
+    def capture(self, buffer: io.StringIO):
+        """Send the calling thread's output to buffer until it is released"""
+        with self._lock:
+            self._buffers[threading.get_ident()] = buffer
+
+    def release(self, buffer: io.StringIO):
+        """Write a step's buffered output; anything it prints later passes straight through"""
+        with self._lock:
+            for ident, owned in list(self._buffers.items()):
+                if owned is buffer:
+                    del self._buffers[ident]
+            self.target.write(buffer.getvalue())
+        self.target.flush()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            buffer = self._buffers.get(threading.get_ident())
+            if buffer is not None:
+                return buffer.write(text)
+            return self.target.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+class BootRun:
+    """Outcome of a boot - per-step status, results and errors"""
+
+    def __init__(self):
+        self.status: Dict[str, str] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+
+    def ok(self, name: str) -> bool:
+        return self.status.get(name) == 'ok'
+
+
+def run_boot_steps(steps: Iterable[BootStep], quiet: bool = False) -> BootRun:
+    """Run steps as soon as their dependencies succeed, each on its own thread
+
+    Steps run on daemon threads so one that overruns its timeout is
+    abandoned rather than holding up the boot or interpreter exit. Each
+    step's output is buffered and written whole, in the order the steps
+    were given, so concurrent steps never interleave mid-line.
+    """
+    run = BootRun()
+    pending = {step.name: step for step in steps}
+    for step in pending.values():
+        missing = [dep for dep in step.deps + step.after if dep not in pending]
+        if missing:
+            raise ValueError(f"Boot step {step.name} depends on unknown steps: {missing}")
+
+    finished: 'queue.Queue' = queue.Queue()
+    running: Dict[str, float] = {}
+    order = list(pending)
+    buffers = {name: io.StringIO() for name in order}
+    output = _StepOutput(sys.stdout)
+    emitted = 0
+
+    def execute(step: BootStep):
+        output.capture(buffers[step.name])
+        try:
+            with span(step.name):
+                value = step.fn(run.results)
+            finished.put((step.name, None, value))
+        except BaseException as e:
+            # SystemExit and KeyboardInterrupt too - otherwise the runner
+            # would sit out the full timeout waiting for this step
+            finished.put((step.name, e, None))
+
+    def settle(name: str, status: str, message: Optional[str] = None):
+        """Record a step's outcome and write out every settled step, in order"""
+        nonlocal emitted
+        if message and not quiet:
+            buffers[name].write(message + "\n")
+        run.status[name] = status
+        while emitted < len(order) and order[emitted] in run.status:
+            output.release(buffers[order[emitted]])
+            emitted += 1
+
+    try:
+        with redirect_stdout(output):
+            while pending or running:
+                # Launch or skip everything whose dependencies have settled
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name, step in list(pending.items()):
+                        states = [run.status.get(dep) for dep in step.deps]
+                        if any(state in BLOCKING_STATES for state in states):
+                            settle(name, 'skipped')
+                        elif (all(state == 'ok' for state in states)
+                              and all(run.status.get(dep) for dep in step.after)):
+                            running[name] = time.monotonic() + step.timeout
+                            threading.Thread(target=execute, args=(step,),
+                                             name=f"boot-{name}", daemon=True).start()
+                        else:
+                            continue
+                        del pending[name]
+                        progressed = True
+
+                if not running:
+                    # Whatever is left waits on a cycle and can never run
+                    for name in pending:
+                        settle(name, 'skipped')
+                    break
+
+                wait = max(0.0, min(running.values()) - time.monotonic())
+                try:
+                    name, error, value = finished.get(timeout=wait)
+                except queue.Empty:
+                    now = time.monotonic()
+                    for name, deadline in list(running.items()):
+                        if deadline <= now:
+                            del running[name]
+                            settle(name, 'timeout', f"⚠️  Boot step {name} timed out - continuing without it")
+                    continue
+
+                if name not in running:
+                    continue  # Finished after its timeout was already reported
+                del running[name]
+
+                if error is None:
+                    run.results[name] = value
+                    settle(name, 'ok')
+                else:
+                    run.errors[name] = error
+                    settle(name, 'failed', f"⚠️  Boot step {name} failed: {error}")
+    finally:
+        for name in order[emitted:]:
+            output.release(buffers[name])
+
+    return run
@@ -13,8 +13,14 @@ def capture_missing_memories():
     print("🧠 Capturing missing critical memories...")
     print("="*60)
     
+    # IDs allocated up front so later memories can link to earlier ones
+    distinction_id, vision_id, gap_id, protocol_id = (
+        memory.new_memory_id() for _ in range(4)
+    )
+    
     # 1. The OS-002 vs HC-001 distinction
-    distinction_id = memory.create_memory(
+    distinction = dict(
+        id=distinction_id,
         entity={
             "type": "crassus",
             "name": "Crassus",
@@ -45,10 +51,10 @@ def capture_missing_memories():
             "tags": ["architecture", "memory_systems", "spec_clarification"]
         }
     )
-    print(f"✅ Captured OS-002/HC-001 distinction: {distinction_id[:8]}...")
     
     # 2. Dale's 10-year vision
-    vision_id = memory.create_memory(
+    vision = dict(
+        id=vision_id,
         entity={
             "type": "caesar",
             "name": "Dale",
@@ -95,10 +101,10 @@ def capture_missing_memories():
             "tags": ["vision", "10_year_journey", "founder_insight", "timing"]
         }
     )
-    print(f"✅ Captured Dale's 10-year vision: {vision_id[:8]}...")
     
     # 3. The meta-lesson about memory gaps
-    gap_id = memory.create_memory(
+    gap = dict(
+        id=gap_id,
         entity={
             "type": "crassus",
             "name": "Crassus",
@@ -135,10 +141,10 @@ def capture_missing_memories():
             "tags": ["meta", "process_improvement", "dog_fooding"]
         }
     )
-    print(f"✅ Captured meta-lesson about gaps: {gap_id[:8]}...")
     
     # 4. The implementation protocol needed
-    protocol_id = memory.create_memory(
+    protocol = dict(
+        id=protocol_id,
         entity={
             "type": "pompey",
             "name": "Pompey",
@@ -174,6 +180,12 @@ def capture_missing_memories():
             "project": "OS-002"
         }
     )
+    
+    # One validated, single-transaction write for the whole set
+    memory.create_memories([distinction, vision, gap, protocol])
+    print(f"✅ Captured OS-002/HC-001 distinction: {distinction_id[:8]}...")
+    print(f"✅ Captured Dale's 10-year vision: {vision_id[:8]}...")
+    print(f"✅ Captured meta-lesson about gaps: {gap_id[:8]}...")
     print(f"✅ Captured protocol decision: {protocol_id[:8]}...")
     
     print("\n" + "="*60)
@@ -10,8 +10,12 @@ def capture_dale_vision():
     """Capture the foundational vision that drives everything"""
     memory = OrganizationalMemory()
     
+    # IDs allocated up front so the response can link to the vision
+    vision_id, implementation_id = memory.new_memory_id(), memory.new_memory_id()
+    
     # Dale's profound realization
-    vision_id = memory.create_memory(
+    vision = dict(
+        id=vision_id,
         entity={
             "type": "caesar",
             "name": "Dale",
@@ -47,10 +51,9 @@ def capture_dale_vision():
         }
     )
     
-    print(f"✨ Dale's vision captured forever: {vision_id}")
-    
     # Create the implementation response
-    implementation_id = memory.create_memory(
+    implementation = dict(
+        id=implementation_id,
         entity={
             "type": "pompey",
             "name": "Pompey",
@@ -92,6 +95,9 @@ def capture_dale_vision():
         }
     )
     
+    memory.create_memories([vision, implementation])
+    
+    print(f"✨ Dale's vision captured forever: {vision_id}")
     print(f"✅ Implementation response captured: {implementation_id}")
     
     return vision_id, implementation_id
@@ -4,118 +4,217 @@ Claude Session Initialization with Memory Loading
 Executes on every new Claude session/context
 """
 
+import importlib
+import importlib.util
+import io
 import sys
 import time
+import traceback
+from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from boot_profiler import finish_boot, format_report, profile_boot
+from boot_steps import BootRun, BootStep, run_boot_steps
 from memory_loader import MemoryLoader
 from session_memory_bridge import SessionMemoryBridge
 from internal_memory import OrganizationalMemory
 
-def initialize_claude_session():
-    """Main entry point for Claude session initialization"""
+LOAD_STEP = 'load_session_context'
+KNOWLEDGE_STEP = 'knowledge_retrieval'
+
+# Retrieved chunks offered to the manifest, and how long retrieval may take
+KNOWLEDGE_TOP_K = 5
+KNOWLEDGE_TIMEOUT = 10.0  # seconds
+# The knowledge index imports without these but cannot query
+KNOWLEDGE_DEPENDENCIES = ('chromadb', 'sentence_transformers')
+
+# Sibling projects boot steps use when they are installed - (directory, module, class)
+OPTIONAL_IMPORTS = {
+    'TriumvirateAPI': (Path.home() / "triumvirate", 'triumvirate_api', 'TriumvirateAPI'),
+    'ContextManager': (Path("~/vibe-coding-system/studio_modules/studio_004_consciousness_management").expanduser(),
+                       'context_manager', 'ContextManager'),
+    'KnowledgeIndexer': (Path(__file__).parent.parent / "os_modules" / "os_002_1_vector_search",
+                         'knowledge_indexer', 'KnowledgeIndexer'),
+}
+
+@lru_cache(maxsize=None)
+def _optional_class(key: str) -> Optional[Any]:
+    """Class from a sibling project, or None if it is not available
+    
+    Resolved on the main thread before boot steps start - sys.path edits
+    and imports racing on step threads can each see the other half-done.
+    Anything a module prints while importing is dropped.
+    """
+    directory, module, name = OPTIONAL_IMPORTS[key]
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+    try:
+        with redirect_stdout(io.StringIO()):
+            return getattr(importlib.import_module(module), name)
+    except Exception:
+        return None
+
+def initialize_claude_session(extra_steps: Iterable[BootStep] = ()) -> Optional[Dict]:
+    """Main entry point for Claude session initialization
+    
+    Loading memories is the only step everything else waits on - the
+    context files, session save, knowledge retrieval and context manager
+    then run concurrently, alongside any extra_steps. The manifest waits
+    for retrieval but is still written if it fails or times out.
+    """
     print("🧠 Initializing Organizational Memory...")
     print("="*60)
     start_time = time.time()
     
-    try:
+    for key in OPTIONAL_IMPORTS:
+        _optional_class(key)
+    
+    bridge = SessionMemoryBridge()
+    
+    def loaded(results):
+        return results[LOAD_STEP]
+    
+    steps = [
         # Step 1: Load memories
-        loader = MemoryLoader()
-        memory_context = loader.load_session_context()
-        
-        # Step 2: Bridge to Claude's context
-        bridge = SessionMemoryBridge()
-        manifest = bridge.inject_into_claude_context(memory_context)
-        
-        # Step 3: Update CURRENT_CONTEXT.md
-        bridge.update_current_context(memory_context)
-        
-        # Step 4: Save session state
-        bridge.save_session_memories(memory_context)
-        
-        # Step 5: Display summary for Claude
-        print("\n" + "="*60)
-        print("ORGANIZATIONAL MEMORY LOADED")
-        print("="*60)
-        print(f"Total Memories: {memory_context['total_memories']}")
-        print(f"Key Insights: {len(memory_context['key_insights'])}")
-        print(f"Cross-Mode Flows: {len(memory_context['cross_mode_flows'])}")
-        print(f"Load Time: {time.time() - start_time:.1f} seconds")
-        print("="*60)
-        
-        # Step 6: Check for critical memories
-        critical_memories = [
-            m for m in memory_context['key_insights'] 
-            if m.get('significance') == 'critical'
-        ]
-        
-        if critical_memories:
-            print("\n⚠️  CRITICAL MEMORIES REQUIRE ATTENTION:")
-            for memory in critical_memories:
-                print(f"   - {memory['insight']}")
-                if memory.get('project'):
-                    print(f"     (Project: {memory['project']})")
-        
-        # Step 7: Display cross-mode flows if any
-        if memory_context.get('cross_mode_flows'):
-            print("\n🔄 ACTIVE KNOWLEDGE FLOWS:")
-            for flow in memory_context['cross_mode_flows'][:3]:
-                print(f"   - {flow['from'][:50]}...")
-                print(f"     → {flow['to'][:50]}...")
-        
-        # Step 8: Show recommended focus
-        if memory_context.get('recommended_focus'):
-            print("\n🎯 RECOMMENDED FOCUS:")
-            for focus in memory_context['recommended_focus']:
-                print(f"   - {focus}")
-        
-        print("\n✅ Session initialized with organizational memory")
+        BootStep(LOAD_STEP, lambda results: MemoryLoader().load_session_context()),
+        # Step 2: Retrieve related organizational knowledge
+        BootStep(KNOWLEDGE_STEP, lambda results: _retrieve_knowledge(loaded(results)),
+                 deps=[LOAD_STEP], timeout=KNOWLEDGE_TIMEOUT),
+        # Step 3: Bridge to Claude's context
+        BootStep('manifest_write',
+                 lambda results: bridge.inject_into_claude_context(loaded(results), results.get(KNOWLEDGE_STEP)),
+                 deps=[LOAD_STEP], after=[KNOWLEDGE_STEP]),
+        # Step 4: Update CURRENT_CONTEXT.md
+        BootStep('current_context_update', lambda results: bridge.update_current_context(loaded(results)),
+                 deps=[LOAD_STEP]),
+        # Step 5: Save session state
+        BootStep('session_memories_save', lambda results: bridge.save_session_memories(loaded(results)),
+                 deps=[LOAD_STEP]),
+        # Step 6: Initialize Studio Module 004 Consciousness Management
+        BootStep('context_manager_init', lambda results: _init_context_manager(loaded(results)),
+                 deps=[LOAD_STEP]),
+    ]
+    run = run_boot_steps(steps + list(extra_steps), quiet=True)
+    _report_step_problems(run)
+    
+    if not run.ok(LOAD_STEP):
+        return None
+    memory_context = run.results[LOAD_STEP]
+    
+    # Step 7: Display summary for Claude
+    print("\n" + "="*60)
+    print("ORGANIZATIONAL MEMORY LOADED")
+    print("="*60)
+    print(f"Total Memories: {memory_context['total_memories']}")
+    print(f"Key Insights: {len(memory_context['key_insights'])}")
+    print(f"Cross-Mode Flows: {len(memory_context['cross_mode_flows'])}")
+    print(f"Load Time: {time.time() - start_time:.1f} seconds")
+    print("="*60)
+    
+    # Step 8: Check for critical memories
+    critical_memories = [
+        m for m in memory_context['key_insights'] 
+        if m.get('significance') == 'critical'
+    ]
+    
+    if critical_memories:
+        print("\n⚠️  CRITICAL MEMORIES REQUIRE ATTENTION:")
+        for memory in critical_memories:
+            print(f"   - {memory['insight']}")
+            if memory.get('project'):
+                print(f"     (Project: {memory['project']})")
+    
+    # Step 9: Display cross-mode flows if any
+    if memory_context.get('cross_mode_flows'):
+        print("\n🔄 ACTIVE KNOWLEDGE FLOWS:")
+        for flow in memory_context['cross_mode_flows'][:3]:
+            print(f"   - {flow['from'][:50]}...")
+            print(f"     → {flow['to'][:50]}...")
+    
+    # Step 10: Show recommended focus
+    if memory_context.get('recommended_focus'):
+        print("\n🎯 RECOMMENDED FOCUS:")
+        for focus in memory_context['recommended_focus']:
+            print(f"   - {focus}")
+    
+    print("\n✅ Session initialized with organizational memory")
+    if run.ok('manifest_write'):
         print(f"📄 Full context saved to: {bridge.memory_manifest_path}")
+    
+    # Step 11: Create a quick-start prompt
+    prompt = bridge.generate_memory_prompt(memory_context)
+    print("\n💡 Quick Context:")
+    print(prompt)
+    
+    return memory_context
+
+def _knowledge_question(memory_context: Dict) -> str:
+    """What this session is likely to need - focus areas and the top insights"""
+    parts = list(memory_context.get('recommended_focus', []))
+    parts.extend(insight['insight'] for insight in memory_context.get('key_insights', [])[:3])
+    return ' '.join(parts)
+
+def _retrieve_knowledge(memory_context: Dict) -> List[Dict]:
+    """Knowledge index chunks related to the loaded memories, nearest first
+    
+    Empty when the vector search module or its dependencies are missing.
+    """
+    KnowledgeIndexer = _optional_class('KnowledgeIndexer')
+    if KnowledgeIndexer is None or not all(
+            importlib.util.find_spec(module) for module in KNOWLEDGE_DEPENDENCIES):
+        return []
+    question = _knowledge_question(memory_context)
+    if not question:
+        return []
+    return KnowledgeIndexer().query_knowledge(question, top_k=KNOWLEDGE_TOP_K)
+
+def _init_context_manager(memory_context: Dict):
+    """Resume or start Studio Module 004 consciousness management"""
+    try:
+        ContextManager = _optional_class('ContextManager')
+        if ContextManager is None:
+            raise ImportError("context_manager")
         
-        # Step 9: Create a quick-start prompt
-        prompt = bridge.generate_memory_prompt(memory_context)
-        print("\n💡 Quick Context:")
-        print(prompt)
-        
-        # Step 10: Initialize Studio Module 004 Consciousness Management
-        try:
-            sys.path.insert(0, str(Path("~/vibe-coding-system/studio_modules/studio_004_consciousness_management").expanduser()))
-            from context_manager import ContextManager
-            
-            # Get member name from context
-            member_name = memory_context.get('context_markers', {}).get('member', 'pompey')
-            
-            # Initialize context manager
-            context_mgr = ContextManager(member_name)
-            resume_state = context_mgr.check_resume_state()
-            
-            if resume_state:
-                print(f"\n🔄 Context Management: Resuming from intelligent reboot")
-                print(f"   Previous session: {resume_state['timestamp']}")
-                print(f"   Reason: {resume_state['reason']}")
-                print(f"   Work status: {resume_state['work_status']}")
-                context_mgr.restore_work_state(resume_state)
-            else:
-                print(f"\n✨ Context Management: Starting fresh at peak performance")
-                print(f"   Tokens: 0 (Optimal: <40K)")
-                print(f"   Member: {member_name}")
-                
-        except Exception as cm_error:
-            # Consciousness management not available yet, continue
-            print(f"\n📊 Consciousness Management: Not yet available (Studio Module 004 pending)")
-        
-        return memory_context
+        # Get member name from context
+        member_name = memory_context.get('context_markers', {}).get('member', 'pompey')
         
-    except FileNotFoundError as e:
-        print(f"⚠️  Memory database not found - this might be first run")
-        print("   Run 'python3 internal_memory.py' to create initial memories")
-        return None
+        # Initialize context manager
+        context_mgr = ContextManager(member_name)
+        resume_state = context_mgr.check_resume_state()
         
-    except Exception as e:
-        print(f"⚠️  Memory loading failed: {e}")
-        print("Continuing with standard session...")
-        import traceback
-        traceback.print_exc()
-        return None
+        if resume_state:
+            print(f"\n🔄 Context Management: Resuming from intelligent reboot")
+            print(f"   Previous session: {resume_state['timestamp']}")
+            print(f"   Reason: {resume_state['reason']}")
+            print(f"   Work status: {resume_state['work_status']}")
+            context_mgr.restore_work_state(resume_state)
+        else:
+            print(f"\n✨ Context Management: Starting fresh at peak performance")
+            print(f"   Tokens: 0 (Optimal: <40K)")
+            print(f"   Member: {member_name}")
+            
+    except Exception as cm_error:
+        # Consciousness management not available yet, continue
+        print(f"\n📊 Consciousness Management: Not yet available (Studio Module 004 pending)")
+
+def _report_step_problems(run: BootRun):
+    """Explain failed, hung or skipped boot steps"""
+    for name, status in run.status.items():
+        error = run.errors.get(name)
+        if name == LOAD_STEP and isinstance(error, FileNotFoundError):
+            print(f"⚠️  Memory database not found - this might be first run")
+            print("   Run 'python3 internal_memory.py' to create initial memories")
+        elif name == LOAD_STEP and error is not None:
+            print(f"⚠️  Memory loading failed: {error}")
+            print("Continuing with standard session...")
+            traceback.print_exception(type(error), error, error.__traceback__)
+        elif status == 'failed':
+            print(f"⚠️  Boot step {name} failed: {error}")
+        elif status == 'timeout':
+            print(f"⚠️  Boot step {name} timed out - continuing without it")
+        elif status == 'skipped' and run.ok(LOAD_STEP):
+            print(f"⚠️  Boot step {name} skipped - a step it needs did not finish")
 
 def create_session_memory(event_description: str, significance: str = "routine"):
     """Helper to create a memory for current session events"""
@@ -141,10 +240,10 @@ def create_session_memory(event_description: str, significance: str = "routine")
 
 def check_triumvirate_communications():
     """Check and handle triumvirate inbox messages"""
-    # Import here to avoid circular dependencies
-    sys.path.insert(0, str(Path.home() / "triumvirate"))
     try:
-        from triumvirate_api import TriumvirateAPI
+        TriumvirateAPI = _optional_class('TriumvirateAPI')
+        if TriumvirateAPI is None:
+            raise ImportError("triumvirate_api")
         
         print("\n📨 Checking Triumvirate communications...")
         api = TriumvirateAPI('pompey')
@@ -193,18 +292,34 @@ def check_triumvirate_communications():
     except Exception as e:
         print(f"⚠️  Triumvirate check failed: {e}")
 
-if __name__ == "__main__":
-    # Run initialization
-    context = initialize_claude_session()
-    
-    # Check triumvirate communications
-    check_triumvirate_communications()
-    
-    # Example: Create a memory for this session
-    if context:
-        print("\n📝 Creating session initialization memory...")
+def _record_boot_memory() -> str:
+    """Remember that this session booted with organizational memory"""
+    print("\n📝 Creating session initialization memory...")
+    # Recording the boot must not cost the next boot its warm start
+    with MemoryLoader().keep_cache():
         memory_id = create_session_memory(
             "Successfully initialized session with organizational memory system",
             "notable"
         )
-        print(f"✅ Session memory created: {memory_id}")
\ No newline at end of file
+    print(f"✅ Session memory created: {memory_id}")
+    return memory_id
+
+def run_session_boot(record_memory: bool = True) -> Optional[Dict]:
+    """Full boot sequence - memory, triumvirate inbox, boot memory"""
+    # The triumvirate inbox needs nothing from memory, so it runs alongside the load
+    extra_steps = [BootStep('triumvirate_check', lambda results: check_triumvirate_communications())]
+    
+    # Example: Create a memory for this session
+    if record_memory:
+        extra_steps.append(BootStep('boot_memory_write', lambda results: _record_boot_memory(),
+                                    deps=[LOAD_STEP]))
+    
+    with profile_boot() as profiler:
+        context = initialize_claude_session(extra_steps)
+        record = finish_boot(profiler, 'ok' if context else 'degraded')
+    
+    print("\n" + format_report(record, top=5))
+    return context
+
+if __name__ == "__main__":
+    run_session_boot()
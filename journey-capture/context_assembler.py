@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Context Assembler - Pack the most valuable boot context into a token budget
+Candidates are chosen greedily by value per token, then rendered in order
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTEXT_MANAGER_PATH = (Path(__file__).parent.parent / "os_modules"
+                        / "os_004_context_management" / "context_manager.py")
+
+try:
+    # Loaded under its own name so a later `import context_manager` still
+    # resolves to whichever module that caller puts on sys.path
+    _spec = importlib.util.spec_from_file_location("os_004_context_manager", CONTEXT_MANAGER_PATH)
+    _module = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_module)
+    estimate_tokens = _module.ContextManager.estimate_tokens
+    OPTIMAL_LIMIT = _module.ContextManager.OPTIMAL_LIMIT
+except (ImportError, OSError, AttributeError):
+    OPTIMAL_LIMIT = 40_000
+
+    def estimate_tokens(text: str) -> int:
+        """Rough fallback - about four characters per token"""
+        return len(text) // 4 if text else 0
+
+SIGNIFICANCE_VALUES = {'critical': 3.0, 'notable': 2.0, 'routine': 1.0}
+
+
+class ContextAssembler:
+    """Greedy knapsack over sections of markdown lines
+
+    Each candidate is a block of text with a value. A section's heading is
+    only paid for once something in it is chosen. ``assemble()`` returns the
+    chosen blocks per section in the order they were added, so the
+    highest-ranked material still reads first.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.sections: Dict[str, str] = {}
+        self.candidates: List[Tuple[str, int, str, float, int]] = []
+        self.used = 0
+
+    def section(self, name: str, heading: str = ""):
+        """Declare a section and the heading it renders with"""
+        self.sections[name] = heading
+
+    def add(self, section: str, text: str, value: float):
+        """Offer one block of text for a section"""
+        if section not in self.sections:
+            self.section(section)
+        self.candidates.append((section, len(self.candidates), text, value, estimate_tokens(text)))
+
+    def assemble(self) -> Dict[str, List[str]]:
+        """Chosen blocks per section, best value per token first, within budget"""
+        remaining = self.budget
+        opened = set()
+        chosen = []
+
+        ranked = sorted(
+            self.candidates,
+            key=lambda c: c[3] / max(1, c[4]),
+            reverse=True
+        )
+        for section, order, text, value, tokens in ranked:
+            if value <= 0:
+                continue
+            cost = tokens
+            if section not in opened:
+                cost += estimate_tokens(self.sections[section])
+            if cost > remaining:
+                continue
+            remaining -= cost
+            opened.add(section)
+            chosen.append((section, order, text))
+
+        packed: Dict[str, List[str]] = {name: [] for name in self.sections}
+        for section, _, text in sorted(chosen, key=lambda c: c[1]):
+            packed[section].append(text)
+
+        self.used = self.budget - remaining
+        return packed
+
+    def render(self, packed: Optional[Dict[str, List[str]]] = None) -> str:
+        """Headings plus chosen blocks for every non-empty section"""
+        packed = self.assemble() if packed is None else packed
+        parts = []
+        for name, heading in self.sections.items():
+            if packed.get(name):
+                if heading:
+                    parts.append(heading)
+                parts.extend(packed[name])
+        return "".join(parts)
+
+    def render_within(self, budget: int, compose: Callable[[str], str] = lambda text: text) -> str:
+        """compose(rendering), packed so the whole composed text fits budget
+
+        ``compose`` wraps the rendering in its fixed text (title, stats).
+        estimate_tokens is not additive, so the blocks can cost a few tokens
+        less apart than together; the packing budget is trimmed by any
+        overshoot and the blocks chosen again.
+        """
+        self.budget = budget - estimate_tokens(compose(""))
+        while True:
+            text = compose(self.render())
+            over = estimate_tokens(text) - budget
+            if over <= 0 or self.budget <= 0:
+                return text
+            self.budget -= over
+
+
+def insight_value(insight: Dict, rank: int) -> float:
+    """Significance and loader weight, discounted by rank"""
+    value = insight.get('weight') or SIGNIFICANCE_VALUES.get(insight.get('significance'), 1.0)
+    return value / (1 + 0.1 * rank)
+
+
+def flow_value(flow: Dict, rank: int) -> float:
+    """Flows with a recorded impact are worth more than pending ones"""
+    value = 1.5 if flow.get('impact') and flow['impact'] != 'pending' else 1.0
+    return value / (1 + 0.1 * rank)
+
+
+def knowledge_value(chunk: Dict, rank: int) -> float:
+    """Retrieval relevance on the significance scale - a near match rivals a critical insight
+
+    query_knowledge scores are cosine distances, so relevance is 1 - score.
+    """
+    distance = chunk.get('score')
+    relevance = chunk.get('relevance', 1.0 - (0.5 if distance is None else distance))
+    return SIGNIFICANCE_VALUES['critical'] * max(0.0, relevance) / (1 + 0.1 * rank)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Context Document - Section-addressable rewrites of markdown context files
+Only the addressed "## " section is replaced, under a lock, via temp file and rename
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from artifact_writer import atomic_write, locked, stable_text
+
+SECTION_HEADING = re.compile(r'^## .*$', re.MULTILINE)
+
+# Lines that change on every render without changing the section's meaning
+VOLATILE_PREFIXES = ('*Last updated:',)
+
+
+def section_index(text: str) -> Dict[str, Tuple[int, int]]:
+    """Heading line -> (start, end) offsets of each "## " section
+
+    A section runs from its heading to the next "## " heading or the end
+    of the document. Only the first occurrence of a heading is indexed.
+    """
+    index: Dict[str, Tuple[int, int]] = {}
+    matches = list(SECTION_HEADING.finditer(text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        index.setdefault(match.group(0).rstrip(), (match.start(), end))
+    return index
+
+
+def stable_lines(text: str) -> str:
+    """Section text without volatile lines, for change detection"""
+    return stable_text(text.strip(), VOLATILE_PREFIXES)
+
+
+class ContextDocument:
+    """A markdown file whose "## " sections can be replaced one at a time"""
+
+    def __init__(self, path: Path, initial_content: str = ""):
+        self.path = Path(path)
+        self.initial_content = initial_content
+
+    def write_section(self, heading: str, body: str, insert_after_line: int = 2) -> bool:
+        """Replace or insert one section; returns False when nothing changed
+
+        ``body`` is everything after the heading line. A new section is
+        inserted after the first ``insert_after_line`` lines (the title and
+        its blank line). The write is skipped when the section differs only
+        in volatile lines such as its timestamp.
+        """
+        section = f"{heading}\n{body.rstrip()}\n\n"
+
+        with locked(self.path):
+            if self.path.exists():
+                content = self.path.read_text()
+            else:
+                content = self.initial_content
+
+            span = section_index(content).get(heading)
+            if span is not None:
+                start, end = span
+                if stable_lines(content[start:end]) == stable_lines(section):
+                    return False
+                updated = content[:start] + section + content[end:]
+            else:
+                offset = 0
+                for _ in range(insert_after_line):
+                    newline = content.find('\n', offset)
+                    if newline == -1:
+                        offset = len(content)
+                        break
+                    offset = newline + 1
+                prefix = content[:offset]
+                if prefix and not prefix.endswith('\n'):
+                    prefix += '\n'
+                updated = prefix + section + content[offset:]
+
+            atomic_write(self.path, updated)
+            return True
+
+    def read_section(self, heading: str) -> Optional[str]:
+        """Current text of one section, heading included"""
+        if not self.path.exists():
+            return None
+        content = self.path.read_text()
+        span = section_index(content).get(heading)
+        return content[span[0]:span[1]] if span else None
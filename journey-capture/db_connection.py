@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Database Connections - Shared, per-thread SQLite connections in WAL mode
+One connection per thread per database, opened once and reused
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+
+class ConnectionManager:
+    """Per-thread SQLite connections with tuned pragmas
+
+    WAL journaling lets boot readers run while a writer commits, and
+    ``synchronous=NORMAL`` is durable under WAL without an fsync per commit.
+    Each connection keeps a statement cache, so the module-level SQL
+    constants used across the memory system are prepared once per thread.
+    """
+
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,        # ~8MB page cache
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000        # ms to wait on a competing writer
+    }
+    CACHED_STATEMENTS = 256
+
+    _managers: Dict[str, 'ConnectionManager'] = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, db_path: Union[str, Path], pragmas: Optional[Dict] = None):
+        self.db_path = Path(db_path).resolve()
+        self.pragmas = dict(self.PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+
+    @classmethod
+    def for_path(cls, db_path: Union[str, Path]) -> 'ConnectionManager':
+        """Shared manager for a database file, keyed by absolute path"""
+        key = str(Path(db_path).resolve())
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls._managers[key] = cls(key)
+            return manager
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened and tuned on first use"""
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork - reopen in the child
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,  # explicit transactions only
+            cached_statements=self.CACHED_STATEMENTS
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction - commits on success, rolls back on error
+
+        Nested use becomes a savepoint, so helpers that open their own
+        transaction compose with callers that already hold one.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            savepoint = f"sp_{id(conn)}_{threading.get_ident()}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            conn.execute(f"RELEASE {savepoint}")
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def read_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Consistent snapshot across several reads"""
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
@@ -5,12 +5,467 @@ Where CTO discoveries flow to Creative Director, Crassus wisdom influences Pompe
 """
 
 import json
+import re
 import sqlite3
-import uuid
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-import jsonschema
+from artifact_writer import write_artifact
+from background_writer import DebouncedCall
+from db_connection import ConnectionManager
+from schema_validation import load_validator
+from time_ids import uuid7
+
+# Versioned schema migrations - applied in order, tracked in PRAGMA user_version
+MIGRATIONS = [
+    (1, [
+        # Every loader query filters on one of these and orders by timestamp
+        "CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_memories_mode_timestamp ON memories(entity_mode, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_memories_project_timestamp ON memories(project, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_memories_significance_timestamp ON memories(event_significance, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_memories_entity_timestamp ON memories(entity_name, entity_mode, timestamp)",
+    ]),
+    (2, [
+        # Materialized metrics - triggers keep counts current on every write
+        """
+        CREATE TABLE IF NOT EXISTS memory_counts_by_entity (
+            entity_name TEXT NOT NULL,
+            entity_mode TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (entity_name, entity_mode)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS memory_counts_by_type (
+            event_type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT OR REPLACE INTO memory_counts_by_entity (entity_name, entity_mode, count)
+        SELECT entity_name, entity_mode, COUNT(*) FROM memories GROUP BY entity_name, entity_mode
+        """,
+        """
+        INSERT OR REPLACE INTO memory_counts_by_type (event_type, count)
+        SELECT event_type, COUNT(*) FROM memories GROUP BY event_type
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_count_insert AFTER INSERT ON memories
+        BEGIN
+            INSERT INTO memory_counts_by_entity (entity_name, entity_mode, count)
+            VALUES (NEW.entity_name, NEW.entity_mode, 1)
+            ON CONFLICT (entity_name, entity_mode) DO UPDATE SET count = count + 1;
+            INSERT INTO memory_counts_by_type (event_type, count)
+            VALUES (NEW.event_type, 1)
+            ON CONFLICT (event_type) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_count_delete AFTER DELETE ON memories
+        BEGIN
+            UPDATE memory_counts_by_entity SET count = count - 1
+            WHERE entity_name = OLD.entity_name AND entity_mode = OLD.entity_mode;
+            UPDATE memory_counts_by_type SET count = count - 1
+            WHERE event_type = OLD.event_type;
+        END
+        """,
+    ]),
+    (3, [
+        # Hot fields as real columns so readers can skip memory_json entirely
+        "ALTER TABLE memories ADD COLUMN insight TEXT",
+        "ALTER TABLE memories ADD COLUMN rationale TEXT",
+        "ALTER TABLE memories ADD COLUMN outcome_status TEXT",
+        "ALTER TABLE memories ADD COLUMN outcome_impact TEXT",
+        "ALTER TABLE memories ADD COLUMN tags TEXT",
+        "ALTER TABLE memories ADD COLUMN influences TEXT",
+        "ALTER TABLE memories ADD COLUMN influenced_by TEXT",
+        """
+        UPDATE memories SET
+            insight = json_extract(memory_json, '$.content.insight'),
+            rationale = json_extract(memory_json, '$.content.rationale'),
+            outcome_status = json_extract(memory_json, '$.outcome.status'),
+            outcome_impact = json_extract(memory_json, '$.outcome.impact'),
+            tags = COALESCE(json_extract(memory_json, '$.metadata.tags'), '[]'),
+            influences = COALESCE(json_extract(memory_json, '$.connections.influences'), '[]'),
+            influenced_by = COALESCE(json_extract(memory_json, '$.connections.influenced_by'), '[]')
+        """,
+    ]),
+    (4, [
+        lambda conn: _create_memory_fts(conn),
+    ]),
+    (5, [
+        # Graph traversal walks edges in both directions
+        "CREATE INDEX IF NOT EXISTS idx_connections_from ON connections(from_memory, to_memory)",
+        "CREATE INDEX IF NOT EXISTS idx_connections_to ON connections(to_memory, from_memory)",
+    ]),
+    (6, [
+        # Significant memories in timestamp order - boot reads the newest few
+        # without sorting every significant row
+        """
+        CREATE INDEX IF NOT EXISTS idx_memories_significant_timestamp ON memories(timestamp)
+        WHERE event_significance IN ('critical', 'notable')
+        """,
+    ]),
+    (7, [
+        lambda conn: _recreate_memory_fts(conn),
+    ]),
+    (8, [
+        # Bumped by every memory or edge change - a cheap, exact marker for
+        # caches built from the database, unlike file sizes and mtimes
+        "CREATE TABLE IF NOT EXISTS memory_data_version (version INTEGER NOT NULL)",
+        "INSERT INTO memory_data_version (version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM memory_data_version)",
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_version_insert AFTER INSERT ON memories
+        BEGIN
+            UPDATE memory_data_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_version_delete AFTER DELETE ON memories
+        BEGIN
+            UPDATE memory_data_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_version_update AFTER UPDATE ON memories
+        BEGIN
+            UPDATE memory_data_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS connections_version_insert AFTER INSERT ON connections
+        BEGIN
+            UPDATE memory_data_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS connections_version_delete AFTER DELETE ON connections
+        BEGIN
+            UPDATE memory_data_version SET version = version + 1;
+        END
+        """,
+    ]),
+    (9, [
+        # Re-attributing or re-typing a memory moves its count too
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_count_update
+        AFTER UPDATE OF entity_name, entity_mode, event_type ON memories
+        BEGIN
+            UPDATE memory_counts_by_entity SET count = count - 1
+            WHERE entity_name = OLD.entity_name AND entity_mode = OLD.entity_mode;
+            INSERT INTO memory_counts_by_entity (entity_name, entity_mode, count)
+            VALUES (NEW.entity_name, NEW.entity_mode, 1)
+            ON CONFLICT (entity_name, entity_mode) DO UPDATE SET count = count + 1;
+            UPDATE memory_counts_by_type SET count = count - 1
+            WHERE event_type = OLD.event_type;
+            INSERT INTO memory_counts_by_type (event_type, count)
+            VALUES (NEW.event_type, 1)
+            ON CONFLICT (event_type) DO UPDATE SET count = count + 1;
+        END
+        """,
+        # Recount anything updated before the trigger existed
+        "DELETE FROM memory_counts_by_entity",
+        "DELETE FROM memory_counts_by_type",
+        """
+        INSERT INTO memory_counts_by_entity (entity_name, entity_mode, count)
+        SELECT entity_name, entity_mode, COUNT(*) FROM memories GROUP BY entity_name, entity_mode
+        """,
+        """
+        INSERT INTO memory_counts_by_type (event_type, count)
+        SELECT event_type, COUNT(*) FROM memories GROUP BY event_type
+        """,
+    ]),
+]
+
+# Recursive step per traversal direction - (next node expression, join condition)
+GRAPH_STEPS = {
+    'out': ("c.to_memory", "c.from_memory = w.id"),
+    'in': ("c.from_memory", "c.to_memory = w.id"),
+    'both': ("CASE WHEN c.from_memory = w.id THEN c.to_memory ELSE c.from_memory END",
+             "(c.from_memory = w.id OR c.to_memory = w.id)"),
+}
+
+# UNION drops repeated (node, depth) rows, so cycles and diamonds cost at most
+# one row per node per level instead of one per path
+LINEAGE_SQL = """
+    WITH RECURSIVE lineage(id, depth) AS (
+        SELECT ?, 0
+        UNION
+        SELECT c.from_memory, l.depth + 1
+        FROM lineage l JOIN connections c ON c.to_memory = l.id
+        WHERE l.depth < ?
+    ),
+    nearest(id, depth) AS (
+        SELECT id, MIN(depth) FROM lineage GROUP BY id
+    )
+    -- via: the node one step closer to the seed on a shortest chain
+    SELECT n.id, n.depth, (
+        SELECT MIN(c.to_memory) FROM connections c
+        JOIN nearest v ON v.id = c.to_memory AND v.depth = n.depth - 1
+        WHERE c.from_memory = n.id
+    )
+    FROM nearest n
+    WHERE n.depth > 0
+    ORDER BY n.depth, (SELECT timestamp FROM memories WHERE id = n.id) DESC, n.id
+    LIMIT ?
+"""
+
+# Newest memories that something flowed into - flows are found by walking
+# back from a page of these rather than forward from every edge
+CROSS_MODE_TARGETS_SQL = """
+    SELECT m.id FROM memories m
+    WHERE EXISTS (SELECT 1 FROM connections c WHERE c.to_memory = m.id)
+    ORDER BY m.timestamp DESC
+    LIMIT ? OFFSET ?
+"""
+
+CROSS_MODE_FLOWS_SQL = """
+    WITH RECURSIVE flow(target, id, depth) AS (
+        SELECT value, value, 0 FROM json_each(?)
+        UNION
+        SELECT f.target, c.from_memory, f.depth + 1
+        FROM flow f JOIN connections c ON c.to_memory = f.id
+        WHERE f.depth < ?
+    )
+    SELECT f.id, f.target, MIN(f.depth),
+           a.entity_mode, b.entity_mode,
+           a.event_description, b.event_description, b.outcome_impact
+    FROM flow f
+    JOIN memories a ON a.id = f.id
+    JOIN memories b ON b.id = f.target
+    WHERE f.depth > 0 AND a.entity_mode != b.entity_mode
+    GROUP BY f.target, f.id
+    ORDER BY b.timestamp DESC, MIN(f.depth), a.timestamp DESC, f.id
+"""
+
+# Text fields indexed for search - quotes live in content or content.data
+MEMORY_FTS_VALUES = """
+    {row}.event_description, {row}.insight, {row}.rationale,
+    COALESCE(json_extract({row}.memory_json, '$.content.quote'),
+             json_extract({row}.memory_json, '$.content.data.quote'))
+"""
+
+
+def _create_memory_fts(conn: sqlite3.Connection):
+    """FTS5 index over memory text, kept in sync by triggers"""
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                memory_id UNINDEXED, description, insight, rationale, quote,
+                tokenize = 'porter unicode61'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 - search_memories falls back to LIKE
+        return
+    
+    conn.execute(f"""
+        INSERT INTO memories_fts (memory_id, description, insight, rationale, quote)
+        SELECT id, {MEMORY_FTS_VALUES.format(row='memories')} FROM memories
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories
+        BEGIN
+            INSERT INTO memories_fts (memory_id, description, insight, rationale, quote)
+            VALUES (NEW.id, {MEMORY_FTS_VALUES.format(row='NEW')});
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories
+        BEGIN
+            DELETE FROM memories_fts WHERE memory_id = OLD.id;
+        END
+    """)
+
+
+# Migration 7's index keys the same fields by memories rowid.
+# FTS5 reads them back through this view when it needs a row's old values.
+MEMORY_FTS_CONTENT_SQL = """
+    CREATE VIEW IF NOT EXISTS memories_fts_content AS
+    SELECT rowid AS memory_rowid,
+           event_description AS description, insight, rationale,
+           COALESCE(json_extract(memory_json, '$.content.quote'),
+                    json_extract(memory_json, '$.content.data.quote')) AS quote
+    FROM memories
+"""
+
+MEMORY_FTS_ROWID_VALUES = """
+    {row}.rowid, {row}.event_description, {row}.insight, {row}.rationale,
+    COALESCE(json_extract({row}.memory_json, '$.content.quote'),
+             json_extract({row}.memory_json, '$.content.data.quote'))
+"""
+
+
+def _create_memory_fts_by_rowid(conn: sqlite3.Connection):
+    """External-content FTS5 index over memory text, kept in sync by triggers
+    
+    The index is keyed by the memories rowid, so removing a row is the FTS5
+    'delete' command rather than a scan for its id. A VACUUM of this
+    database may renumber rowids - follow it with a 'rebuild'.
+    """
+    try:
+        conn.execute(MEMORY_FTS_CONTENT_SQL)
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                description, insight, rationale, quote,
+                content = 'memories_fts_content', content_rowid = 'memory_rowid',
+                tokenize = 'porter unicode61'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 - search_memories falls back to LIKE
+        conn.execute("DROP VIEW IF EXISTS memories_fts_content")
+        return
+    
+    conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('rebuild')")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories
+        BEGIN
+            INSERT INTO memories_fts (rowid, description, insight, rationale, quote)
+            VALUES ({MEMORY_FTS_ROWID_VALUES.format(row='NEW')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories
+        BEGIN
+            INSERT INTO memories_fts (memories_fts, rowid, description, insight, rationale, quote)
+            VALUES ('delete', {MEMORY_FTS_ROWID_VALUES.format(row='OLD')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE ON memories
+        BEGIN
+            INSERT INTO memories_fts (memories_fts, rowid, description, insight, rationale, quote)
+            VALUES ('delete', {MEMORY_FTS_ROWID_VALUES.format(row='OLD')});
+            INSERT INTO memories_fts (rowid, description, insight, rationale, quote)
+            VALUES ({MEMORY_FTS_ROWID_VALUES.format(row='NEW')});
+        END
+    """)
+
+
+def _recreate_memory_fts(conn: sqlite3.Connection):
+    """Replace the id-keyed FTS table from migration 4 with the rowid-keyed one"""
+    for trigger in ('memories_fts_insert', 'memories_fts_delete', 'memories_fts_update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS memories_fts")
+    conn.execute("DROP VIEW IF EXISTS memories_fts_content")
+    _create_memory_fts_by_rowid(conn)
+
+
+def _create_tables(conn: sqlite3.Connection):
+    """Create the base tables if this is a fresh database"""
+    # Main memory table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS memories (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            version TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            entity_name TEXT NOT NULL,
+            entity_mode TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            event_category TEXT NOT NULL,
+            event_description TEXT NOT NULL,
+            event_significance TEXT DEFAULT 'routine',
+            session_id TEXT,
+            project TEXT,
+            memory_json TEXT NOT NULL
+        )
+    """)
+    
+    # Connections table for memory relationships
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS connections (
+            from_memory TEXT NOT NULL,
+            to_memory TEXT NOT NULL,
+            connection_type TEXT NOT NULL,
+            FOREIGN KEY (from_memory) REFERENCES memories(id),
+            FOREIGN KEY (to_memory) REFERENCES memories(id)
+        )
+    """)
+    
+    # Entity relationships
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entity_relationships (
+            memory_id TEXT NOT NULL,
+            entity_name TEXT NOT NULL,
+            relationship TEXT NOT NULL,
+            FOREIGN KEY (memory_id) REFERENCES memories(id)
+        )
+    """)
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Apply any schema migrations newer than the database version"""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    for version, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        for step in steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        conn.execute(f"PRAGMA user_version = {version}")
+
+
+def ensure_schema(db: ConnectionManager):
+    """Create and migrate the memory schema - every reader and writer calls this first
+    
+    Already-current databases cost one PRAGMA read and take no write lock.
+    """
+    current = db.connection().execute("PRAGMA user_version").fetchone()[0]
+    if current >= MIGRATIONS[-1][0]:
+        return
+    with db.transaction() as conn:
+        _create_tables(conn)
+        _migrate(conn)
+
+
+def data_version(conn: sqlite3.Connection) -> int:
+    """Current memory_data_version - changes whenever memories or edges do"""
+    return conn.execute("SELECT version FROM memory_data_version").fetchone()[0]
+
+
+def _search_terms(text: str) -> List[str]:
+    """Words from free text, safe to quote inside an FTS5 expression"""
+    return re.findall(r"\w+", text)
+
+# MEMORY_METRICS.txt is re-rendered at most once per window, and at exit
+METRICS_DEBOUNCE_SECONDS = 2.0
+
+_metrics_renderers: Dict[str, DebouncedCall] = {}
+_metrics_renderers_lock = threading.Lock()
+
+def flush_metrics_renderers():
+    """Render every pending metrics update now - for exits that skip atexit"""
+    with _metrics_renderers_lock:
+        renderers = list(_metrics_renderers.values())
+    for renderer in renderers:
+        renderer.flush()
+
+INSERT_MEMORY_SQL = """
+    INSERT INTO memories (
+        id, timestamp, version, entity_type, entity_name, entity_mode,
+        event_type, event_category, event_description, event_significance,
+        session_id, project, memory_json,
+        insight, rationale, outcome_status, outcome_impact,
+        tags, influences, influenced_by
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_CONNECTION_SQL = """
+    INSERT INTO connections (from_memory, to_memory, connection_type)
+    VALUES (?, ?, ?)
+"""
+
+INSERT_RELATIONSHIP_SQL = """
+    INSERT INTO entity_relationships (memory_id, entity_name, relationship)
+    VALUES (?, ?, ?)
+"""
 
 class OrganizationalMemory:
     """The collective soul where all entities share knowledge"""
@@ -18,60 +473,17 @@ class OrganizationalMemory:
     def __init__(self):
         self.db_path = Path("organizational_memory.db")
         self.schema_path = Path("schemas/internal_memory_schema_v01.json")
-        self.schema = self._load_schema()
+        # Compiled once per process and shared by every instance
+        self.validator = load_validator(self.schema_path)
+        self.schema = self.validator.schema
+        self.db = ConnectionManager.for_path(self.db_path)
+        self.metrics_path = Path("MEMORY_METRICS.txt").resolve()
         self._init_db()
+        self._metrics_renderer = self._shared_metrics_renderer()
         
-    def _load_schema(self) -> dict:
-        """Load and validate the memory schema"""
-        with open(self.schema_path) as f:
-            return json.load(f)
-    
     def _init_db(self):
         """Initialize the collective memory database"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Main memory table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS memories (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                version TEXT NOT NULL,
-                entity_type TEXT NOT NULL,
-                entity_name TEXT NOT NULL,
-                entity_mode TEXT NOT NULL,
-                event_type TEXT NOT NULL,
-                event_category TEXT NOT NULL,
-                event_description TEXT NOT NULL,
-                event_significance TEXT DEFAULT 'routine',
-                session_id TEXT,
-                project TEXT,
-                memory_json TEXT NOT NULL
-            )
-        """)
-        
-        # Connections table for memory relationships
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS connections (
-                from_memory TEXT NOT NULL,
-                to_memory TEXT NOT NULL,
-                connection_type TEXT NOT NULL,
-                FOREIGN KEY (from_memory) REFERENCES memories(id),
-                FOREIGN KEY (to_memory) REFERENCES memories(id)
-            )
-        """)
-        
-        # Entity relationships
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS entity_relationships (
-                memory_id TEXT NOT NULL,
-                entity_name TEXT NOT NULL,
-                relationship TEXT NOT NULL,
-                FOREIGN KEY (memory_id) REFERENCES memories(id)
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        ensure_schema(self.db)
     
     def create_memory(self, 
                      entity: Dict[str, str],
@@ -80,16 +492,75 @@ class OrganizationalMemory:
                      context: Optional[Dict] = None,
                      connections: Optional[Dict] = None,
                      outcome: Optional[Dict] = None,
-                     metadata: Optional[Dict] = None) -> str:
+                     metadata: Optional[Dict] = None,
+                     validate: bool = True) -> str:
         """Create a new organizational memory"""
+        return self.create_memories([{
+            "entity": entity,
+            "event": event,
+            "content": content,
+            "context": context,
+            "connections": connections,
+            "outcome": outcome,
+            "metadata": metadata
+        }], validate=validate)[0]
+    
+    def create_memories(self, batch: List[Dict[str, Any]],
+                        validate: bool = True) -> List[str]:
+        """Create many memories in a single transaction
         
-        memory_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        Each item takes the create_memory keyword arguments, plus an optional
+        "id" from new_memory_id() so items can reference each other's
+        connections within the same batch. The whole batch is validated
+        before anything is written, and metrics are refreshed once.
+        Pass validate=False only for documents already checked upstream.
+        """
+        memories = [self._build_memory(**item) for item in batch]
         
-        # Build memory object
-        memory = {
-            "id": memory_id,
-            "timestamp": timestamp,
+        # Validate everything up front - a bad item writes nothing
+        if validate:
+            for memory in memories:
+                self.validator.validate(memory)
+        
+        memory_rows, connection_rows, relationship_rows = [], [], []
+        for memory in memories:
+            memory_row, edges, relationships = self._memory_rows(memory)
+            memory_rows.append(memory_row)
+            connection_rows.extend(edges)
+            relationship_rows.extend(relationships)
+        
+        with self.db.transaction() as conn:
+            conn.executemany(INSERT_MEMORY_SQL, memory_rows)
+            conn.executemany(INSERT_CONNECTION_SQL, connection_rows)
+            conn.executemany(INSERT_RELATIONSHIP_SQL, relationship_rows)
+        
+        # Update visible metrics
+        self._update_metrics()
+        
+        return [memory["id"] for memory in memories]
+    
+    def new_memory_id(self) -> str:
+        """Allocate an ID ahead of create_memories for in-batch connections
+        
+        IDs are time-ordered UUIDv7s; memories stored earlier keep their v4 IDs,
+        which other memories' documents and the graph file also refer to.
+        Traversals therefore order by timestamp and use IDs only as a tiebreak.
+        """
+        return uuid7()
+    
+    def _build_memory(self,
+                      entity: Dict[str, str],
+                      event: Dict[str, str],
+                      content: Optional[Dict] = None,
+                      context: Optional[Dict] = None,
+                      connections: Optional[Dict] = None,
+                      outcome: Optional[Dict] = None,
+                      metadata: Optional[Dict] = None,
+                      id: Optional[str] = None) -> Dict:
+        """Assemble a memory document with defaults filled in"""
+        return {
+            "id": id or self.new_memory_id(),
+            "timestamp": datetime.now().isoformat(),
             "version": "0.1.0",
             "entity": entity,
             "event": event,
@@ -99,93 +570,134 @@ class OrganizationalMemory:
             "outcome": outcome or {"status": "pending"},
             "metadata": metadata or {}
         }
+    
+    @staticmethod
+    def _memory_rows(memory: Dict):
+        """Split a memory into its memories, connections and relationship rows"""
+        memory_id = memory["id"]
+        entity = memory["entity"]
+        event = memory["event"]
+        context = memory["context"]
+        connections = memory["connections"]
+        content = memory["content"]
+        outcome = memory["outcome"]
         
-        # Validate against schema
-        jsonschema.validate(memory, self.schema)
-        
-        # Store in database
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            INSERT INTO memories (
-                id, timestamp, version, entity_type, entity_name, entity_mode,
-                event_type, event_category, event_description, event_significance,
-                session_id, project, memory_json
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            memory_id, timestamp, memory["version"],
+        memory_row = (
+            memory_id, memory["timestamp"], memory["version"],
             entity["type"], entity["name"], entity["mode"],
             event["type"], event["category"], event["description"],
             event.get("significance", "routine"),
             context.get("session_id"),
             context.get("project"),
-            json.dumps(memory)
-        ))
-        
-        # Store connections
-        if connections:
-            for influenced_id in connections.get("influences", []):
-                conn.execute("""
-                    INSERT INTO connections (from_memory, to_memory, connection_type)
-                    VALUES (?, ?, 'influences')
-                """, (memory_id, influenced_id))
-            
-            for influenced_by_id in connections.get("influenced_by", []):
-                conn.execute("""
-                    INSERT INTO connections (from_memory, to_memory, connection_type)
-                    VALUES (?, ?, 'influenced_by')
-                """, (influenced_by_id, memory_id))
-        
-        conn.commit()
-        conn.close()
+            json.dumps(memory),
+            content.get("insight"),
+            content.get("rationale"),
+            outcome.get("status"),
+            outcome.get("impact"),
+            json.dumps(memory["metadata"].get("tags", [])),
+            json.dumps(connections.get("influences", [])),
+            json.dumps(connections.get("influenced_by", []))
+        )
         
-        # Update visible metrics
-        self._update_metrics()
+        # Edges always point from the influencing memory to the influenced one
+        edges = [
+            (memory_id, influenced_id, 'influences')
+            for influenced_id in connections.get("influences", [])
+        ] + [
+            (influenced_by_id, memory_id, 'influenced_by')
+            for influenced_by_id in connections.get("influenced_by", [])
+        ]
         
-        return memory_id
+        relationships = [
+            (memory_id, related.get("entity"), related.get("relationship"))
+            for related in connections.get("related_entities", [])
+            if related.get("entity") and related.get("relationship")
+        ]
+        
+        return memory_row, edges, relationships
+    
+    def _shared_metrics_renderer(self) -> DebouncedCall:
+        """One debounced metrics renderer per database file"""
+        key = str(self.db.db_path)
+        with _metrics_renderers_lock:
+            renderer = _metrics_renderers.get(key)
+            if renderer is None:
+                renderer = _metrics_renderers[key] = DebouncedCall(
+                    self.render_metrics, METRICS_DEBOUNCE_SECONDS
+                )
+            return renderer
     
     def _update_metrics(self):
-        """Update visible memory metrics"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Get stats
-        total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        """Update visible memory metrics - counters are already current"""
+        self._metrics_renderer.schedule()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Read the trigger-maintained counters - cost is independent of table size"""
+        conn = self.db.connection()
         
         entities = conn.execute("""
-            SELECT entity_name, entity_mode, COUNT(*) as count 
-            FROM memories 
-            GROUP BY entity_name, entity_mode
+            SELECT entity_name, entity_mode, count 
+            FROM memory_counts_by_entity 
+            WHERE count > 0
+            ORDER BY entity_name, entity_mode
         """).fetchall()
         
         event_types = conn.execute("""
-            SELECT event_type, COUNT(*) as count 
-            FROM memories 
-            GROUP BY event_type
+            SELECT event_type, count 
+            FROM memory_counts_by_type 
+            WHERE count > 0
+            ORDER BY event_type
         """).fetchall()
         
+        return {
+            'total': sum(count for _, count in event_types),
+            'by_entity': entities,
+            'by_type': event_types
+        }
+    
+    def render_metrics(self):
+        """Write MEMORY_METRICS.txt from the counters"""
+        # The database may be gone by the time a deferred render fires
+        if not self.db.db_path.exists():
+            return
+        
+        metrics = self.get_metrics()
+        
         # Write metrics file
         metrics_text = f"""ORGANIZATIONAL MEMORY METRICS
 ============================
-Total Memories: {total}
+Total Memories: {metrics['total']}
 Generated: {datetime.now().isoformat()}
 
 Memories by Entity:
 """
-        for entity_name, entity_mode, count in entities:
+        for entity_name, entity_mode, count in metrics['by_entity']:
             metrics_text += f"  {entity_name} ({entity_mode}): {count}\n"
         
         metrics_text += "\nMemories by Type:\n"
-        for event_type, count in event_types:
+        for event_type, count in metrics['by_type']:
             metrics_text += f"  {event_type}: {count}\n"
         
-        Path("MEMORY_METRICS.txt").write_text(metrics_text)
-        conn.close()
+        write_artifact(self.metrics_path, metrics_text, volatile=('Generated:',))
+    
+    def flush_metrics(self):
+        """Render any pending metrics update immediately"""
+        self._metrics_renderer.flush()
     
     def find_related_memories(self, entity_name: str = None, 
                             entity_mode: str = None,
                             project: str = None) -> List[Dict]:
         """Find memories that might influence current context"""
-        conn = sqlite3.connect(self.db_path)
+        query, params = self._related_memories_query(entity_name, entity_mode, project)
+        results = self.db.connection().execute(query, params).fetchall()
         
+        return [json.loads(row[0]) for row in results]
+    
+    @staticmethod
+    def _related_memories_query(entity_name: str = None,
+                                entity_mode: str = None,
+                                project: str = None):
+        """Build the filtered, newest-first query for find_related_memories"""
         query = "SELECT memory_json FROM memories WHERE 1=1"
         params = []
         
@@ -203,10 +715,174 @@ Memories by Entity:
         
         query += " ORDER BY timestamp DESC LIMIT 20"
         
-        results = conn.execute(query, params).fetchall()
-        conn.close()
+        return query, params
+    
+    def has_text_index(self) -> bool:
+        """True when the FTS5 memory index exists"""
+        return self.db.connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        ).fetchone() is not None
+    
+    def search_memories(self, query: Optional[str] = None,
+                        entity_name: str = None,
+                        entity_mode: str = None,
+                        event_type: str = None,
+                        project: str = None,
+                        time_range: Optional[tuple] = None,
+                        match: str = 'any',
+                        limit: int = 20) -> List[Dict]:
+        """Ranked text search over descriptions, insights, rationale and quotes
         
-        return [json.loads(row[0]) for row in results]
+        match is 'any' (some word), 'all' (every word) or 'phrase' (the
+        exact word sequence). time_range is an ISO (since, until) pair,
+        either end may be None. Without a query, returns the newest
+        memories matching the filters.
+        """
+        terms = _search_terms(query or "")
+        if query and not terms:
+            return []
+        
+        filters, params = [], []
+        for column, value in (("entity_name", entity_name),
+                              ("entity_mode", entity_mode),
+                              ("event_type", event_type),
+                              ("project", project)):
+            if value:
+                filters.append(f"m.{column} = ?")
+                params.append(value)
+        
+        if time_range:
+            since, until = time_range
+            if since:
+                filters.append("m.timestamp >= ?")
+                params.append(since)
+            if until:
+                filters.append("m.timestamp <= ?")
+                params.append(until)
+        
+        conn = self.db.connection()
+        
+        if terms and self.has_text_index():
+            if match == 'phrase':
+                expression = '"' + " ".join(terms) + '"'
+            else:
+                joiner = " AND " if match == 'all' else " OR "
+                expression = joiner.join(f'"{term}"' for term in terms)
+            sql = """
+                SELECT m.memory_json FROM memories_fts f
+                JOIN memories m ON m.rowid = f.rowid
+                WHERE memories_fts MATCH ?
+            """
+            sql += "".join(f" AND {clause}" for clause in filters)
+            sql += " ORDER BY f.rank LIMIT ?"
+            rows = conn.execute(sql, [expression] + params + [limit]).fetchall()
+            return [json.loads(row[0]) for row in rows]
+        
+        if terms:
+            # No FTS5 in this SQLite build - a slower LIKE scan that only
+            # approximates it: substrings rather than stemmed words, quotes
+            # not searched, and results newest first instead of by rank
+            text_clause = "(m.event_description LIKE ? OR m.insight LIKE ? OR m.rationale LIKE ?)"
+            patterns = [" ".join(terms)] if match == 'phrase' else terms
+            joiner = " AND " if match == 'all' else " OR "
+            filters.append("(" + joiner.join([text_clause] * len(patterns)) + ")")
+            for pattern in patterns:
+                params.extend([f"%{pattern}%"] * 3)
+        
+        sql = "SELECT m.memory_json FROM memories m WHERE 1=1"
+        sql += "".join(f" AND {clause}" for clause in filters)
+        sql += " ORDER BY m.timestamp DESC LIMIT ?"
+        rows = conn.execute(sql, params + [limit]).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def get_neighborhood(self, memory_id: str, hops: int = 2,
+                         direction: str = 'both',
+                         limit: int = 200) -> List[Dict]:
+        """Memories within k hops of memory_id along connection edges
+        
+        direction is 'out' (what it influenced), 'in' (what influenced it)
+        or 'both'. Each result carries its shortest hop distance.
+        """
+        rows = self.db.connection().execute(
+            self._neighborhood_query(direction), (memory_id, hops, memory_id, limit)
+        ).fetchall()
+        
+        return [{
+            'id': row[0],
+            'depth': row[1],
+            'entity': f"{row[2]} ({row[3]})",
+            'mode': row[3],
+            'description': row[4],
+            'timestamp': row[5]
+        } for row in rows]
+    
+    @staticmethod
+    def _neighborhood_query(direction: str) -> str:
+        """k-hop walk SQL for one direction - params (seed, hops, seed, limit)"""
+        if direction not in GRAPH_STEPS:
+            raise ValueError(f"direction must be one of {', '.join(GRAPH_STEPS)}, not {direction!r}")
+        next_node, join = GRAPH_STEPS[direction]
+        return f"""
+            WITH RECURSIVE walk(id, depth) AS (
+                SELECT ?, 0
+                UNION
+                SELECT {next_node}, w.depth + 1
+                FROM walk w JOIN connections c ON {join}
+                WHERE w.depth < ?
+            )
+            SELECT m.id, MIN(w.depth), m.entity_name, m.entity_mode,
+                   m.event_description, m.timestamp
+            FROM walk w JOIN memories m ON m.id = w.id
+            WHERE w.id != ?
+            GROUP BY m.id
+            ORDER BY MIN(w.depth), m.timestamp DESC
+            LIMIT ?
+        """
+    
+    def get_lineage(self, memory_id: str, max_depth: int = 10,
+                    limit: int = 500) -> List[Dict]:
+        """Every ancestor of memory_id with a shortest chain to it, nearest first"""
+        rows = self.db.connection().execute(
+            LINEAGE_SQL, (memory_id, max_depth, limit)
+        ).fetchall()
+        
+        via = {ancestor_id: child for ancestor_id, _, child in rows}
+        lineage = []
+        for ancestor_id, depth, _ in rows:
+            path = [ancestor_id]
+            while path[-1] != memory_id:
+                path.append(via[path[-1]])
+            lineage.append({'id': ancestor_id, 'depth': depth, 'path': path})
+        return lineage
+    
+    def get_cross_mode_flows(self, max_depth: int = 3,
+                             limit: int = 50) -> List[Dict]:
+        """Knowledge that travelled from one mode to another, up to max_depth hops
+        
+        Newest destinations first. Targets are walked a page at a time, so
+        the work grows with the flows returned, not with the whole graph.
+        """
+        conn = self.db.connection()
+        rows, offset = [], 0
+        while len(rows) < limit:
+            targets = [row[0] for row in conn.execute(CROSS_MODE_TARGETS_SQL, (limit, offset))]
+            if not targets:
+                break
+            rows.extend(conn.execute(
+                CROSS_MODE_FLOWS_SQL, (json.dumps(targets), max_depth)
+            ).fetchall())
+            offset += len(targets)
+        
+        return [{
+            'from_id': row[0],
+            'to_id': row[1],
+            'depth': row[2],
+            'from_mode': row[3],
+            'to_mode': row[4],
+            'from': f"{row[3]}: {row[5][:50]}...",
+            'to': f"{row[4]}: {row[6][:50]}...",
+            'impact': row[7] or 'pending'
+        } for row in rows[:limit]]
     
     def capture_strategic_pivot(self):
         """Capture THIS conversation as our first organizational memory"""
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Journey I/O - Streaming NDJSON import and export of HealthJourney documents
+Each line is validated against journey_schema_v01.json and batch-inserted
+"""
+
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Union
+
+from quick_capture import JOURNEY_RECORD_SQL, JourneyRecord, QuickJourneyCapture
+from schema_validation import load_validator
+
+JOURNEY_SCHEMA_PATH = Path(__file__).parent / "schemas" / "journey_schema_v01.json"
+
+# Rows held in memory at once, and committed together
+IMPORT_BATCH_SIZE = 5000
+# Validation errors kept for the report - the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# Marks metadata written by the importer, so export can rebuild the document
+SCHEMA_NAME = "HealthJourney"
+
+
+@contextmanager
+def _open(target: Union[str, Path, IO], mode: str) -> Iterator[IO]:
+    if hasattr(target, 'read') or hasattr(target, 'write'):
+        yield target
+        return
+    with open(target, mode, encoding='utf-8') as f:
+        yield f
+
+
+def journey_row(document: Dict) -> tuple:
+    """Map a HealthJourney document onto journeys columns
+
+    Query, guidance and source become their own columns, context and
+    outcome keep their JSON, and everything else rides in metadata.
+    """
+    interaction = document['interaction']
+    metadata = {
+        'schema': SCHEMA_NAME,
+        'version': document['version'],
+        'consent': document['consent'],
+        'metadata': document.get('metadata', {}),
+    }
+    if 'similar_journeys_referenced' in interaction:
+        metadata['similar_journeys_referenced'] = interaction['similar_journeys_referenced']
+
+    outcome = document.get('outcome')
+    return (
+        document['id'],
+        document['timestamp'],
+        json.dumps(document['context'], separators=(',', ':')),
+        interaction['query'],
+        interaction['guidance'],
+        interaction['source'],
+        json.dumps(metadata, separators=(',', ':')),
+        json.dumps(outcome, separators=(',', ':')) if outcome is not None else None
+    )
+
+
+def journey_document(record: JourneyRecord) -> Optional[Dict]:
+    """Rebuild the HealthJourney document for an imported journey, else None"""
+    metadata = json.loads(record.metadata) if record.metadata else {}
+    if metadata.get('schema') != SCHEMA_NAME:
+        return None
+
+    interaction = {
+        'source': record.source,
+        'query': record.query,
+        'guidance': record.response
+    }
+    if 'similar_journeys_referenced' in metadata:
+        interaction['similar_journeys_referenced'] = metadata['similar_journeys_referenced']
+
+    document = {
+        'id': record.id,
+        'timestamp': record.timestamp,
+        'version': metadata['version'],
+        'context': record.context,
+        'interaction': interaction,
+        'consent': metadata['consent'],
+        'outcome': json.loads(record.outcome) if record.outcome else None
+    }
+    if metadata.get('metadata'):
+        document['metadata'] = metadata['metadata']
+    return document
+
+
+def import_journeys(source: Union[str, Path, IO], capture: Optional[QuickJourneyCapture] = None,
+                    strict: bool = False, batch_size: int = IMPORT_BATCH_SIZE) -> Dict:
+    """Stream NDJSON journeys into the database, one transaction per batch
+
+    Invalid lines are skipped and reported, or raise ValueError when
+    ``strict``. Journeys whose id is already stored are skipped, so a dump
+    can be re-imported safely.
+    """
+    capture = capture or QuickJourneyCapture()
+    validator = load_validator(JOURNEY_SCHEMA_PATH)
+    report = {'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    batch: List[tuple] = []
+
+    def invalid(line_number: int, message: str):
+        if strict:
+            raise ValueError(f"Line {line_number}: {message}")
+        report['invalid'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append(f"Line {line_number}: {message}")
+
+    def write():
+        conn = capture.db.connection()
+        ids = [row[0] for row in batch]
+        existing = set()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            existing.update(row[0] for row in conn.execute(
+                f"SELECT id FROM journeys WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        fresh, seen = [], set()
+        for row in batch:
+            if row[0] in existing or row[0] in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(row[0])
+            fresh.append(row)
+        if fresh:
+            capture.store.write_batch(fresh)
+        report['imported'] += len(fresh)
+        batch.clear()
+
+    with _open(source, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                document = json.loads(line)
+            except ValueError as e:
+                invalid(line_number, f"not JSON ({e})")
+                continue
+            if not validator.is_valid(document):
+                # Only failures are re-run for a readable message - and they
+                # are rejected even if that second opinion finds no error
+                message = "does not match the journey schema"
+                try:
+                    validator.validate(document)
+                except Exception as e:
+                    message = getattr(e, 'message', str(e))
+                invalid(line_number, message)
+                continue
+
+            batch.append(journey_row(document))
+            if len(batch) >= batch_size:
+                write()
+    if batch:
+        write()
+
+    return report
+
+
+def export_journeys(destination: Union[str, Path, IO], capture: Optional[QuickJourneyCapture] = None,
+                    since: Optional[str] = None) -> Dict:
+    """Stream imported journeys out as NDJSON, oldest first
+
+    Quick captures carry no consent or structured context, so they have
+    no HealthJourney form and are counted as skipped.
+    """
+    capture = capture or QuickJourneyCapture()
+    report = {'exported': 0, 'skipped': 0}
+
+    with _open(destination, 'w') as f, capture.db.read_transaction() as conn:
+        rows = conn.execute(
+            f"{JOURNEY_RECORD_SQL} WHERE j.timestamp >= ? ORDER BY j.timestamp", (since or '',)
+        )
+        for row in rows:
+            codec = capture.store.codec(row[8]) if row[8] is not None else None
+            document = journey_document(JourneyRecord(row, codec))
+            if document is None:
+                report['skipped'] += 1
+                continue
+            f.write(json.dumps(document, separators=(',', ':')) + "\n")
+            report['exported'] += 1
+
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ('import', 'export'):
+        print("Usage: journey_io.py import|export <file.ndjson>")
+        sys.exit(1)
+
+    command, path = sys.argv[1], sys.argv[2]
+    if command == 'import':
+        report = import_journeys(path)
+        print(f"📥 Imported {report['imported']} journeys "
+              f"({report['duplicates']} duplicates, {report['invalid']} invalid)")
+        for error in report['errors']:
+            print(f"   - {error}")
+    else:
+        report = export_journeys(path)
+        print(f"📤 Exported {report['exported']} journeys "
+              f"({report['skipped']} quick captures without a HealthJourney form)")
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Memory Graph - Persistent adjacency arrays for the organizational memory
+Synced incrementally by rowid so boot never rebuilds the whole graph
+"""
+
+import math
+import os
+import struct
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from artifact_writer import locked
+from db_connection import ConnectionManager
+from internal_memory import data_version, ensure_schema
+from memory_scoring import SIGNIFICANCE_CODES, MemoryScorer, np
+
+# Magic, then a random generation that changes whenever the file is rebuilt
+GRAPH_MAGIC = b'MGRAPH02'
+FILE_HEADER = struct.Struct('<8s8s')
+
+# One block per sync: sequence number, the data version it brings the graph
+# up to, cursors, counts, then the packed arrays and strings
+BLOCK_HEADER = struct.Struct('<4sIqqqIIII')
+BLOCK_TAG = b'BLK2'
+
+# Nodes referenced by an edge before their memory has been synced
+PLACEHOLDER = -1
+NO_MODE = 0xFFFF
+
+# Edge kinds - the memory that recorded the edge owns it for degree counts
+INFLUENCES, INFLUENCED_BY = 0, 1
+EDGE_KINDS = ('influences', 'influenced_by')
+
+NEW_MEMORIES_SQL = """
+    SELECT rowid, id, timestamp, entity_mode, event_significance
+    FROM memories WHERE rowid > ? ORDER BY rowid
+"""
+
+NEW_CONNECTIONS_SQL = """
+    SELECT rowid, from_memory, to_memory, connection_type
+    FROM connections WHERE rowid > ? ORDER BY rowid
+"""
+
+
+def _epoch(timestamp: str) -> float:
+    """ISO timestamp to epoch seconds, matching datetime.now() arithmetic"""
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+class MemoryGraph:
+    """Append-only graph artifact mirroring the memories and connections tables
+
+    Nodes and edges live in flat typed arrays indexed by node number. Each
+    sync appends one block holding only the rows added since the last
+    cursor, and only the nodes those rows touch have their weights
+    recomputed. Appends happen under the file's lock, after replaying any
+    blocks another process added. Any change other than new rows - a
+    deleted memory or edge - shows up in the data version and triggers a
+    rebuild.
+    """
+
+    def __init__(self, graph_path: Union[str, Path] = "MEMORY_GRAPH.bin",
+                 db_path: Union[str, Path] = "organizational_memory.db",
+                 scorer: Optional[MemoryScorer] = None):
+        self.graph_path = Path(graph_path)
+        self.db_path = Path(db_path)
+        self.scorer = scorer or MemoryScorer()
+        self.db = ConnectionManager.for_path(self.db_path)
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        """Empty in-memory state"""
+        self.memory_cursor = 0
+        self.connection_cursor = 0
+        self.memory_count = 0
+        self.sequence = 0
+        self.data_version = 0
+        self._generation: Optional[bytes] = None
+        self._offset = 0
+
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.timestamps = array('d')
+        self.significance = array('b')
+        self.modes = array('H')
+        self.mode_names: List[str] = []
+        self._mode_index: Dict[str, int] = {}
+
+        self.edge_from = array('I')
+        self.edge_to = array('I')
+        self.edge_kind = array('B')
+        self.degree = array('I')
+        self.out_edges: List[List[int]] = []
+        self.in_edges: List[List[int]] = []
+
+        # significance x connection boost - recency is applied at read time
+        self.base_weights = array('d')
+
+
+    def _load(self):
+        """Replay the artifact from disk"""
+        if not self.graph_path.exists():
+            return
+        with locked(self.graph_path):
+            self._catch_up()
+
+    def _catch_up(self):
+        """Replay blocks appended since this instance last read the file
+
+        Call with the lock held. A new generation means another process
+        rebuilt the file, so it is replayed from the start. A torn tail is
+        dropped; a block out of sequence means the file can't be trusted,
+        so it is removed and rebuilt on the next sync.
+        """
+        try:
+            f = open(self.graph_path, 'rb')
+        except FileNotFoundError:
+            if self.sequence:
+                self._reset()
+            return
+
+        with f:
+            header = f.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size or not header.startswith(GRAPH_MAGIC):
+                self._discard()
+                return
+            generation = header[len(GRAPH_MAGIC):]
+            if generation != self._generation:
+                self._reset()
+                self._generation = generation
+                self._offset = FILE_HEADER.size
+            f.seek(self._offset)
+            data = f.read()
+
+        offset = 0
+        while offset < len(data):
+            block = self._read_block(data, offset)
+            if block is None:
+                # Interrupted append - keep everything before it
+                with open(self.graph_path, 'r+b') as f:
+                    f.truncate(self._offset + offset)
+                break
+            offset, sequence, version, payload = block
+            if sequence != self.sequence:
+                # A repeated or missing block would double-count or lose edges
+                self._discard()
+                return
+            self._apply(*payload)
+            self.sequence += 1
+            self.data_version = version
+        self._offset += offset
+
+    def _discard(self):
+        """Drop the artifact and the state read from it"""
+        self.graph_path.unlink(missing_ok=True)
+        self._reset()
+
+    @staticmethod
+    def _read_block(data: bytes, offset: int) -> Optional[Tuple[int, int, int, tuple]]:
+        """Decode one block at offset - None if it is incomplete
+
+        Returns the offset after it, its sequence number and data version,
+        and the payload for _apply.
+        """
+        if offset + BLOCK_HEADER.size > len(data):
+            return None
+        (tag, sequence, version, memory_cursor, connection_cursor,
+         n_nodes, n_edges, ids_len, modes_len) = BLOCK_HEADER.unpack_from(data, offset)
+        if tag != BLOCK_TAG:
+            return None
+        offset += BLOCK_HEADER.size
+        size = n_nodes * (4 + 8 + 1 + 2) + ids_len + modes_len + n_edges * (2 * 4 + 1)
+        if offset + size > len(data):
+            return None
+
+        def take(typecode: str, count: int) -> array:
+            nonlocal offset
+            values = array(typecode)
+            size = values.itemsize * count
+            values.frombytes(data[offset:offset + size])
+            offset += size
+            return values
+
+        def take_strings(size: int) -> List[str]:
+            nonlocal offset
+            raw = data[offset:offset + size]
+            offset += size
+            return raw.decode('utf-8').split('\n') if size else []
+
+        node_index = take('I', n_nodes)
+        timestamps = take('d', n_nodes)
+        significance = take('b', n_nodes)
+        modes = take('H', n_nodes)
+        ids = take_strings(ids_len)
+        mode_names = take_strings(modes_len)
+        edges = take('I', n_edges * 2)
+        kinds = take('B', n_edges)
+
+        payload = (memory_cursor, connection_cursor, node_index, timestamps,
+                   significance, modes, ids, mode_names, edges, kinds)
+        return offset, sequence, version, payload
+
+    @staticmethod
+    def _pack_block(sequence, version, memory_cursor, connection_cursor, node_index, timestamps,
+                    significance, modes, ids, mode_names, edges, kinds) -> bytes:
+        """Encode one block - the inverse of _read_block"""
+        ids_bytes = '\n'.join(ids).encode('utf-8')
+        modes_bytes = '\n'.join(mode_names).encode('utf-8')
+        header = BLOCK_HEADER.pack(
+            BLOCK_TAG, sequence, version, memory_cursor, connection_cursor,
+            len(node_index), len(kinds), len(ids_bytes), len(modes_bytes)
+        )
+        return b''.join([
+            header, node_index.tobytes(), timestamps.tobytes(),
+            significance.tobytes(), modes.tobytes(), ids_bytes, modes_bytes,
+            edges.tobytes(), kinds.tobytes()
+        ])
+
+
+    def sync(self) -> Dict[str, int]:
+        """Append memories and connections added since the last sync"""
+        if not self.db_path.exists():
+            return {'nodes': 0, 'edges': 0}
+        ensure_schema(self.db)
+
+        with locked(self.graph_path):
+            self._catch_up()
+
+            with self.db.read_transaction() as conn:
+                version = data_version(conn)
+                if self.sequence and version == self.data_version:
+                    return {'nodes': 0, 'edges': 0}
+
+                memory_rows = conn.execute(NEW_MEMORIES_SQL, (self.memory_cursor,)).fetchall()
+                connection_rows = conn.execute(NEW_CONNECTIONS_SQL, (self.connection_cursor,)).fetchall()
+
+                # Each changed row bumps the version once - anything beyond
+                # the new rows was a delete or update of rows already synced
+                if self.sequence and version != self.data_version + len(memory_rows) + len(connection_rows):
+                    self._discard()
+                    memory_rows = conn.execute(NEW_MEMORIES_SQL, (0,)).fetchall()
+                    connection_rows = conn.execute(NEW_CONNECTIONS_SQL, (0,)).fetchall()
+
+            if not memory_rows and not connection_rows:
+                return {'nodes': 0, 'edges': 0}
+
+            payload = self._encode_rows(memory_rows, connection_rows)
+            block = self._pack_block(self.sequence, version, *payload)
+
+            new_file = not self.graph_path.exists()
+            with open(self.graph_path, 'ab') as f:
+                if new_file:
+                    self._generation = os.urandom(8)
+                    self._offset = FILE_HEADER.size
+                    f.write(FILE_HEADER.pack(GRAPH_MAGIC, self._generation))
+                f.write(block)
+
+            self._apply(*payload)
+            self.sequence += 1
+            self.data_version = version
+            self._offset += len(block)
+
+        return {'nodes': len(memory_rows), 'edges': len(connection_rows)}
+
+    def _encode_rows(self, memory_rows, connection_rows) -> tuple:
+        """Turn new table rows into a block payload, assigning node numbers"""
+        node_index, timestamps = array('I'), array('d')
+        significance, modes = array('b'), array('H')
+        ids, mode_names = [], []
+        pending: Dict[str, int] = {}
+        next_index = len(self.ids)
+
+        def node_for(memory_id: str) -> int:
+            nonlocal next_index
+            if memory_id in self.index:
+                return self.index[memory_id]
+            if memory_id not in pending:
+                pending[memory_id] = next_index
+                next_index += 1
+            return pending[memory_id]
+
+        def mode_for(mode: str) -> int:
+            if mode in self._mode_index:
+                return self._mode_index[mode]
+            if mode not in mode_names:
+                mode_names.append(mode)
+            return len(self.mode_names) + mode_names.index(mode)
+
+        memory_cursor = self.memory_cursor
+        for rowid, memory_id, timestamp, mode, sig in memory_rows:
+            node_index.append(node_for(memory_id))
+            timestamps.append(_epoch(timestamp))
+            significance.append(SIGNIFICANCE_CODES.get(sig or 'routine', 0))
+            modes.append(mode_for(mode))
+            ids.append(memory_id)
+            memory_cursor = rowid
+
+        edges, kinds = array('I'), array('B')
+        connection_cursor = self.connection_cursor
+        known = set(ids)
+        for rowid, from_id, to_id, connection_type in connection_rows:
+            for endpoint in (from_id, to_id):
+                if endpoint not in self.index and endpoint not in known:
+                    known.add(endpoint)
+                    node_index.append(node_for(endpoint))
+                    timestamps.append(math.nan)
+                    significance.append(PLACEHOLDER)
+                    modes.append(NO_MODE)
+                    ids.append(endpoint)
+            edges.extend((node_for(from_id), node_for(to_id)))
+            kinds.append(INFLUENCES if connection_type == 'influences' else INFLUENCED_BY)
+            connection_cursor = rowid
+
+        return (memory_cursor, connection_cursor, node_index, timestamps,
+                significance, modes, ids, mode_names, edges, kinds)
+
+    def _apply(self, memory_cursor, connection_cursor, node_index, timestamps,
+               significance, modes, ids, mode_names, edges, kinds):
+        """Merge one block into the arrays and refresh affected weights"""
+        for name in mode_names:
+            self._mode_index[name] = len(self.mode_names)
+            self.mode_names.append(name)
+
+        affected = set()
+        for i, node in enumerate(node_index):
+            if node == len(self.ids):
+                self.ids.append(ids[i])
+                self.index[ids[i]] = node
+                self.timestamps.append(timestamps[i])
+                self.significance.append(significance[i])
+                self.modes.append(modes[i])
+                self.degree.append(0)
+                self.base_weights.append(0.0)
+                self.out_edges.append([])
+                self.in_edges.append([])
+            elif significance[i] != PLACEHOLDER:
+                # A placeholder's memory arrived - its edges gain a mode
+                self.timestamps[node] = timestamps[i]
+                self.significance[node] = significance[i]
+                self.modes[node] = modes[i]
+            if significance[i] != PLACEHOLDER:
+                self.memory_count += 1
+            affected.add(node)
+
+        for e, kind in enumerate(kinds):
+            source, target = edges[2 * e], edges[2 * e + 1]
+            edge = len(self.edge_kind)
+            self.edge_from.append(source)
+            self.edge_to.append(target)
+            self.edge_kind.append(kind)
+            self.out_edges[source].append(edge)
+            self.in_edges[target].append(edge)
+
+            owner = source if kind == INFLUENCES else target
+            self.degree[owner] += 1
+            affected.add(owner)
+
+        for node in affected:
+            self._refresh_weight(node)
+
+        self.memory_cursor = memory_cursor
+        self.connection_cursor = connection_cursor
+
+    def _refresh_weight(self, node: int):
+        """Recompute the time-independent part of one node's weight"""
+        self.base_weights[node] = self.scorer.base_weight(self.significance[node], self.degree[node])
+
+
+    def __contains__(self, memory_id: str) -> bool:
+        """True once the memory itself has been synced, not just referenced"""
+        node = self.index.get(memory_id)
+        return node is not None and self.significance[node] != PLACEHOLDER
+
+    def __len__(self) -> int:
+        """Number of nodes, placeholders included"""
+        return len(self.ids)
+
+    def weight(self, memory_id: str, now: Optional[float] = None) -> float:
+        """Importance weight - significance, connection and recency boosts"""
+        node = self.index[memory_id]
+        now = time.time() if now is None else now
+        age_hours = (now - self.timestamps[node]) / 3600
+        return self.base_weights[node] * self.scorer.recency_boost(age_hours)
+
+    def weights(self, memory_ids: Sequence[str], now: Optional[float] = None) -> List[float]:
+        """weight() for many memories in one vectorized pass"""
+        nodes = [self.index[m] for m in memory_ids]
+        return [float(w) for w in self._weights(nodes, now)]
+
+    def top_memories(self, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The k highest-weighted memories across the whole graph"""
+        scores = self._weights(None, now)
+        return [(self.ids[node], float(scores[node])) for node in self.scorer.top_k(scores, k)]
+
+    def _weights(self, nodes: Optional[List[int]], now: Optional[float]):
+        """Current weights for the given nodes, or all of them, straight off the arrays"""
+        now = time.time() if now is None else now
+        if np is None:
+            nodes = range(len(self.ids)) if nodes is None else nodes
+            return [self.base_weights[n] * self.scorer.recency_boost((now - self.timestamps[n]) / 3600)
+                    for n in nodes]
+
+        base = np.frombuffer(self.base_weights, dtype=np.float64)
+        epochs = np.frombuffer(self.timestamps, dtype=np.float64)
+        if nodes is not None:
+            base, epochs = base[nodes], epochs[nodes]
+        # Placeholders have a NaN timestamp but a zero base weight
+        with np.errstate(invalid='ignore'):
+            return base * self.scorer.recency_boosts((now - epochs) / 3600)
+
+    def edges_between(self, memory_ids) -> Iterator[Dict[str, str]]:
+        """Edges whose ends are both in memory_ids, as the boot graph lists them"""
+        nodes = {self.index[m]: None for m in memory_ids if m in self.index}
+        for node in nodes:
+            for edge in self.out_edges[node]:
+                target = self.edge_to[edge]
+                if target in nodes:
+                    yield {
+                        'from': self.ids[node],
+                        'to': self.ids[target],
+                        'type': EDGE_KINDS[self.edge_kind[edge]]
+                    }
@@ -5,61 +5,229 @@ Target: <30 second full context load
 """
 
 import json
-import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
-import concurrent.futures
+from typing import Dict, Iterator, List, Optional, Set
 import time
+from artifact_writer import write_json_artifact
+from boot_profiler import span
+from db_connection import ConnectionManager
+from internal_memory import data_version, ensure_schema
+from memory_graph import MemoryGraph
+from memory_scoring import MemoryScorer
+
+# Only the columns boot needs - memory_json is never read or decoded at boot
+MEMORY_SUMMARY_COLUMNS = """
+    id, timestamp, entity_type, entity_name, entity_mode,
+    event_type, event_category, event_description, event_significance,
+    project, insight, outcome_status, outcome_impact, influences, influenced_by
+"""
+
+# Boot slices - each CTE is served by an index from internal_memory.MIGRATIONS
+# and keeps its own ORDER BY/LIMIT, so a slice never crowds out another
+BOOT_MEMORIES_SQL = """
+    WITH recent AS (
+        SELECT id FROM memories
+        WHERE timestamp > :since
+        ORDER BY timestamp DESC LIMIT 20
+    ),
+    mode_specific AS (
+        SELECT id FROM memories
+        WHERE entity_mode = :mode
+        ORDER BY timestamp DESC LIMIT 15
+    ),
+    project_specific AS (
+        SELECT id FROM memories
+        WHERE project = :project
+        ORDER BY timestamp DESC LIMIT 15
+    ),
+    high_significance AS (
+        -- The partial index is already in timestamp order, so LIMIT stops the walk
+        SELECT id FROM memories INDEXED BY idx_memories_significant_timestamp
+        WHERE event_significance IN ('critical', 'notable')
+        ORDER BY timestamp DESC LIMIT 10
+    ),
+    seeds(id) AS (
+        SELECT id FROM recent
+        UNION ALL SELECT id FROM mode_specific
+        UNION ALL SELECT id FROM project_specific
+        UNION ALL SELECT id FROM high_significance
+    ),
+    seed_edges(from_memory, to_memory) AS (
+        -- Edges touching the bounded seed set, looked up from either end
+        SELECT c.from_memory, c.to_memory FROM seeds s
+        JOIN connections c ON c.from_memory = s.id
+        UNION ALL
+        SELECT c.from_memory, c.to_memory FROM seeds s
+        JOIN connections c ON c.to_memory = s.id
+    ),
+    cross_mode_flows AS (
+        -- Both ends of those edges whose memories sit in different modes
+        SELECT id FROM memories
+        WHERE id IN (
+            SELECT e.from_memory FROM seed_edges e
+            JOIN memories a ON a.id = e.from_memory
+            JOIN memories b ON b.id = e.to_memory
+            WHERE a.entity_mode != b.entity_mode
+            UNION ALL
+            SELECT e.to_memory FROM seed_edges e
+            JOIN memories a ON a.id = e.from_memory
+            JOIN memories b ON b.id = e.to_memory
+            WHERE a.entity_mode != b.entity_mode
+        )
+        ORDER BY timestamp DESC LIMIT 20
+    ),
+    slices(slice_id, slice) AS (
+        SELECT id, 'recent' FROM recent
+        UNION ALL SELECT id, 'mode_specific' FROM mode_specific
+        UNION ALL SELECT id, 'project_specific' FROM project_specific
+        UNION ALL SELECT id, 'high_significance' FROM high_significance
+        UNION ALL SELECT id, 'cross_mode_flows' FROM cross_mode_flows
+    )
+    SELECT """ + MEMORY_SUMMARY_COLUMNS + """, slice_names FROM memories
+    JOIN (
+        SELECT slice_id, group_concat(slice) AS slice_names
+        FROM slices GROUP BY slice_id
+    ) ON id = slice_id
+    ORDER BY timestamp DESC
+"""
+
+BOOT_SLICES = ('recent', 'mode_specific', 'project_specific',
+               'high_significance', 'cross_mode_flows')
+
+# Cached summaries older than this are rebuilt - the recent slice moves with time
+CACHE_MAX_AGE = timedelta(hours=1)
+CACHE_VERSION = 2
+
+
+def _json_list(value: Optional[str]) -> List:
+    """Decode a stored JSON array column, skipping the common empty case"""
+    if not value or value == '[]':
+        return []
+    return json.loads(value)
+
+
+class MemoryRecord:
+    """Slotted, flat view of one memory - just the MEMORY_SUMMARY_COLUMNS"""
+    
+    __slots__ = (
+        'id', 'timestamp', 'entity_type', 'entity_name', 'entity_mode',
+        'event_type', 'event_category', 'description', 'significance',
+        'project', 'insight', 'outcome_status', 'outcome_impact',
+        'influences', 'influenced_by'
+    )
+    
+    def __init__(self, id, timestamp, entity_type, entity_name, entity_mode,
+                 event_type, event_category, description, significance,
+                 project, insight, outcome_status, outcome_impact,
+                 influences, influenced_by):
+        self.id = id
+        self.timestamp = timestamp
+        self.entity_type = entity_type
+        self.entity_name = entity_name
+        self.entity_mode = entity_mode
+        self.event_type = event_type
+        self.event_category = event_category
+        self.description = description
+        self.significance = significance or 'routine'
+        self.project = project
+        self.insight = insight
+        self.outcome_status = outcome_status
+        self.outcome_impact = outcome_impact
+        self.influences = influences
+        self.influenced_by = influenced_by
+    
+    @classmethod
+    def from_row(cls, row) -> 'MemoryRecord':
+        """Build from a MEMORY_SUMMARY_COLUMNS row"""
+        record = cls(*row)
+        record.influences = _json_list(record.influences)
+        record.influenced_by = _json_list(record.influenced_by)
+        return record
+    
+    @classmethod
+    def from_memory(cls, memory: Dict) -> 'MemoryRecord':
+        """Build from a full memory document"""
+        entity, event = memory['entity'], memory['event']
+        connections = memory.get('connections', {})
+        return cls(
+            memory['id'], memory['timestamp'],
+            entity['type'], entity['name'], entity['mode'],
+            event['type'], event['category'], event['description'], event.get('significance'),
+            memory.get('context', {}).get('project'),
+            memory.get('content', {}).get('insight'),
+            memory.get('outcome', {}).get('status'),
+            memory.get('outcome', {}).get('impact'),
+            connections.get('influences', []),
+            connections.get('influenced_by', [])
+        )
+    
+    @property
+    def entity(self) -> str:
+        """Display label, e.g. 'Pompey (CTO)'"""
+        return f"{self.entity_name} ({self.entity_mode})"
+    
+    @property
+    def degree(self) -> int:
+        """Number of influences and influenced_by connections"""
+        return len(self.influences) + len(self.influenced_by)
+    
+    def __repr__(self) -> str:
+        return f"MemoryRecord({self.id!r}, {self.entity!r}, {self.description[:40]!r})"
+
 
 class MemoryLoader:
     """Lightning-fast memory restoration for session start"""
     
-    def __init__(self):
+    def __init__(self, weights: Optional[Dict] = None):
+        self.scorer = MemoryScorer(weights)
         self.db_path = Path("organizational_memory.db")
         self.cache_path = Path("MEMORY_CACHE.json")
         self.context_path = Path("MEMORY_CONTEXT.json")
+        self.graph_path = Path("MEMORY_GRAPH.bin")
+        self.db = ConnectionManager.for_path(self.db_path)
+        self._graph: Optional[MemoryGraph] = None
         
-    def load_session_context(self) -> Dict:
+    def load_session_context(self, use_cache: bool = True) -> Dict:
         """Primary entry point - loads all relevant memories in <30s"""
         start_time = datetime.now()
         
         print("🔄 Loading organizational memories...")
         
-        # Phase 1: Load current context markers (1-2s)
-        context_markers = self._load_context_markers()
+        # Phase 1: Load current context markers
+        with span('markers'):
+            context_markers = self._load_context_markers()
         print(f"  ✓ Context markers loaded: mode={context_markers.get('current_mode')}, project={context_markers.get('active_project')}")
         
-        # Phase 2: Parallel memory retrieval (5-10s)
-        memories = {}
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            # Submit all queries in parallel
-            futures = {
-                'recent': executor.submit(self._load_recent_memories),
-                'mode_specific': executor.submit(self._load_mode_memories, context_markers.get('current_mode')),
-                'project_specific': executor.submit(self._load_project_memories, context_markers.get('active_project')),
-                'high_significance': executor.submit(self._load_significant_memories),
-                'cross_mode_flows': executor.submit(self._load_cross_mode_connections)
-            }
-            
-            # Collect results
-            for key, future in futures.items():
-                try:
-                    memories[key] = future.result()
-                    print(f"  ✓ Loaded {key} memories: {len(memories[key])} items")
-                except Exception as e:
-                    print(f"  ⚠ Failed to load {key}: {e}")
-                    memories[key] = []
-        
-        # Phase 3: Build memory graph (2-3s)
-        memory_graph = self._build_memory_graph(memories)
+        # Taken before reading so writes that race the load invalidate the cache
+        with span('cache_check'):
+            snapshot = self._database_snapshot()
+            cached = self._load_cached_summary(context_markers, snapshot) if use_cache else None
+        if cached is not None:
+            elapsed = (datetime.now() - start_time).total_seconds() * 1000
+            print(f"⚡ Memory context restored from cache in {elapsed:.0f} ms")
+            return cached
+        
+        # Phase 2: Every memory slice in one round trip - a broken schema
+        # raises here rather than booting with an empty context
+        with span('memory_query'):
+            memories = self._load_boot_memories(context_markers)
+        for key, memory_list in memories.items():
+            print(f"  ✓ Loaded {key} memories: {len(memory_list)} items")
+        
+        # Phase 3: Build memory graph
+        with span('graph_build'):
+            memory_graph = self._build_memory_graph(memories)
         print(f"  ✓ Memory graph built: {len(memory_graph['nodes'])} nodes, {len(memory_graph['edges'])} edges")
         
-        # Phase 4: Generate context summary (2-3s)
-        context_summary = self._generate_context_summary(memory_graph)
+        # Phase 4: Generate context summary
+        with span('summary'):
+            context_summary = self._generate_context_summary(memory_graph)
         
-        # Phase 5: Cache for next session (1s)
-        self._update_cache(context_summary)
+        # Phase 5: Cache for next session
+        with span('cache_write'):
+            self._update_cache(context_summary, context_markers, snapshot)
         
         elapsed = (datetime.now() - start_time).total_seconds()
         print(f"✨ Memory context loaded in {elapsed:.1f} seconds")
@@ -98,79 +266,33 @@ class MemoryLoader:
         
         return markers
     
-    def _load_recent_memories(self, hours: int = 24) -> List[Dict]:
-        """Load memories from recent timeframe"""
-        if not self.db_path.exists():
-            return []
-            
-        conn = sqlite3.connect(self.db_path)
-        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
-        
-        results = conn.execute("""
-            SELECT memory_json FROM memories 
-            WHERE timestamp > ? 
-            ORDER BY timestamp DESC 
-            LIMIT 20
-        """, (cutoff,)).fetchall()
-        
-        conn.close()
-        return [json.loads(row[0]) for row in results]
-    
-    def _load_mode_memories(self, mode: Optional[str]) -> List[Dict]:
-        """Load memories specific to current mode"""
-        if not mode or not self.db_path.exists():
-            return []
-            
-        conn = sqlite3.connect(self.db_path)
-        results = conn.execute("""
-            SELECT memory_json FROM memories 
-            WHERE entity_mode = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 15
-        """, (mode,)).fetchall()
-        
-        conn.close()
-        return [json.loads(row[0]) for row in results]
-    
-    def _load_project_memories(self, project: Optional[str]) -> List[Dict]:
-        """Load memories related to active project"""
-        if not project or not self.db_path.exists():
-            return []
-            
-        conn = sqlite3.connect(self.db_path)
-        results = conn.execute("""
-            SELECT memory_json FROM memories 
-            WHERE project = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 15
-        """, (project,)).fetchall()
-        
-        conn.close()
-        return [json.loads(row[0]) for row in results]
-    
-    def _load_significant_memories(self) -> List[Dict]:
-        """Load memories marked as critical or notable"""
-        if not self.db_path.exists():
-            return []
-            
-        conn = sqlite3.connect(self.db_path)
-        results = conn.execute("""
-            SELECT memory_json FROM memories 
-            WHERE event_significance IN ('critical', 'notable')
-            ORDER BY timestamp DESC 
-            LIMIT 10
-        """).fetchall()
-        
-        conn.close()
-        return [json.loads(row[0]) for row in results]
-    
-    def _load_cross_mode_connections(self) -> List[Dict]:
-        """Load memories that show cross-mode knowledge flow"""
+    def _load_boot_memories(self, context_markers: Dict, hours: int = 24) -> Dict[str, List[Dict]]:
+        """Load every boot slice with a single query, deduplicated in SQL
+        
+        Each memory is decoded once and shared by all the slices it
+        belongs to, newest first within each slice.
+        """
+        memories = {key: [] for key in BOOT_SLICES}
         if not self.db_path.exists():
-            return []
-            
-        # For now, return empty - will implement connection tracking
-        return []
+            return memories
+        
+        # A database last opened by an older writer still needs its v3 columns
+        ensure_schema(self.db)
+        
+        params = {
+            'since': (datetime.now() - timedelta(hours=hours)).isoformat(),
+            'mode': context_markers.get('current_mode'),
+            'project': context_markers.get('active_project')
+        }
+        with self.db.read_transaction() as conn:
+            rows = conn.execute(BOOT_MEMORIES_SQL, params).fetchall()
+        
+        for row in rows:
+            memory = MemoryRecord.from_row(row[:-1])
+            for key in row[-1].split(','):
+                memories[key].append(memory)
+        
+        return memories
     
     def _build_memory_graph(self, memories: Dict[str, List]) -> Dict:
         """Build interconnected memory graph showing knowledge flows"""
@@ -180,110 +302,99 @@ class MemoryLoader:
             'clusters': {}
         }
         
-        # Aggregate all unique memories
-        seen_ids = set()
-        all_memories = []
-        for category, memory_list in memories.items():
+        # Aggregate all unique memories - slices share one record per memory
+        for memory_list in memories.values():
             for memory in memory_list:
-                if memory['id'] not in seen_ids:
-                    seen_ids.add(memory['id'])
-                    all_memories.append(memory)
+                graph['nodes'][memory.id] = memory
+        all_memories = list(graph['nodes'].values())
         
-        # Build nodes
-        for memory in all_memories:
-            graph['nodes'][memory['id']] = {
-                'memory': memory,
-                'connections': memory.get('connections', {}),
-                'weight': self._calculate_memory_weight(memory)
-            }
+        with span('graph_sync'):
+            store = self._sync_graph_store()
+        now = time.time()
+        
+        # Weights come from the persistent graph when it has them
+        if store is not None and all(memory.id in store for memory in all_memories):
+            weights = store.weights([memory.id for memory in all_memories], now)
+        else:
+            weights = self.scorer.score_memories(all_memories)
+        graph['weights'] = dict(zip(graph['nodes'], weights))
         
         # Build edges (knowledge flows)
-        for memory_id, node in graph['nodes'].items():
-            # Influences edges
-            for influenced_id in node['connections'].get('influences', []):
+        if store is not None:
+            graph['edges'] = list(store.edges_between(graph['nodes']))
+            return graph
+        
+        for memory in all_memories:
+            for influenced_id in memory.influences:
                 if influenced_id in graph['nodes']:
-                    graph['edges'].append({
-                        'from': memory_id,
-                        'to': influenced_id,
-                        'type': 'influences'
-                    })
-            
-            # Influenced by edges
-            for influenced_by_id in node['connections'].get('influenced_by', []):
+                    graph['edges'].append({'from': memory.id, 'to': influenced_id, 'type': 'influences'})
+            for influenced_by_id in memory.influenced_by:
                 if influenced_by_id in graph['nodes']:
-                    graph['edges'].append({
-                        'from': influenced_by_id,
-                        'to': memory_id,
-                        'type': 'influenced_by'
-                    })
+                    graph['edges'].append({'from': influenced_by_id, 'to': memory.id, 'type': 'influenced_by'})
         
         return graph
     
-    def _calculate_memory_weight(self, memory: Dict) -> float:
+    def _sync_graph_store(self) -> Optional[MemoryGraph]:
+        """Bring MEMORY_GRAPH.bin up to date with the database, appending only new rows"""
+        try:
+            if self._graph is None:
+                self._graph = MemoryGraph(self.graph_path, self.db_path, self.scorer)
+            added = self._graph.sync()
+            if added['nodes'] or added['edges']:
+                print(f"  ✓ Memory graph synced: +{added['nodes']} nodes, +{added['edges']} edges")
+            return self._graph
+        except Exception as e:
+            print(f"  ⚠ Memory graph unavailable, rebuilding in memory: {e}")
+            self._graph = None
+            return None
+    
+    def _calculate_memory_weight(self, memory: MemoryRecord) -> float:
         """Calculate importance weight of a memory"""
-        weight = 1.0
-        
-        # Significance multiplier
-        significance = memory['event'].get('significance', 'routine')
-        if significance == 'critical':
-            weight *= 3.0
-        elif significance == 'notable':
-            weight *= 2.0
-        
-        # Recency boost
-        timestamp = datetime.fromisoformat(memory['timestamp'])
-        age_hours = (datetime.now() - timestamp).total_seconds() / 3600
-        if age_hours < 24:
-            weight *= 1.5
-        elif age_hours < 72:
-            weight *= 1.2
-        
-        # Connection boost
-        connections = memory.get('connections', {})
-        total_connections = len(connections.get('influences', [])) + len(connections.get('influenced_by', []))
-        weight *= (1 + total_connections * 0.1)
-        
-        return weight
+        return self.scorer.score_memories([memory])[0]
     
     def _generate_context_summary(self, memory_graph: Dict) -> Dict:
         """Generate actionable context summary for session start"""
+        nodes = memory_graph['nodes']
+        weights = memory_graph['weights']
         summary = {
             'timestamp': datetime.now().isoformat(),
-            'total_memories': len(memory_graph['nodes']),
+            'total_memories': len(nodes),
             'key_insights': [],
             'active_patterns': [],
             'cross_mode_flows': [],
             'recommended_focus': [],
-            'memory_graph': memory_graph  # Include for debugging
+            # Ids and weights only - bodies stay in the database
+            'memory_graph': {
+                'nodes': {memory_id: round(weights[memory_id], 4) for memory_id in nodes},
+                'edges': [[edge['from'], edge['to'], edge['type']] for edge in memory_graph['edges']]
+            }
         }
         
         # Extract key insights from high-weight memories
-        sorted_memories = sorted(
-            memory_graph['nodes'].values(),
-            key=lambda x: x['weight'],
-            reverse=True
-        )[:10]
-        
-        for node in sorted_memories:
-            memory = node['memory']
-            if memory.get('content', {}).get('insight'):
+        records = list(nodes.values())
+        top = self.scorer.top_k([weights[memory.id] for memory in records], 10)
+        
+        for memory in (records[i] for i in top):
+            if memory.insight:
                 summary['key_insights'].append({
-                    'insight': memory['content']['insight'],
-                    'entity': f"{memory['entity']['name']} ({memory['entity']['mode']})",
-                    'significance': memory['event'].get('significance', 'routine'),
-                    'timestamp': memory['timestamp'],
-                    'project': memory.get('context', {}).get('project')
+                    'id': memory.id,
+                    'weight': round(weights[memory.id], 4),
+                    'insight': memory.insight,
+                    'entity': memory.entity,
+                    'significance': memory.significance,
+                    'timestamp': memory.timestamp,
+                    'project': memory.project
                 })
         
         # Identify cross-mode knowledge flows
         mode_transitions = {}
         for edge in memory_graph['edges']:
-            if edge['from'] in memory_graph['nodes'] and edge['to'] in memory_graph['nodes']:
-                from_node = memory_graph['nodes'][edge['from']]
-                to_node = memory_graph['nodes'][edge['to']]
+            if edge['from'] in nodes and edge['to'] in nodes:
+                from_memory = nodes[edge['from']]
+                to_memory = nodes[edge['to']]
                 
-                from_mode = from_node['memory']['entity']['mode']
-                to_mode = to_node['memory']['entity']['mode']
+                from_mode = from_memory.entity_mode
+                to_mode = to_memory.entity_mode
                 
                 if from_mode != to_mode:
                     flow_key = f"{from_mode} → {to_mode}"
@@ -291,9 +402,11 @@ class MemoryLoader:
                         mode_transitions[flow_key] = []
                     
                     mode_transitions[flow_key].append({
-                        'from': f"{from_mode}: {from_node['memory']['event']['description'][:50]}...",
-                        'to': f"{to_mode}: {to_node['memory']['event']['description'][:50]}...",
-                        'impact': to_node['memory'].get('outcome', {}).get('impact', 'pending')
+                        'from_id': from_memory.id,
+                        'to_id': to_memory.id,
+                        'from': f"{from_mode}: {from_memory.description[:50]}...",
+                        'to': f"{to_mode}: {to_memory.description[:50]}...",
+                        'impact': to_memory.outcome_impact or 'pending'
                     })
         
         # Add top cross-mode flows
@@ -314,16 +427,75 @@ class MemoryLoader:
         
         return summary
     
-    def _update_cache(self, context_summary: Dict):
+    def _database_snapshot(self) -> Dict:
+        """Change marker for the memory database - its trigger-kept data version
+        
+        File sizes and mtimes are no use here: the WAL checkpoint when the
+        last connection closes rewrites the file without changing the data.
+        """
+        if not self.db_path.exists():
+            return {'data_version': None}
+        ensure_schema(self.db)
+        return {'data_version': data_version(self.db.connection())}
+    
+    @contextmanager
+    def keep_cache(self) -> Iterator[None]:
+        """Writes made inside this block leave the boot cache valid
+        
+        For writes that don't change what boot should show, such as the
+        boot memory itself. The cache is re-keyed only if nothing else
+        changed the database since it was built - the version is read before
+        and after inside one write transaction, so no other writer can land
+        in between.
+        """
+        ensure_schema(self.db)
+        with self.db.transaction() as conn:
+            before = data_version(conn)
+            yield
+            after = data_version(conn)
+        
+        try:
+            with open(self.cache_path) as f:
+                cache_data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache_data.get('version') == CACHE_VERSION and cache_data.get('snapshot') == {'data_version': before}:
+            cache_data['snapshot'] = {'data_version': after}
+            write_json_artifact(self.cache_path, cache_data)
+    
+    def _load_cached_summary(self, context_markers: Dict, snapshot: Dict) -> Optional[Dict]:
+        """Cached summary if the database and context are unchanged, else None"""
+        if not self.cache_path.exists():
+            return None
+        
+        try:
+            with open(self.cache_path) as f:
+                cache_data = json.load(f)
+            cached_at = datetime.fromisoformat(cache_data['timestamp'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        
+        if (cache_data.get('version') != CACHE_VERSION
+                or cache_data.get('snapshot') != snapshot
+                or cache_data.get('context_markers') != context_markers
+                or datetime.now() - cached_at > CACHE_MAX_AGE):
+            return None
+        
+        return cache_data.get('summary')
+    
+    def _update_cache(self, context_summary: Dict, context_markers: Dict, snapshot: Dict):
         """Cache summary for faster subsequent loads"""
         cache_data = {
+            'version': CACHE_VERSION,
             'timestamp': datetime.now().isoformat(),
+            'snapshot': snapshot,
+            'context_markers': context_markers,
             'summary': context_summary
         }
         
         try:
-            with open(self.cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            # The timestamp is compared too - it is what keeps the cache fresh
+            write_json_artifact(self.cache_path, cache_data)
         except Exception as e:
             print(f"  ⚠ Cache update failed: {e}")
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Memory Scoring - Vectorized importance weights and top-k selection
+Uses NumPy when installed, with a pure-Python fallback
+"""
+
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIGNIFICANCE_CODES = {'routine': 0, 'notable': 1, 'critical': 2}
+
+DEFAULT_WEIGHTS = {
+    # Multiplier per event significance
+    'significance': {'routine': 1.0, 'notable': 2.0, 'critical': 3.0},
+    # (max age in hours, boost) - the first bracket a memory falls in wins
+    'recency': ((24, 1.5), (72, 1.2)),
+    # Extra weight per influences/influenced_by connection
+    'connection': 0.1,
+}
+
+
+class MemoryScorer:
+    """Weights memories as significance x recency x connection boosts
+
+    Inputs are parallel sequences - significance codes (negative for
+    unknown memories, which score zero), connection counts and either
+    epoch seconds or ISO timestamps - scored in one pass.
+    """
+
+    def __init__(self, weights: Optional[Dict] = None):
+        weights = weights or {}
+        self.weights = dict(DEFAULT_WEIGHTS, **weights)
+        # Tables merge one level deep - overriding one significance keeps the rest
+        for key, default in DEFAULT_WEIGHTS.items():
+            if isinstance(default, dict) and key in weights:
+                self.weights[key] = dict(default, **weights[key])
+        significance = self.weights['significance']
+        self.significance_table = [
+            significance.get(name, 1.0)
+            for name, _ in sorted(SIGNIFICANCE_CODES.items(), key=lambda item: item[1])
+        ]
+        self.recency = tuple(self.weights['recency'])
+        self.connection = self.weights['connection']
+
+    def base_weight(self, code: int, degree: int) -> float:
+        """Time-independent part of one weight - significance x connections"""
+        if code < 0:
+            return 0.0
+        return self.significance_table[code] * (1 + degree * self.connection)
+
+    def recency_boost(self, age_hours: float) -> float:
+        """Boost for one memory of the given age"""
+        for max_age, boost in self.recency:
+            if age_hours < max_age:
+                return boost
+        return 1.0
+
+    def base_weights(self, codes: Sequence[int], degrees: Sequence[int]):
+        """base_weight for every memory at once"""
+        if np is None:
+            return [self.base_weight(c, d) for c, d in zip(codes, degrees)]
+
+        codes = np.asarray(codes, dtype=np.int64)
+        table = np.asarray(self.significance_table)
+        significance = np.where(codes < 0, 0.0, table[np.clip(codes, 0, None)])
+        return significance * (1 + np.asarray(degrees, dtype=np.float64) * self.connection)
+
+    def recency_boosts(self, age_hours):
+        """recency_boost for every age at once"""
+        if np is None:
+            return [self.recency_boost(age) for age in age_hours]
+
+        age_hours = np.asarray(age_hours, dtype=np.float64)
+        boosts = np.ones_like(age_hours)
+        # Apply widest bracket first so narrower ones overwrite it
+        for max_age, boost in reversed(self.recency):
+            boosts[age_hours < max_age] = boost
+        return boosts
+
+    def score_epochs(self, epochs, codes, degrees, now: Optional[float] = None):
+        """Weights from epoch-second timestamps"""
+        now = time.time() if now is None else now
+        if np is None:
+            ages = [(now - epoch) / 3600 for epoch in epochs]
+            return [b * r for b, r in zip(self.base_weights(codes, degrees), self.recency_boosts(ages))]
+
+        ages = (now - np.asarray(epochs, dtype=np.float64)) / 3600
+        return self.base_weights(codes, degrees) * self.recency_boosts(ages)
+
+    def score_timestamps(self, timestamps: Sequence[str], codes, degrees,
+                         now: Optional[datetime] = None):
+        """Weights from naive ISO timestamps, parsed in one vectorized call"""
+        now = datetime.now() if now is None else now
+        if np is None:
+            ages = [(now - datetime.fromisoformat(ts)).total_seconds() / 3600 for ts in timestamps]
+            return [b * r for b, r in zip(self.base_weights(codes, degrees), self.recency_boosts(ages))]
+
+        parsed = np.array(timestamps, dtype='datetime64[us]')
+        ages = (np.datetime64(now, 'us') - parsed) / np.timedelta64(1, 'h')
+        return self.base_weights(codes, degrees) * self.recency_boosts(ages)
+
+    def score_memories(self, memories: Sequence, now: Optional[datetime] = None) -> List[float]:
+        """Weights for loaded records with timestamp, significance and degree, in order"""
+        if not memories:
+            return []
+        codes = [SIGNIFICANCE_CODES.get(m.significance, 0) for m in memories]
+        degrees = [m.degree for m in memories]
+        scores = self.score_timestamps([m.timestamp for m in memories], codes, degrees, now)
+        return [float(score) for score in scores]
+
+    @staticmethod
+    def top_k(scores, k: int) -> List[int]:
+        """Indices of the k highest scores, best first, without a full sort"""
+        n = len(scores)
+        if k <= 0 or n == 0:
+            return []
+        if np is None:
+            return heapq.nlargest(k, range(n), key=scores.__getitem__)
+
+        scores = np.asarray(scores)
+        if k < n:
+            # Everything tied with the k-th best stays in, so ties break by index
+            kth = scores[np.argpartition(scores, n - k)[n - k]]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(n)
+        order = np.argsort(-scores[candidates], kind='stable')[:k]
+        return candidates[order].tolist()
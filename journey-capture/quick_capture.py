@@ -6,94 +6,523 @@ Every conversation captured is future collective intelligence
 
 import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from artifact_writer import write_artifact
+from background_writer import BackgroundBatchWriter, DebouncedCall
+from body_codec import DEFAULT_CODEC, BodyCodec, train_dictionary
+from db_connection import ConnectionManager
+from time_ids import uuid7, uuid7_at
+
+# JOURNEY_COUNT.txt is re-rendered at most once per window, and at exit
+COUNTER_DEBOUNCE_SECONDS = 1.0
+
+# Queued journeys are committed together - one transaction per batch
+JOURNEY_BATCH_SIZE = 500
+JOURNEY_FLUSH_INTERVAL = 0.25  # seconds
+JOURNEY_MAX_QUEUE = 20_000
+# Journeys are never sampled or dropped lightly - a full queue makes capture wait
+JOURNEY_BLOCK_TIMEOUT = 10.0
+# ...and a full queue is drained at exit, which can take a while
+JOURNEY_CLOSE_TIMEOUT = 120.0
+
+# Bodies shorter than this stay inline - compression would not pay for itself
+BODY_COMPRESS_MIN = 512  # characters across query, response and context
+BODY_TRAIN_SAMPLES = 2000
+BODY_COMPRESS_BATCH = 1000
+
+INSERT_JOURNEY_SQL = """
+    INSERT INTO journeys (id, timestamp, context, query, response, source, metadata, outcome)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_BODY_SQL = """
+    INSERT INTO journey_bodies (journey_id, dictionary_id, context, query, response)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Everything but the bodies - listing never reads body pages
+JOURNEY_SUMMARY_COLUMNS = "j.id, j.timestamp, j.source, j.outcome, j.metadata"
+
+JOURNEY_RECORD_SQL = f"""
+    SELECT {JOURNEY_SUMMARY_COLUMNS}, j.context, j.query, j.response,
+           b.dictionary_id, b.context, b.query, b.response
+    FROM journeys j LEFT JOIN journey_bodies b ON b.journey_id = j.id
+"""
+
+# Versioned schema migrations - applied in order, tracked in PRAGMA user_version
+JOURNEY_MIGRATIONS = [
+    (1, [
+        # Range scans by time instead of DATE(timestamp) over every row
+        "CREATE INDEX IF NOT EXISTS idx_journeys_timestamp ON journeys(timestamp)",
+        # Daily rollup - triggers keep counts current on every write
+        """
+        CREATE TABLE IF NOT EXISTS journey_daily_counts (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT OR REPLACE INTO journey_daily_counts (day, source, count)
+        SELECT substr(timestamp, 1, 10), COALESCE(source, 'direct'), COUNT(*)
+        FROM journeys GROUP BY 1, 2
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS journeys_count_insert AFTER INSERT ON journeys
+        BEGIN
+            INSERT INTO journey_daily_counts (day, source, count)
+            VALUES (substr(NEW.timestamp, 1, 10), COALESCE(NEW.source, 'direct'), 1)
+            ON CONFLICT (day, source) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS journeys_count_delete AFTER DELETE ON journeys
+        BEGIN
+            UPDATE journey_daily_counts SET count = count - 1
+            WHERE day = substr(OLD.timestamp, 1, 10) AND source = COALESCE(OLD.source, 'direct');
+        END
+        """,
+    ]),
+    (2, [
+        # Time-ordered IDs - earlier md5-derived IDs stay resolvable here
+        """
+        CREATE TABLE IF NOT EXISTS journey_legacy_ids (
+            legacy_id TEXT PRIMARY KEY,
+            id TEXT NOT NULL
+        ) WITHOUT ROWID
+        """,
+        lambda conn: _rekey_legacy_journeys(conn),
+    ]),
+    (3, [
+        # Optional compressed bodies - inline columns are left empty for these rows
+        """
+        CREATE TABLE IF NOT EXISTS journey_dictionaries (
+            id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            dictionary BLOB NOT NULL,
+            created TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS journey_bodies (
+            journey_id TEXT PRIMARY KEY,
+            dictionary_id INTEGER NOT NULL REFERENCES journey_dictionaries(id),
+            context BLOB NOT NULL,
+            query BLOB NOT NULL,
+            response BLOB NOT NULL
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS journeys_body_delete AFTER DELETE ON journeys
+        BEGIN
+            DELETE FROM journey_bodies WHERE journey_id = OLD.id;
+        END
+        """,
+    ]),
+    (4, [
+        # Moving a journey to another day or source moves its count too
+        """
+        CREATE TRIGGER IF NOT EXISTS journeys_count_update AFTER UPDATE OF timestamp, source ON journeys
+        BEGIN
+            UPDATE journey_daily_counts SET count = count - 1
+            WHERE day = substr(OLD.timestamp, 1, 10) AND source = COALESCE(OLD.source, 'direct');
+            INSERT INTO journey_daily_counts (day, source, count)
+            VALUES (substr(NEW.timestamp, 1, 10), COALESCE(NEW.source, 'direct'), 1)
+            ON CONFLICT (day, source) DO UPDATE SET count = count + 1;
+        END
+        """,
+        # Recount anything updated before the trigger existed
+        "DELETE FROM journey_daily_counts",
+        """
+        INSERT INTO journey_daily_counts (day, source, count)
+        SELECT substr(timestamp, 1, 10), COALESCE(source, 'direct'), COUNT(*)
+        FROM journeys GROUP BY 1, 2
+        """,
+    ]),
+]
+
+
+def _rekey_legacy_journeys(conn: sqlite3.Connection):
+    """Give pre-UUIDv7 journeys time-ordered IDs derived from their timestamps"""
+    legacy = conn.execute("""
+        SELECT id, timestamp FROM journeys
+        WHERE length(id) <> 36 OR substr(id, 15, 1) <> '7'
+        ORDER BY timestamp
+    """).fetchall()
+    
+    rekeyed = []
+    for legacy_id, timestamp in legacy:
+        try:
+            moment = datetime.fromisoformat(timestamp)
+        except ValueError:
+            moment = datetime.now()
+        rekeyed.append((uuid7_at(moment), legacy_id))
+    
+    conn.executemany("UPDATE journeys SET id = ? WHERE id = ?", rekeyed)
+    conn.executemany(
+        "INSERT OR REPLACE INTO journey_legacy_ids (id, legacy_id) VALUES (?, ?)", rekeyed
+    )
+
+
+# Today's count, the total and the first capture - rollup rows plus one index seek
+JOURNEY_TOTALS_SQL = """
+    SELECT
+        COALESCE((SELECT SUM(count) FROM journey_daily_counts WHERE day = ?), 0),
+        COALESCE((SELECT SUM(count) FROM journey_daily_counts), 0),
+        (SELECT MIN(timestamp) FROM journeys)
+"""
+
+QUICK_CAPTURE_METADATA = json.dumps({"version": "0.1", "quick_capture": True})
+
+# One writer queue and one set of counters per database file
+_journey_stores: Dict[str, 'JourneyStore'] = {}
+_journey_stores_lock = threading.Lock()
+
+
+class JourneyRecord:
+    """One journey whose bodies are decompressed on first access"""
+    
+    __slots__ = ('id', 'timestamp', 'source', 'outcome', 'metadata',
+                 '_codec', '_bodies', '_decoded')
+    
+    BODIES = ('context', 'query', 'response')
+    
+    def __init__(self, row: tuple, codec: Optional[BodyCodec]):
+        (self.id, self.timestamp, self.source, self.outcome, self.metadata,
+         inline_context, inline_query, inline_response,
+         dictionary_id, *compressed) = row
+        self._codec = codec if dictionary_id is not None else None
+        self._bodies = compressed if dictionary_id is not None else (inline_context, inline_query, inline_response)
+        self._decoded: Dict[str, str] = {}
+    
+    def _body(self, name: str) -> str:
+        text = self._decoded.get(name)
+        if text is None:
+            raw = self._bodies[self.BODIES.index(name)]
+            text = self._codec.decompress(raw) if self._codec else raw
+            self._decoded[name] = text
+        return text
+    
+    @property
+    def query(self) -> str:
+        return self._body('query')
+    
+    @property
+    def response(self) -> str:
+        return self._body('response')
+    
+    @property
+    def context(self) -> dict:
+        return json.loads(self._body('context'))
+
+
+class JourneyCounter:
+    """Journey counts for JOURNEY_COUNT.txt, read from the daily rollup"""
+    
+    def __init__(self, db: ConnectionManager, counter_path: Path):
+        self.db = db
+        self.counter_path = counter_path
+        self._renderer = DebouncedCall(self.render, COUNTER_DEBOUNCE_SECONDS)
+    
+    def add(self):
+        """Note journeys were just committed - triggers already counted them"""
+        self._renderer.schedule()
+    
+    def snapshot(self) -> Tuple[int, int, Optional[str]]:
+        """(today, total, first timestamp) - cost is independent of table size"""
+        today = datetime.now().date().isoformat()
+        with self.db.read_transaction() as conn:
+            return conn.execute(JOURNEY_TOTALS_SQL, (today,)).fetchone()
+    
+    def render(self):
+        """Visible progress - 'Journeys captured today: X'"""
+        # The database may be gone by the time a deferred render fires
+        if not self.db.db_path.exists():
+            return
+        today, total, first = self.snapshot()
+        write_artifact(
+            self.counter_path,
+            f"Journeys captured today: {today}\n"
+            f"Total journeys: {total}\n"
+            f"First journey: {first or 'None yet'}\n"
+        )
+    
+    def flush(self):
+        """Render a pending counter update now"""
+        self._renderer.flush()
+
+
+class JourneyStore:
+    """Shared write path for one journeys database
+    
+    Synchronous captures commit immediately; queued captures are batched by
+    a background writer. Both refresh the same JOURNEY_COUNT.txt.
+    """
+    
+    def __init__(self, db_path: Path, counter_path: Path):
+        self.db = ConnectionManager.for_path(db_path)
+        self.counter = JourneyCounter(self.db, counter_path)
+        self._codecs: Dict[int, BodyCodec] = {}
+        self._codec_lock = threading.Lock()
+        # Once a database holds compressed bodies, keep compressing new ones
+        self._write_codec = self.codec()
+        # Created after the counter so its exit flush runs first
+        self.writer = BackgroundBatchWriter(
+            self.write_batch,
+            batch_size=JOURNEY_BATCH_SIZE,
+            flush_interval=JOURNEY_FLUSH_INTERVAL,
+            max_queue=JOURNEY_MAX_QUEUE,
+            overflow='block',
+            block_timeout=JOURNEY_BLOCK_TIMEOUT,
+            close_timeout=JOURNEY_CLOSE_TIMEOUT,
+            name='journey-writer'
+        )
+    
+    @classmethod
+    def for_path(cls, db_path: Path, counter_path: Path) -> 'JourneyStore':
+        key = str(Path(db_path).resolve())
+        with _journey_stores_lock:
+            store = _journey_stores.get(key)
+            if store is None:
+                store = _journey_stores[key] = cls(db_path, counter_path.resolve())
+            return store
+    
+    def codec(self, dictionary_id: Optional[int] = None) -> Optional[BodyCodec]:
+        """Codec for a stored dictionary - the newest one if no id is given"""
+        with self._codec_lock:
+            if dictionary_id in self._codecs:
+                return self._codecs[dictionary_id]
+            conn = self.db.connection()
+            if dictionary_id is None:
+                row = conn.execute(
+                    "SELECT id, codec, dictionary FROM journey_dictionaries ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT id, codec, dictionary FROM journey_dictionaries WHERE id = ?", (dictionary_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            codec = self._codecs[row[0]] = BodyCodec(*row)
+            return codec
+    
+    def set_write_codec(self, codec: Optional[BodyCodec]):
+        """Compress bodies of new journeys with this codec from now on"""
+        self._write_codec = codec
+    
+    def split_bodies(self, rows: List[tuple], codec: BodyCodec) -> Tuple[List[tuple], List[tuple]]:
+        """Journey rows with large bodies emptied, plus their compressed bodies"""
+        inline, bodies = [], []
+        for row in rows:
+            journey_id, timestamp, context, query, response, source, metadata, outcome = row
+            if len(context) + len(query) + len(response) < BODY_COMPRESS_MIN:
+                inline.append(row)
+                continue
+            inline.append((journey_id, timestamp, '', '', '', source, metadata, outcome))
+            bodies.append((journey_id, codec.dictionary_id, codec.compress(context),
+                           codec.compress(query), codec.compress(response)))
+        return inline, bodies
+    
+    def write_batch(self, rows: List[tuple]):
+        """Commit journey rows in one transaction and count them"""
+        codec = self._write_codec
+        bodies = []
+        if codec is not None:
+            rows, bodies = self.split_bodies(rows, codec)
+        with self.db.transaction() as conn:
+            conn.executemany(INSERT_JOURNEY_SQL, rows)
+            if bodies:
+                conn.executemany(INSERT_BODY_SQL, bodies)
+        self.counter.add()
+
 
 class QuickJourneyCapture:
     """Minimal viable journey capture - deployed in hours, not weeks"""
     
     def __init__(self):
         self.db_path = Path("journeys.db")
+        self.db = ConnectionManager.for_path(self.db_path)
         self._init_db()
+        self.store = JourneyStore.for_path(self.db_path, Path("JOURNEY_COUNT.txt"))
         
     def _init_db(self):
         """Simple schema - capture everything, optimize later"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS journeys (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                context TEXT NOT NULL,
-                query TEXT NOT NULL,
-                response TEXT NOT NULL,
-                source TEXT DEFAULT 'direct',
-                outcome TEXT,
-                metadata TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS journeys (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    context TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    source TEXT DEFAULT 'direct',
+                    outcome TEXT,
+                    metadata TEXT
+                )
+            """)
+            self._migrate(conn)
     
-    def capture_journey(self, query: str, context: dict, response: str, source: str = "direct"):
-        """THE GRAND BARGAIN BEGINS - Every capture builds the moat"""
-        journey_id = hashlib.md5(f"{datetime.now()}{query}".encode()).hexdigest()[:12]
+    def _migrate(self, conn: sqlite3.Connection):
+        """Apply any schema migrations newer than the database version"""
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
         
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            INSERT INTO journeys (id, timestamp, context, query, response, source, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            journey_id,
+        for version, steps in JOURNEY_MIGRATIONS:
+            if version <= current:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version}")
+    
+    def _journey_row(self, query: str, context: dict, response: str, source: str) -> tuple:
+        return (
+            uuid7(),
             datetime.now().isoformat(),
             json.dumps(context),
             query,
             response,
             source,
-            json.dumps({"version": "0.1", "quick_capture": True})
-        ))
-        conn.commit()
-        conn.close()
-        
-        # Update daily counter
-        self._update_counter()
-        
-        return journey_id
+            QUICK_CAPTURE_METADATA,
+            None
+        )
     
-    def _update_counter(self):
-        """Visible progress - 'Journeys captured today: X'"""
-        today = datetime.now().date().isoformat()
-        conn = sqlite3.connect(self.db_path)
-        
-        count = conn.execute("""
-            SELECT COUNT(*) FROM journeys 
-            WHERE DATE(timestamp) = ?
-        """, (today,)).fetchone()[0]
+    def capture_journey(self, query: str, context: dict, response: str, source: str = "direct"):
+        """THE GRAND BARGAIN BEGINS - Every capture builds the moat"""
+        row = self._journey_row(query, context, response, source)
+        self.store.write_batch([row])
+        return row[0]
+    
+    def submit_journey(self, query: str, context: dict, response: str,
+                       source: str = "direct") -> Optional[str]:
+        """Queue a journey for the background writer - returns its id without waiting
         
-        # Write to visible file
-        Path("JOURNEY_COUNT.txt").write_text(
-            f"Journeys captured today: {count}\n"
-            f"Total journeys: {conn.execute('SELECT COUNT(*) FROM journeys').fetchone()[0]}\n"
-            f"First journey: {conn.execute('SELECT MIN(timestamp) FROM journeys').fetchone()[0] or 'None yet'}\n"
-        )
-        conn.close()
+        Queued journeys are committed in batches and always flushed at exit;
+        call flush() when they must be readable right away. Returns None if
+        the queue stayed full for JOURNEY_BLOCK_TIMEOUT seconds.
+        """
+        row = self._journey_row(query, context, response, source)
+        if not self.store.writer.submit(row):
+            print(f"  ⚠ Journey queue full - {row[0]} not captured")
+            return None
+        return row[0]
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Commit every queued journey and refresh JOURNEY_COUNT.txt"""
+        done = self.store.writer.flush(timeout)
+        self.store.counter.flush()
+        return done
     
     def get_stats(self):
         """Quick stats for validation"""
-        conn = sqlite3.connect(self.db_path)
-        stats = {
-            "total": conn.execute("SELECT COUNT(*) FROM journeys").fetchone()[0],
-            "today": conn.execute("""
-                SELECT COUNT(*) FROM journeys 
-                WHERE DATE(timestamp) = DATE('now')
-            """).fetchone()[0],
-            "sources": dict(conn.execute("""
-                SELECT source, COUNT(*) FROM journeys 
-                GROUP BY source
-            """).fetchall())
-        }
-        conn.close()
+        today = datetime.now().date().isoformat()
+        with self.db.read_transaction() as conn:
+            today_count, total, _ = conn.execute(JOURNEY_TOTALS_SQL, (today,)).fetchone()
+            stats = {
+                "total": total,
+                "today": today_count,
+                "sources": dict(conn.execute("""
+                    SELECT source, SUM(count) FROM journey_daily_counts
+                    GROUP BY source HAVING SUM(count) > 0
+                """).fetchall())
+            }
         return stats
+    
+    def get_journey(self, journey_id: str) -> Optional[JourneyRecord]:
+        """One journey - bodies are only decompressed when read"""
+        row = self.db.connection().execute(
+            f"{JOURNEY_RECORD_SQL} WHERE j.id = ?", (self.resolve_journey_id(journey_id),)
+        ).fetchone()
+        if row is None:
+            return None
+        codec = self.store.codec(row[8]) if row[8] is not None else None
+        return JourneyRecord(row, codec)
+    
+    def list_journeys(self, since: str = None, limit: int = 100) -> List[Dict]:
+        """Newest journeys without their bodies, newest first"""
+        rows = self.db.connection().execute(f"""
+            SELECT {JOURNEY_SUMMARY_COLUMNS} FROM journeys j
+            WHERE j.timestamp >= ?
+            ORDER BY j.timestamp DESC
+            LIMIT ?
+        """, (since or '', limit)).fetchall()
+        return [
+            {'id': row[0], 'timestamp': row[1], 'source': row[2], 'outcome': row[3],
+             'metadata': json.loads(row[4]) if row[4] else None}
+            for row in rows
+        ]
+    
+    def compress_bodies(self, codec: str = DEFAULT_CODEC, vacuum: bool = True) -> Dict[str, int]:
+        """Train a dictionary and move large inline bodies into journey_bodies
+        
+        New captures are compressed from then on. Runs in batches so memory
+        stays bounded; VACUUM afterwards returns the freed pages to the disk.
+        """
+        conn = self.db.connection()
+        samples = [
+            body
+            for row in conn.execute("""
+                SELECT context, query, response FROM journeys
+                WHERE length(context) + length(query) + length(response) >= ?
+                ORDER BY timestamp DESC LIMIT ?
+            """, (BODY_COMPRESS_MIN, BODY_TRAIN_SAMPLES))
+            for body in row
+        ]
+        dictionary = train_dictionary(samples, codec)
+        with self.db.transaction():
+            dictionary_id = conn.execute(
+                "INSERT INTO journey_dictionaries (codec, dictionary, created) VALUES (?, ?, ?)",
+                (codec, dictionary, datetime.now().isoformat())
+            ).lastrowid
+        body_codec = self.store.codec(dictionary_id)
+        
+        compressed = 0
+        last_rowid = 0
+        while True:
+            with self.db.transaction():
+                batch = conn.execute("""
+                    SELECT rowid, id, timestamp, context, query, response, source, metadata, outcome
+                    FROM journeys
+                    WHERE rowid > ? AND length(context) + length(query) + length(response) >= ?
+                    ORDER BY rowid LIMIT ?
+                """, (last_rowid, BODY_COMPRESS_MIN, BODY_COMPRESS_BATCH)).fetchall()
+                if not batch:
+                    break
+                last_rowid = batch[-1][0]
+                _, bodies = self.store.split_bodies([row[1:] for row in batch], body_codec)
+                conn.executemany(INSERT_BODY_SQL, bodies)
+                conn.executemany(
+                    "UPDATE journeys SET context = '', query = '', response = '' WHERE id = ?",
+                    [(body[0],) for body in bodies]
+                )
+                compressed += len(bodies)
+        
+        self.store.set_write_codec(body_codec)
+        if vacuum:
+            conn.execute("VACUUM")
+        return {'dictionary_id': dictionary_id, 'compressed': compressed}
+    
+    def resolve_journey_id(self, journey_id: str) -> str:
+        """Current ID for a journey, following IDs issued before UUIDv7"""
+        row = self.db.connection().execute(
+            "SELECT id FROM journey_legacy_ids WHERE legacy_id = ?", (journey_id,)
+        ).fetchone()
+        return row[0] if row else journey_id
+    
+    def get_daily_counts(self, since: str = None) -> Dict[str, int]:
+        """Journeys per day, from the rollup"""
+        conn = self.db.connection()
+        return dict(conn.execute("""
+            SELECT day, SUM(count) FROM journey_daily_counts
+            WHERE day >= ?
+            GROUP BY day ORDER BY day
+        """, (since or '',)).fetchall())
 
 
 # Example wrapper for immediate use
@@ -12,36 +12,38 @@ def recall_vision():
     
     memory = OrganizationalMemory()
     
-    # Find Caesar's decisions
-    caesar_memories = memory.find_related_memories(
+    # Find Caesar's decisions about the collective soul - indexed text search
+    caesar_memories = memory.search_memories(
+        "collective soul",
+        match='phrase',
         entity_name="Caesar",
-        entity_mode="Founder"
+        entity_mode="Founder",
+        event_type="decision"
     )
     
     print("🧠 Organizational Memory: Dale's Vision")
     print("=" * 60)
     
     for mem in caesar_memories:
-        if mem['event']['type'] == 'decision' and 'collective soul' in mem['event']['description']:
-            print(f"\n📅 {mem['timestamp']}")
-            print(f"👤 {mem['entity']['name']} ({mem['entity']['mode']})")
-            print(f"🎯 {mem['event']['description']}")
-            print(f"⚡ Significance: {mem['event']['significance'].upper()}")
-            
-            if 'quote' in mem['content']:
-                print(f"\n💬 '{mem['content']['quote']}'")
-            
-            if 'insight' in mem['content']:
-                print(f"\n💡 {mem['content']['insight']}")
-            
-            if 'vision' in mem['content']:
-                print(f"\n🔮 {mem['content']['vision']}")
-            
-            if 'data' in mem['content'] and 'problem_solved' in mem['content']['data']:
-                print(f"\n❌ Problem: {mem['content']['data']['problem_solved']}")
-                print(f"✅ Solution: {mem['content']['data']['solution']}")
-            
-            print("\n" + "-" * 60)
+        print(f"\n📅 {mem['timestamp']}")
+        print(f"👤 {mem['entity']['name']} ({mem['entity']['mode']})")
+        print(f"🎯 {mem['event']['description']}")
+        print(f"⚡ Significance: {mem['event']['significance'].upper()}")
+        
+        if 'quote' in mem['content']:
+            print(f"\n💬 '{mem['content']['quote']}'")
+        
+        if 'insight' in mem['content']:
+            print(f"\n💡 {mem['content']['insight']}")
+        
+        if 'vision' in mem['content']:
+            print(f"\n🔮 {mem['content']['vision']}")
+        
+        if 'data' in mem['content'] and 'problem_solved' in mem['content']['data']:
+            print(f"\n❌ Problem: {mem['content']['data']['problem_solved']}")
+            print(f"✅ Solution: {mem['content']['data']['solution']}")
+        
+        print("\n" + "-" * 60)
     
     # Also show related implementations
     print("\n🔄 Related CTO Implementations:")
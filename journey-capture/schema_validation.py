@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Schema Validation - JSON schemas compiled once into fast check functions
+Detailed jsonschema errors are only produced when a document fails
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
+import jsonschema
+
+# Keywords that only annotate - they never affect validity
+ANNOTATIONS = {'$schema', 'title', 'description', 'default', 'format', '$id', 'examples'}
+
+TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: (isinstance(v, int) and not isinstance(v, bool))
+                         or (isinstance(v, float) and v.is_integer()),
+}
+
+
+class UnsupportedSchema(Exception):
+    """Schema uses a keyword the fast compiler does not handle"""
+
+
+def _same(a: Any, b: Any) -> bool:
+    """JSON equality - unlike Python, true is not 1"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    return a == b
+
+
+def compile_schema(schema: Dict) -> Callable[[Any], bool]:
+    """Turn a draft-07 schema into a nested closure returning True if valid
+
+    Covers the keywords our schemas use (type, enum, const, required,
+    properties, items, pattern, minimum, maximum). Anything else raises
+    UnsupportedSchema so callers fall back to the full validator.
+    """
+    unknown = set(schema) - ANNOTATIONS - {
+        'type', 'enum', 'const', 'required', 'properties', 'items',
+        'pattern', 'minimum', 'maximum'
+    }
+    if unknown:
+        raise UnsupportedSchema(f"Unsupported keywords: {sorted(unknown)}")
+
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [TYPE_CHECKS[t] for t in types]
+        if len(type_checks) == 1:
+            checks.append(type_checks[0])
+        else:
+            checks.append(lambda v: any(check(v) for check in type_checks))
+
+    if 'enum' in schema:
+        options = schema['enum']
+        checks.append(lambda v: any(_same(v, option) for option in options))
+
+    if 'const' in schema:
+        constant = schema['const']
+        checks.append(lambda v: _same(v, constant))
+
+    if 'required' in schema:
+        required = tuple(schema['required'])
+        checks.append(lambda v: not isinstance(v, dict) or all(k in v for k in required))
+
+    if 'properties' in schema:
+        properties = [(name, compile_schema(sub)) for name, sub in schema['properties'].items()]
+
+        def check_properties(v):
+            if not isinstance(v, dict):
+                return True
+            for name, check in properties:
+                if name in v and not check(v[name]):
+                    return False
+            return True
+        checks.append(check_properties)
+
+    if 'items' in schema:
+        if not isinstance(schema['items'], dict):
+            raise UnsupportedSchema("Tuple-form items")
+        item_check = compile_schema(schema['items'])
+        checks.append(lambda v: not isinstance(v, list) or all(item_check(i) for i in v))
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        checks.append(lambda v: not isinstance(v, str) or pattern.search(v) is not None)
+
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        checks.append(lambda v: not TYPE_CHECKS['number'](v) or v >= minimum)
+
+    if 'maximum' in schema:
+        maximum = schema['maximum']
+        checks.append(lambda v: not TYPE_CHECKS['number'](v) or v <= maximum)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(v):
+        for check in checks:
+            if not check(v):
+                return False
+        return True
+    return check_all
+
+
+class CompiledValidator:
+    """Fast yes/no check backed by jsonschema for error reporting"""
+
+    def __init__(self, schema: Dict):
+        jsonschema.Draft7Validator.check_schema(schema)
+        self.schema = schema
+        self._validator = jsonschema.Draft7Validator(schema)
+        try:
+            self._check = compile_schema(schema)
+        except UnsupportedSchema:
+            self._check = self._validator.is_valid
+
+    def is_valid(self, instance: Any) -> bool:
+        """True if the document satisfies the schema"""
+        return self._check(instance)
+
+    def validate(self, instance: Any):
+        """Raise jsonschema.ValidationError with full detail if invalid"""
+        if not self._check(instance):
+            self._validator.validate(instance)
+
+
+_validators: Dict[str, Tuple[float, CompiledValidator]] = {}
+_validators_lock = threading.Lock()
+
+
+def load_validator(schema_path: Union[str, Path]) -> CompiledValidator:
+    """Compiled validator for a schema file, shared until the file changes"""
+    path = Path(schema_path).resolve()
+    mtime = path.stat().st_mtime
+
+    with _validators_lock:
+        cached = _validators.get(str(path))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(path) as f:
+        validator = CompiledValidator(json.load(f))
+
+    with _validators_lock:
+        _validators[str(path)] = (mtime, validator)
+    return validator
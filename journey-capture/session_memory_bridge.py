@@ -3,149 +3,176 @@
 Session Memory Bridge - Integrates memories with Claude's session management
 """
 
-import json
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
+from artifact_writer import write_artifact, write_json_artifact
+from context_assembler import ContextAssembler, insight_value, flow_value, knowledge_value
+from context_document import ContextDocument
+
+# Token budgets for boot context - no more than the old fixed slices
+# (5 insights and 3 flows in the manifest, 3 and 2 in CURRENT_CONTEXT.md)
+# rendered for a full summary: 400 and 138 tokens
+MANIFEST_TOKEN_BUDGET = 400
+CURRENT_CONTEXT_TOKEN_BUDGET = 135
+
+MANIFEST_TIMESTAMP_PREFIX = "*Loaded from Internal Memory System - "
+
+MEMORY_SECTION_HEADING = "## Organizational Memory Insights"
+
+# Seed for CURRENT_CONTEXT.md when no session has written one yet
+INITIAL_CURRENT_CONTEXT = """# Current Context
+
+## Active Work
+- Building OS-001 Organizational Memory System
+
+"""
+
+# Retrieved knowledge chunks are cut to this many characters in the manifest
+KNOWLEDGE_CHUNK_CHARS = 300
+
+SIGNIFICANCE_EMOJI = {
+    'critical': '🔴',
+    'notable': '🟡',
+    'routine': '⚪'
+}
 
 class SessionMemoryBridge:
     """Bridge between Internal Memory System and session persistence"""
     
-    def __init__(self):
+    def __init__(self, manifest_budget: int = MANIFEST_TOKEN_BUDGET,
+                 current_context_budget: int = CURRENT_CONTEXT_TOKEN_BUDGET):
         self.memory_manifest_path = Path("MEMORY_MANIFEST.md")
         self.session_memory_path = Path("SESSION_MEMORIES.json")
+        self.current_context_path = Path.home() / "CURRENT_CONTEXT.md"
+        self.manifest_budget = manifest_budget
+        self.current_context_budget = current_context_budget
         
-    def inject_into_claude_context(self, memory_summary: Dict) -> str:
-        """Generate markdown for Claude's context on session start"""
+    def inject_into_claude_context(self, memory_summary: Dict,
+                                   knowledge_chunks: Optional[List[Dict]] = None) -> str:
+        """Generate markdown for Claude's context on session start
         
-        manifest = f"""# Organizational Memory Context
-*Loaded from Internal Memory System - {datetime.now().strftime('%Y-%m-%d %H:%M')}*
+        Insights, flows, focus areas and retrieved knowledge chunks
+        (query_knowledge results) compete for the manifest token budget,
+        which covers the whole manifest.
+        """
+        
+        header = f"""# Organizational Memory Context
+{MANIFEST_TIMESTAMP_PREFIX}{datetime.now().strftime('%Y-%m-%d %H:%M')}*
 
 ## Active Knowledge State
-
-### Key Insights from Previous Sessions
 """
         
+        # Statistics are always included - pack everything else around them
+        stats = "\n### Memory Statistics\n"
+        stats += f"- Total organizational memories: {memory_summary.get('total_memories', 0)}\n"
+        stats += f"- Memories loaded this session: {len(memory_summary.get('key_insights', []))}\n"
+        stats += f"- Cross-mode connections found: {len(memory_summary.get('cross_mode_flows', []))}\n"
+        
+        assembler = ContextAssembler(self.manifest_budget)
+        assembler.section('insights', "\n### Key Insights from Previous Sessions\n")
+        assembler.section('flows', "\n### Cross-Mode Knowledge Flows\n"
+                                   "*How knowledge has flowed between different modes:*\n")
+        assembler.section('focus', "\n### Recommended Focus Areas\n"
+                                   "*Based on organizational memory patterns:*\n")
+        assembler.section('knowledge', "\n### Related Knowledge\n"
+                                       "*Retrieved from the organizational knowledge index:*\n")
+        
         # Add key insights with proper formatting
-        for insight in memory_summary.get('key_insights', [])[:5]:
-            significance_emoji = {
-                'critical': '🔴',
-                'notable': '🟡',
-                'routine': '⚪'
-            }.get(insight.get('significance', 'routine'), '⚪')
-            
-            manifest += f"- {significance_emoji} **{insight['entity']}**: {insight['insight']}\n"
+        for rank, insight in enumerate(memory_summary.get('key_insights', [])):
+            significance_emoji = SIGNIFICANCE_EMOJI.get(insight.get('significance', 'routine'), '⚪')
+            block = f"- {significance_emoji} **{insight['entity']}**: {insight['insight']}\n"
             if insight.get('project'):
-                manifest += f"  - Project: {insight['project']}\n"
+                block += f"  - Project: {insight['project']}\n"
+            assembler.add('insights', block, insight_value(insight, rank))
         
         # Add cross-mode knowledge flows
-        if memory_summary.get('cross_mode_flows'):
-            manifest += "\n### Cross-Mode Knowledge Flows\n"
-            manifest += "*How knowledge has flowed between different modes:*\n"
-            for flow in memory_summary['cross_mode_flows'][:3]:
-                manifest += f"- {flow['from']}\n"
-                manifest += f"  ↓ *influenced*\n"
-                manifest += f"  {flow['to']}\n"
-                if flow.get('impact') and flow['impact'] != 'pending':
-                    manifest += f"  Impact: {flow['impact']}\n"
-                manifest += "\n"
+        for rank, flow in enumerate(memory_summary.get('cross_mode_flows', [])):
+            block = f"- {flow['from']}\n"
+            block += f"  ↓ *influenced*\n"
+            block += f"  {flow['to']}\n"
+            if flow.get('impact') and flow['impact'] != 'pending':
+                block += f"  Impact: {flow['impact']}\n"
+            assembler.add('flows', block + "\n", flow_value(flow, rank))
         
         # Add recommended focus areas
-        if memory_summary.get('recommended_focus'):
-            manifest += "### Recommended Focus Areas\n"
-            manifest += "*Based on organizational memory patterns:*\n"
-            for focus in memory_summary['recommended_focus']:
-                manifest += f"- {focus}\n"
+        for focus in memory_summary.get('recommended_focus', []):
+            assembler.add('focus', f"- {focus}\n", 2.0)
         
-        # Add memory statistics
-        manifest += f"\n### Memory Statistics\n"
-        manifest += f"- Total organizational memories: {memory_summary.get('total_memories', 0)}\n"
-        manifest += f"- Memories loaded this session: {len(memory_summary.get('key_insights', []))}\n"
-        manifest += f"- Cross-mode connections found: {len(memory_summary.get('cross_mode_flows', []))}\n"
+        # Add retrieved knowledge, most relevant first
+        for rank, chunk in enumerate(knowledge_chunks or []):
+            text = ' '.join(chunk['text'].split())
+            if len(text) > KNOWLEDGE_CHUNK_CHARS:
+                text = text[:KNOWLEDGE_CHUNK_CHARS - 3] + "..."
+            block = f"- {text}\n"
+            if chunk.get('source'):
+                block += f"  - Source: {chunk['source']}\n"
+            assembler.add('knowledge', block, knowledge_value(chunk, rank))
         
-        # Save manifest
-        self.memory_manifest_path.write_text(manifest)
+        manifest = assembler.render_within(self.manifest_budget,
+                                           lambda packed: header + packed + stats)
+        
+        # Save manifest - skipped when only the load time differs
+        write_artifact(self.memory_manifest_path, manifest,
+                       volatile=(MANIFEST_TIMESTAMP_PREFIX,))
         
         return manifest
     
-    def update_current_context(self, memory_summary: Dict):
-        """Enhance CURRENT_CONTEXT.md with memory insights"""
-        current_context_path = Path.home() / "CURRENT_CONTEXT.md"
+    def update_current_context(self, memory_summary: Dict) -> bool:
+        """Enhance CURRENT_CONTEXT.md with memory insights
         
-        # Create minimal context if doesn't exist
-        if not current_context_path.exists():
-            initial_content = """# Current Context
-
-## Active Work
-- Building OS-001 Organizational Memory System
-
-"""
-            current_context_path.write_text(initial_content)
+        Only the memory section is rewritten, atomically and under a lock,
+        and not at all when its content is unchanged. The budget covers the
+        whole section, heading included.
+        """
+        updated = f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n"
         
-        content = current_context_path.read_text()
+        # Add the most relevant insights and flows that fit the budget
+        assembler = ContextAssembler(self.current_context_budget)
+        assembler.section('insights', "### Recent Discoveries\n")
+        assembler.section('flows', "\n### Active Knowledge Flows\n"
+                                   "*Knowledge actively flowing between modes:*\n")
         
-        # Check if memory section already exists
-        if "## Organizational Memory Insights" in content:
-            # Update existing section
-            lines = content.split('\n')
-            start_idx = None
-            end_idx = None
-            
+        for rank, insight in enumerate(memory_summary.get('key_insights', [])):
+            # Truncate long insights
+            insight_text = insight['insight']
+            if len(insight_text) > 100:
+                insight_text = insight_text[:97] + "..."
+            # Numbered by rank, which is never shorter than the final number
+            assembler.add('insights', f"{rank + 1}. **{insight['entity']}**: {insight_text}\n",
+                          insight_value(insight, rank))
+        
+        # Extract just the modes - each pair once, however many flows share it
+        pairs = set()
+        for rank, flow in enumerate(memory_summary.get('cross_mode_flows', [])):
+            pair = (flow['from'].split(':')[0], flow['to'].split(':')[0])
+            if pair not in pairs:
+                pairs.add(pair)
+                assembler.add('flows', f"- {pair[0]} → {pair[1]}\n", flow_value(flow, rank))
+        
+        def compose(packed: str) -> str:
+            # Renumber the chosen insights 1..n
+            lines = packed.lstrip('\n').split('\n')
+            number = 0
             for i, line in enumerate(lines):
-                if line.startswith("## Organizational Memory Insights"):
-                    start_idx = i
-                elif start_idx is not None and line.startswith("## "):
-                    end_idx = i
-                    break
-            
-            if end_idx is None:
-                end_idx = len(lines)
-            
-            # Remove old section
-            lines = lines[:start_idx] + lines[end_idx:]
-            content = '\n'.join(lines)
-        
-        # Find insertion point (after first header)
-        lines = content.split('\n')
-        insert_index = 2  # After title and first blank line
-        
-        # Create memory section
-        memory_section = [
-            "",
-            "## Organizational Memory Insights",
-            f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*",
-            ""
-        ]
+                head, dot, rest = line.partition('. ')
+                if dot and head.isdigit():
+                    number += 1
+                    lines[i] = f"{number}. {rest}"
+            # Exactly the text write_section stores
+            return (f"{MEMORY_SECTION_HEADING}\n{updated}" + '\n'.join(lines)).rstrip() + "\n\n"
         
-        # Add most relevant insights
-        if memory_summary.get('key_insights'):
-            memory_section.append("### Recent Discoveries")
-            for i, insight in enumerate(memory_summary['key_insights'][:3]):
-                # Truncate long insights
-                insight_text = insight['insight']
-                if len(insight_text) > 100:
-                    insight_text = insight_text[:97] + "..."
-                memory_section.append(f"{i+1}. **{insight['entity']}**: {insight_text}")
-            memory_section.append("")
-        
-        # Add active patterns if any
-        if memory_summary.get('cross_mode_flows'):
-            memory_section.append("### Active Knowledge Flows")
-            memory_section.append("*Knowledge actively flowing between modes:*")
-            for flow in memory_summary['cross_mode_flows'][:2]:
-                # Extract just the modes
-                from_mode = flow['from'].split(':')[0]
-                to_mode = flow['to'].split(':')[0]
-                memory_section.append(f"- {from_mode} → {to_mode}")
-            memory_section.append("")
-        
-        # Insert into content
-        new_lines = lines[:insert_index] + memory_section + lines[insert_index:]
-        
-        # Write back
-        current_context_path.write_text('\n'.join(new_lines))
-        
-        print(f"  ✓ Updated CURRENT_CONTEXT.md with {len(memory_summary.get('key_insights', []))} insights")
+        section = assembler.render_within(self.current_context_budget, compose)
+        
+        document = ContextDocument(self.current_context_path, INITIAL_CURRENT_CONTEXT)
+        changed = document.write_section(MEMORY_SECTION_HEADING,
+                                         section[len(MEMORY_SECTION_HEADING) + 1:])
+        
+        if changed:
+            print(f"  ✓ Updated CURRENT_CONTEXT.md with {len(memory_summary.get('key_insights', []))} insights")
+        else:
+            print("  ✓ CURRENT_CONTEXT.md memory insights already current")
+        return changed
     
     def save_session_memories(self, memory_summary: Dict):
         """Save current session's memory state for debugging/analysis"""
@@ -160,9 +187,11 @@ class SessionMemoryBridge:
         }
         
         try:
-            with open(self.session_memory_path, 'w') as f:
-                json.dump(session_data, f, indent=2)
-            print(f"  ✓ Saved session memory state to {self.session_memory_path}")
+            if write_json_artifact(self.session_memory_path, session_data,
+                                   volatile_keys=('timestamp',)):
+                print(f"  ✓ Saved session memory state to {self.session_memory_path}")
+            else:
+                print(f"  ✓ Session memory state unchanged in {self.session_memory_path}")
         except Exception as e:
             print(f"  ⚠ Failed to save session memories: {e}")
     
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the automatic memory boot
+In-process boots, timeouts, fallbacks and the warm boot worker
+"""
+
+import io
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager, redirect_stdout
+
+import auto_boot_memory
+from auto_boot_memory import WarmBootWorker, boot_in_process, quick_memory_summary
+from internal_memory import OrganizationalMemory
+from test_memory_indexes import fresh_memory_dir
+from test_memory_store import sample_memory
+
+_MISSING = object()
+
+
+@contextmanager
+def session_init(run_session_boot):
+    """Stand in for claude_session_init - None makes importing it fail"""
+    module = None
+    if run_session_boot is not None:
+        module = types.ModuleType('claude_session_init')
+        module.run_session_boot = run_session_boot
+    previous = sys.modules.get('claude_session_init', _MISSING)
+    sys.modules['claude_session_init'] = module
+    try:
+        yield
+    finally:
+        if previous is _MISSING:
+            del sys.modules['claude_session_init']
+        else:
+            sys.modules['claude_session_init'] = previous
+
+
+def test_boot_in_process_streams_output():
+    """A normal boot succeeds, and its output appears while it is still running"""
+    printed, release = threading.Event(), threading.Event()
+
+    def boot():
+        print("🔄 Loading organizational memories...")
+        printed.set()
+        release.wait(5)
+        return {'total_memories': 1}
+
+    out = io.StringIO()
+    outcome = []
+    with fresh_memory_dir() as tmp, session_init(boot), redirect_stdout(out):
+        caller = threading.Thread(target=lambda: outcome.append(boot_in_process(tmp, timeout=5)))
+        caller.start()
+        assert printed.wait(5)
+        assert "Loading organizational memories" in out.getvalue() and not outcome
+        release.set()
+        caller.join(5)
+
+    assert outcome == [True]
+
+
+def test_boot_in_process_timeout_is_reported():
+    """An overrun boot is reported as still running and blocks a second boot until done"""
+    release = threading.Event()
+    calls = []
+
+    def boot():
+        calls.append(1)
+        release.wait(5)
+
+    out = io.StringIO()
+    with fresh_memory_dir() as tmp, session_init(boot), redirect_stdout(out):
+        assert boot_in_process(tmp, timeout=0.1) is False
+        assert "still running in the background" in out.getvalue()
+
+        assert boot_in_process(tmp, timeout=0.1) is False
+        assert "not starting another" in out.getvalue() and len(calls) == 1
+
+        release.set()
+        auto_boot_memory._abandoned_boot.join(5)
+        assert boot_in_process(tmp, timeout=5) is True and len(calls) == 2
+
+
+def test_missing_session_init_falls_back():
+    """Without claude_session_init the boot fails soft and the quick summary still reports"""
+    out = io.StringIO()
+    with fresh_memory_dir() as tmp, session_init(None), redirect_stdout(out):
+        OrganizationalMemory().create_memories([sample_memory(
+            "Memory loader ships today",
+            event={"type": "discovery", "category": "technical",
+                   "description": "Memory loader ships today", "significance": "critical"}
+        )])
+        assert boot_in_process(tmp) is False
+        quick_memory_summary()
+
+    text = out.getvalue()
+    assert "Memory system error" in text and "Proceeding without memory context" in text
+    assert "Total memories: 1" in text and "Latest critical: Memory loader ships today" in text
+
+
+def test_warm_worker_recovers_after_overrun():
+    """Consecutive warm boots - an overrun one, a reply given up on, then a normal one"""
+    with fresh_memory_dir() as tmp:
+        delay = tmp / "delay"
+        log = tmp / "boots.log"
+
+        def boot():
+            seconds = float(delay.read_text())
+            with open(log, 'a') as f:
+                f.write(f"{seconds}\n")
+            time.sleep(seconds)
+            return True
+
+        delay.write_text("0")
+        with session_init(boot):
+            worker = WarmBootWorker(tmp).start()
+        try:
+            assert worker.boot(timeout=5) is True
+
+            delay.write_text("0.5")
+            assert worker.boot(timeout=0.2) is False
+
+            # A boot the caller gave up on is still queued ahead - its
+            # 'timeout' reply must not be taken for the next boot's
+            worker._commands.write("boot 1000 0.1\n")
+            worker._commands.flush()
+            assert worker.boot(timeout=5) is True
+            assert worker._received == b''
+        finally:
+            worker.close()
+
+        assert log.read_text().split() == ["0.0", "0.5", "0.5", "0.5"]
+
+
+if __name__ == "__main__":
+    print("🧪 Auto boot tests")
+    test_boot_in_process_streams_output()
+    print("  ✓ In-process boot streams its output")
+    test_boot_in_process_timeout_is_reported()
+    print("  ✓ Overrun in-process boot reported and not doubled up")
+    test_missing_session_init_falls_back()
+    print("  ✓ Missing session init falls back to the quick summary")
+    test_warm_worker_recovers_after_overrun()
+    print("  ✓ Warm worker recovers after an overrun boot")
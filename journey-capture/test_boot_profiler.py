@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test the boot profiler and boot step executor
+Nested spans, timing log, baseline regressions, concurrency and isolation
+"""
+
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+
+import boot_profiler
+from boot_profiler import (check_regressions, finish_boot, load_records,
+                           profile_boot, save_baseline, span)
+from boot_steps import BootStep, run_boot_steps
+from test_memory_indexes import fresh_memory_dir
+
+
+def run_inbox_check():
+    with span('inbox'):
+        pass
+
+
+def test_spans_nest_per_thread():
+    """Span names follow their enclosing span on the same thread only"""
+    with profile_boot() as profiler:
+        with span('load'):
+            with span('query'):
+                pass
+            worker = threading.Thread(target=run_inbox_check)
+            worker.start()
+            worker.join()
+
+    names = {s['name'] for s in profiler.spans}
+    assert names == {'load', 'load/query', 'inbox'}
+    assert boot_profiler._active is None
+
+    # Without an active profiler spans cost nothing and record nothing
+    with span('ignored'):
+        pass
+    assert 'ignored' not in {s['name'] for s in profiler.spans}
+
+
+def test_timing_log_and_regressions():
+    """Each boot appends a record; slow phases are flagged against the baseline"""
+    with fresh_memory_dir():
+        for _ in range(3):
+            with profile_boot() as profiler:
+                with span('markers'):
+                    pass
+                finish_boot(profiler)
+
+        records = load_records()
+        assert len(records) == 3
+        save_baseline(records)
+
+        slow = records[-1]
+        slow['spans'].append({'name': 'markers', 'start_ms': 0, 'duration_ms': 50.0})
+        regressions = check_regressions(slow)
+        assert len(regressions) == 1 and regressions[0].startswith('markers')
+        assert check_regressions(records[0]) == []
+
+
+def test_boot_steps_run_concurrently():
+    """Independent steps overlap, so wall time follows the critical path"""
+    def sleeper(value):
+        def step(results):
+            time.sleep(0.2)
+            return value
+        return step
+
+    start = time.monotonic()
+    run = run_boot_steps([
+        BootStep('load', sleeper(1)),
+        BootStep('inbox', sleeper(2)),
+        BootStep('manifest', lambda results: results['load'] + 10, deps=['load']),
+        BootStep('context', sleeper(3), deps=['load']),
+    ], quiet=True)
+
+    assert time.monotonic() - start < 0.6
+    assert run.results == {'load': 1, 'inbox': 2, 'manifest': 11, 'context': 3}
+    assert all(run.ok(name) for name in run.results)
+
+
+def test_boot_step_failures_are_isolated():
+    """Failures and timeouts skip dependents only - steps merely run after them go ahead"""
+    def broken(results):
+        raise RuntimeError("disk full")
+
+    start = time.monotonic()
+    run = run_boot_steps([
+        BootStep('load', broken),
+        BootStep('manifest', lambda results: 'written', deps=['load']),
+        BootStep('inbox', lambda results: time.sleep(5), timeout=0.2),
+        BootStep('reply', lambda results: 'sent', deps=['inbox']),
+        BootStep('metrics', lambda results: 'ok'),
+        BootStep('summary', lambda results: sorted(results), after=['inbox', 'metrics']),
+    ], quiet=True)
+
+    assert time.monotonic() - start < 1.0
+    assert run.status == {'load': 'failed', 'manifest': 'skipped', 'inbox': 'timeout',
+                          'reply': 'skipped', 'metrics': 'ok', 'summary': 'ok'}
+    assert run.results['summary'] == ['metrics']
+    assert str(run.errors['load']) == "disk full"
+
+
+def test_boot_step_output_in_step_order():
+    """Concurrent steps print whole blocks in step order; exits fail fast"""
+    def chatty(label, delay):
+        def step(results):
+            for i in range(3):
+                print(f"{label} line {i}")
+                time.sleep(delay)
+            return label
+        return step
+
+    def quitter(results):
+        raise SystemExit(2)
+
+    out = io.StringIO()
+    start = time.monotonic()
+    with redirect_stdout(out):
+        run = run_boot_steps([
+            BootStep('slow', chatty('slow', 0.05)),
+            BootStep('fast', chatty('fast', 0.01)),
+            BootStep('exit', quitter, timeout=10),
+        ])
+
+    assert time.monotonic() - start < 2
+    assert out.getvalue().splitlines() == [
+        "slow line 0", "slow line 1", "slow line 2",
+        "fast line 0", "fast line 1", "fast line 2",
+        "⚠️  Boot step exit failed: 2",
+    ]
+    assert run.status['exit'] == 'failed' and isinstance(run.errors['exit'], SystemExit)
+
+
+if __name__ == "__main__":
+    print("🧪 Boot profiler and step tests")
+    test_spans_nest_per_thread()
+    print("  ✓ Spans nest per thread")
+    test_timing_log_and_regressions()
+    print("  ✓ Timing log and baseline regressions")
+    test_boot_steps_run_concurrently()
+    print("  ✓ Independent boot steps run concurrently")
+    test_boot_step_failures_are_isolated()
+    print("  ✓ Boot step failures are isolated")
+    test_boot_step_output_in_step_order()
+    print("  ✓ Step output kept whole and in order")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted boot context assembly
+The manifest must fit its budget and keep the most valuable material
+"""
+
+import threading
+
+from artifact_writer import write_artifact, write_json_artifact
+from context_assembler import ContextAssembler, estimate_tokens
+from context_document import ContextDocument, section_index
+from session_memory_bridge import MEMORY_SECTION_HEADING, SessionMemoryBridge
+from test_memory_indexes import fresh_memory_dir
+
+# Tokens the old fixed slices ([:5] insights and [:3] flows in the manifest,
+# [:3] and [:2] in CURRENT_CONTEXT.md) produced for sample_summary()
+FIXED_SLICE_MANIFEST_TOKENS = 400
+FIXED_SLICE_SECTION_TOKENS = 138
+
+
+def sample_summary(insights=40, flows=10):
+    """Summary with more material than any small budget can hold"""
+    return {
+        'total_memories': insights,
+        'key_insights': [
+            {
+                'insight': f"Insight {i}: " + "detail " * 20,
+                'entity': "Pompey (CTO)",
+                'significance': 'critical' if i % 10 == 0 else 'routine',
+                'project': "OS-001"
+            }
+            for i in range(insights)
+        ],
+        'cross_mode_flows': [
+            {'from': f"CTO: cause {i}...", 'to': f"CFO: effect {i}...", 'impact': 'pending'}
+            for i in range(flows)
+        ],
+        'recommended_focus': ["Critical: Insight 0..."]
+    }
+
+
+def test_assembler_packs_by_value_per_token():
+    """Cheap valuable blocks win; section headings are only paid when used"""
+    assembler = ContextAssembler(budget=30)
+    assembler.section('a', "## A\n")
+    assembler.section('b', "## B\n")
+    assembler.add('a', "x" * 200, 10.0)
+    assembler.add('a', "short and useful\n", 1.0)
+    assembler.add('b', "also short\n", 0.5)
+    assembler.add('b', "worthless\n", 0.0)
+
+    packed = assembler.assemble()
+    assert packed == {'a': ["short and useful\n"], 'b': ["also short\n"]}
+    assert assembler.used <= 30
+    assert assembler.render(packed) == "## A\nshort and useful\n## B\nalso short\n"
+
+
+def test_manifest_fits_budget():
+    """The session manifest stays within budget and leads with critical insights"""
+    with fresh_memory_dir():
+        bridge = SessionMemoryBridge(manifest_budget=400)
+        manifest = bridge.inject_into_claude_context(sample_summary())
+
+        assert estimate_tokens(manifest) <= 400
+        assert "Insight 0:" in manifest and "Insight 10:" in manifest
+        assert "Insight 39:" not in manifest
+        assert "Critical: Insight 0..." in manifest
+        assert "### Memory Statistics" in manifest
+
+        roomy = SessionMemoryBridge(manifest_budget=100_000).inject_into_claude_context(sample_summary())
+        assert "Insight 39:" in roomy and "CFO: effect 9" in roomy
+
+
+def test_knowledge_chunks_compete_for_budget():
+    """Close knowledge matches displace routine insights; distant ones do not make it"""
+    with fresh_memory_dir():
+        bridge = SessionMemoryBridge()
+        summary = sample_summary(insights=12, flows=0)
+        chunks = [
+            {'text': "Vector search indexes 1,200 documents", 'source': "README.md", 'score': 0.05},
+            {'text': "Unrelated setup notes " * 10, 'source': "setup.md", 'score': 0.95},
+        ]
+
+        without = bridge.inject_into_claude_context(summary)
+        manifest = bridge.inject_into_claude_context(summary, knowledge_chunks=chunks)
+
+        assert estimate_tokens(manifest) <= bridge.manifest_budget
+        assert "### Related Knowledge" in manifest
+        assert "- Vector search indexes 1,200 documents\n  - Source: README.md" in manifest
+        assert "Unrelated setup notes" not in manifest
+        dropped = [i for i in range(12) if f"Insight {i}:" in without and f"Insight {i}:" not in manifest]
+        assert dropped and all(summary['key_insights'][i]['significance'] == 'routine' for i in dropped)
+
+
+def test_boot_context_no_larger_than_fixed_slices():
+    """Default budgets never render more than the old fixed slices did"""
+    with fresh_memory_dir() as tmp:
+        bridge = SessionMemoryBridge()
+        bridge.current_context_path = tmp / "CURRENT_CONTEXT.md"
+        for summary in (sample_summary(), sample_summary(insights=400, flows=100)):
+            manifest = bridge.inject_into_claude_context(summary)
+            assert estimate_tokens(manifest) <= FIXED_SLICE_MANIFEST_TOKENS
+
+            bridge.update_current_context(summary)
+            section = ContextDocument(bridge.current_context_path, "").read_section(MEMORY_SECTION_HEADING)
+            assert estimate_tokens(section) <= FIXED_SLICE_SECTION_TOKENS
+            assert "1. **Pompey (CTO)**: Insight 0:" in section
+
+        # A tight budget holds for the whole section, headings and numbering included
+        bridge.current_context_budget = 80
+        bridge.update_current_context(sample_summary())
+        section = ContextDocument(bridge.current_context_path, "").read_section(MEMORY_SECTION_HEADING)
+        assert estimate_tokens(section) <= 80
+        assert "1. **Pompey (CTO)**: Insight 0:" in section
+
+
+def test_current_context_section_rewrite():
+    """Only the memory section changes, and an unchanged section is not rewritten"""
+    with fresh_memory_dir() as tmp:
+        path = tmp / "CURRENT_CONTEXT.md"
+        path.write_text("# Current Context\n\n## Active Work\n- Shipping OS-001\n\n## Notes\nKeep me\n")
+        bridge = SessionMemoryBridge()
+        bridge.current_context_path = path
+
+        assert bridge.update_current_context(sample_summary(insights=3, flows=1))
+        content = path.read_text()
+        index = section_index(content)
+        assert list(index) == ["## Organizational Memory Insights", "## Active Work", "## Notes"]
+        assert "- Shipping OS-001\n" in content and "Keep me" in content
+
+        inode = path.stat().st_ino
+        assert not bridge.update_current_context(sample_summary(insights=3, flows=1))
+        assert path.stat().st_ino == inode
+
+        assert bridge.update_current_context(sample_summary(insights=2, flows=1))
+        content = path.read_text()
+        assert content.count("## Organizational Memory Insights") == 1
+        assert "Insight 2:" not in content and "Keep me" in content
+
+
+def test_concurrent_section_writers():
+    """Writers racing on one document never lose each other's sections"""
+    with fresh_memory_dir() as tmp:
+        document = ContextDocument(tmp / "CURRENT_CONTEXT.md", "# Current Context\n\n")
+        writers = [
+            threading.Thread(target=document.write_section, args=(f"## Section {i}", f"body {i}"))
+            for i in range(8)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+
+        index = section_index(document.path.read_text())
+        assert sorted(index) == [f"## Section {i}" for i in range(8)]
+        assert document.read_section("## Section 3") == "## Section 3\nbody 3\n\n"
+
+
+def test_artifacts_rewritten_only_on_change():
+    """Volatile lines and keys alone never cause a rewrite"""
+    with fresh_memory_dir() as tmp:
+        path = tmp / "MEMORY_METRICS.txt"
+        assert write_artifact(path, "Total: 3\nGenerated: 10:00\n", volatile=('Generated:',))
+        inode = path.stat().st_ino
+        assert not write_artifact(path, "Total: 3\nGenerated: 10:05\n", volatile=('Generated:',))
+        assert path.stat().st_ino == inode and "10:00" in path.read_text()
+        assert write_artifact(path, "Total: 4\nGenerated: 10:05\n", volatile=('Generated:',))
+
+        state = tmp / "SESSION_MEMORIES.json"
+        assert write_json_artifact(state, {'timestamp': 1, 'stats': {'total': 3}}, volatile_keys=('timestamp',))
+        assert state.read_text() == '{"timestamp":1,"stats":{"total":3}}'
+        assert not write_json_artifact(state, {'stats': {'total': 3}, 'timestamp': 2}, volatile_keys=('timestamp',))
+        assert write_json_artifact(state, {'timestamp': 2, 'stats': {'total': 4}}, volatile_keys=('timestamp',))
+
+        # Two identical session saves in a row - only the nested timestamps differ
+        bridge = SessionMemoryBridge()
+        summary = dict(sample_summary(insights=3), timestamp="2025-01-01T10:00:00")
+        bridge.save_session_memories(summary)
+        inode = bridge.session_memory_path.stat().st_ino
+        bridge.save_session_memories(dict(summary, timestamp="2025-01-01T10:05:00"))
+        assert bridge.session_memory_path.stat().st_ino == inode
+
+        bridge = SessionMemoryBridge()
+        bridge.inject_into_claude_context(sample_summary(insights=3))
+        inode = bridge.memory_manifest_path.stat().st_ino
+        bridge.inject_into_claude_context(sample_summary(insights=3))
+        assert bridge.memory_manifest_path.stat().st_ino == inode
+
+
+if __name__ == "__main__":
+    print("🧪 Context assembler tests")
+    test_assembler_packs_by_value_per_token()
+    print("  ✓ Packs by value per token")
+    test_manifest_fits_budget()
+    print("  ✓ Manifest fits its token budget")
+    test_knowledge_chunks_compete_for_budget()
+    print("  ✓ Knowledge chunks compete for the manifest budget")
+    test_boot_context_no_larger_than_fixed_slices()
+    print("  ✓ Boot context no larger than the old fixed slices")
+    test_current_context_section_rewrite()
+    print("  ✓ CURRENT_CONTEXT.md section rewritten only on change")
+    test_concurrent_section_writers()
+    print("  ✓ Concurrent section writers keep every section")
+    test_artifacts_rewritten_only_on_change()
+    print("  ✓ Artifacts rewritten only on change")
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Test journey capture
+Queued captures are committed in batches and counted without rescanning
+"""
+
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from background_writer import BackgroundBatchWriter
+from journey_io import JOURNEY_SCHEMA_PATH, export_journeys, import_journeys
+from quick_capture import JOURNEY_TOTALS_SQL, QuickJourneyCapture
+from schema_validation import load_validator
+from time_ids import uuid7, uuid7_datetime
+from test_memory_indexes import fresh_memory_dir, query_plan
+
+
+def test_queued_capture_batches_and_counts():
+    """Thousands of queued journeys land in a handful of transactions"""
+    with fresh_memory_dir() as tmp:
+        capture = QuickJourneyCapture()
+        first = capture.capture_journey("direct question", {'pet': 'cat'}, "answer")
+
+        ids = [capture.submit_journey(f"question {i}", {'i': i}, "answer", source="bulk")
+               for i in range(3000)]
+        assert all(ids)
+        assert capture.flush(timeout=10)
+
+        writer = capture.store.writer.get_stats()
+        assert writer['written'] == 3000 and writer['failed'] == 0
+        assert writer['batches'] <= 3000 // 100
+
+        stats = capture.get_stats()
+        assert stats['total'] == 3001 and stats['today'] == 3001
+        assert stats['sources'] == {'direct': 1, 'bulk': 3000}
+
+        counter = (tmp / "JOURNEY_COUNT.txt").read_text()
+        assert "Journeys captured today: 3001" in counter
+        row = capture.db.connection().execute("SELECT query FROM journeys WHERE id = ?", (first,)).fetchone()
+        assert row == ("direct question",)
+
+
+def test_queued_journeys_flushed_at_exit():
+    """Journeys still queued when the interpreter exits are committed"""
+    with fresh_memory_dir() as tmp:
+        script = (
+            "from quick_capture import QuickJourneyCapture\n"
+            "capture = QuickJourneyCapture()\n"
+            "for i in range(250):\n"
+            "    capture.submit_journey(f'q{i}', {}, 'r')\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True,
+                       env=dict(os.environ, PYTHONPATH=str(Path(__file__).parent)))
+
+        capture = QuickJourneyCapture()
+        assert capture.get_stats()['total'] == 250
+        assert "Total journeys: 250" in (tmp / "JOURNEY_COUNT.txt").read_text()
+
+
+def test_flush_after_close_returns():
+    """A closed writer has nothing left to flush - flush() must not hang"""
+    written = []
+    writer = BackgroundBatchWriter(written.extend, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.submit(i)
+    writer.close()
+    assert writer.flush() is True
+    assert written == list(range(25))
+    assert writer.get_stats()['written'] == 25 and not writer.submit(99)
+
+
+def test_writer_samples_records():
+    """A sample rate keeps roughly that share of records and counts the rest"""
+    random.seed(7)
+    written = []
+    writer = BackgroundBatchWriter(written.extend, batch_size=100, sample_rate=0.25)
+    accepted = sum(writer.submit(i) for i in range(2000))
+    writer.close()
+
+    stats = writer.get_stats()
+    assert 350 < accepted < 650
+    assert stats['submitted'] == accepted and stats['sampled_out'] == 2000 - accepted
+    assert len(written) == accepted == stats['written']
+
+
+def blocked_writer(**options):
+    """Writer whose flush_fn is stuck on its first record until released"""
+    entered, release = threading.Event(), threading.Event()
+    written = []
+
+    def flush(batch):
+        entered.set()
+        release.wait(5)
+        written.extend(batch)
+
+    writer = BackgroundBatchWriter(flush, batch_size=1, max_queue=5, **options)
+    assert writer.submit('first') and entered.wait(5)
+    return writer, release, written
+
+
+def test_writer_drops_when_full():
+    """Under 'drop' a full queue rejects new records at once and counts them"""
+    writer, release, written = blocked_writer(overflow='drop')
+    assert all(writer.submit(i) for i in range(5))
+
+    start = time.monotonic()
+    assert writer.submit('overflow') is False
+    assert time.monotonic() - start < 0.1
+    assert writer.get_stats()['dropped'] == 1
+
+    release.set()
+    writer.close()
+    assert written == ['first', 0, 1, 2, 3, 4]
+
+
+def test_writer_blocks_when_full():
+    """Under 'block' a full queue holds the caller until space frees up or time runs out"""
+    writer, release, written = blocked_writer(overflow='block', block_timeout=0.2)
+    assert all(writer.submit(i) for i in range(5))
+
+    start = time.monotonic()
+    assert writer.submit('late') is False
+    assert time.monotonic() - start >= 0.2
+    assert writer.get_stats()['dropped'] == 1
+
+    writer.block_timeout = 5
+    threading.Timer(0.2, release.set).start()
+    start = time.monotonic()
+    assert writer.submit('waited') is True
+    assert time.monotonic() - start >= 0.15
+
+    writer.close()
+    assert written == ['first', 0, 1, 2, 3, 4, 'waited']
+
+
+def test_writer_close_races_submit():
+    """Every record submit() accepted is written, however close() interleaves"""
+    written = []
+    writer = BackgroundBatchWriter(written.extend, batch_size=50, max_queue=100_000)
+    accepted = [0] * 4
+
+    def producer(n):
+        for i in range(5000):
+            accepted[n] += writer.submit(i)
+
+    producers = [threading.Thread(target=producer, args=(n,)) for n in range(4)]
+    for thread in producers:
+        thread.start()
+    time.sleep(0.01)
+    writer.close(timeout=10)
+    for thread in producers:
+        thread.join()
+
+    assert len(written) == sum(accepted) == writer.get_stats()['written']
+
+
+def test_daily_rollup_tracks_writes():
+    """Stats come from the rollup and an index, never a scan of journeys"""
+    with fresh_memory_dir():
+        capture = QuickJourneyCapture()
+        conn = capture.db.connection()
+        with capture.db.transaction():
+            conn.executemany(
+                "INSERT INTO journeys (id, timestamp, context, query, response, source) VALUES (?, ?, '{}', 'q', 'r', ?)",
+                [(f"old{i}", f"2025-01-0{1 + i % 3}T10:00:00", 'import') for i in range(9)]
+            )
+        capture.capture_journey("today", {}, "r")
+
+        today = datetime.now().date().isoformat()
+        assert capture.get_daily_counts() == {
+            '2025-01-01': 3, '2025-01-02': 3, '2025-01-03': 3, today: 1
+        }
+        stats = capture.get_stats()
+        assert stats['total'] == 10 and stats['today'] == 1
+        assert stats['sources'] == {'import': 9, 'direct': 1}
+
+        with capture.db.transaction():
+            conn.execute("DELETE FROM journeys WHERE id = 'old0'")
+        assert capture.get_stats()['total'] == 9
+        assert capture.get_daily_counts(since='2025-01-02')['2025-01-02'] == 3
+
+        # Moving a journey to another day or source moves its count
+        with capture.db.transaction():
+            conn.execute("UPDATE journeys SET timestamp = '2025-01-05T10:00:00', source = 'direct' WHERE id = 'old1'")
+            conn.execute("UPDATE journeys SET query = 'edited' WHERE id = 'old2'")
+        assert capture.get_daily_counts(since='2025-01-02') == {
+            '2025-01-02': 2, '2025-01-03': 3, '2025-01-05': 1, today: 1
+        }
+        assert capture.get_stats()['sources'] == {'import': 7, 'direct': 2}
+
+        plan = query_plan(conn, JOURNEY_TOTALS_SQL, ('2025-01-01',))
+        journey_steps = [step for step in plan if step.split()[1:2] == ['journeys']]
+        assert journey_steps and all('idx_journeys_timestamp' in step for step in journey_steps), plan
+
+
+def test_compressed_bodies_read_lazily():
+    """Large bodies move to journey_bodies and are only inflated when read"""
+    with fresh_memory_dir():
+        capture = QuickJourneyCapture()
+        advice = "Increased thirst in cats can point to kidney disease or diabetes. " * 12
+        ids = [capture.capture_journey(f"Cat {i} drinks a lot - worried?", {'pet': 'cat', 'i': i},
+                                       advice + f"Case {i}.") for i in range(50)]
+        short = capture.capture_journey("hi", {}, "hello")
+
+        result = capture.compress_bodies()
+        assert result['compressed'] == 50
+        conn = capture.db.connection()
+        inline, = conn.execute("SELECT SUM(length(response)) FROM journeys WHERE id <> ?", (short,)).fetchone()
+        stored, = conn.execute("SELECT SUM(length(response)) FROM journey_bodies").fetchone()
+        assert inline == 0 and stored < len(advice) * 50 / 5
+
+        record = capture.get_journey(ids[7])
+        assert not record._decoded
+        assert record.response == advice + "Case 7."
+        assert list(record._decoded) == ['response']
+        assert record.context == {'pet': 'cat', 'i': 7}
+        assert capture.get_journey(short).response == "hello"
+
+        # New captures are compressed too, and listing never needs the bodies
+        fresh = capture.capture_journey("Cat again", {}, advice)
+        assert conn.execute("SELECT response FROM journeys WHERE id = ?", (fresh,)).fetchone() == ('',)
+        assert capture.get_journey(fresh).response == advice
+        assert capture.list_journeys(limit=1)[0]['id'] == fresh
+
+
+def health_journey(i):
+    """A valid HealthJourney document"""
+    return {
+        'id': uuid7(),
+        'timestamp': f"2025-02-{1 + i % 28:02d}T12:00:00",
+        'version': "0.1.0",
+        'context': {
+            'subject': {'type': 'feline', 'age': 9, 'conditions': ['ckd']},
+            'concern': {'category': 'kidney', 'description': f"Drinking more water ({i})", 'urgency': 'soon'},
+            'emotional_state': 'worried'
+        },
+        'interaction': {
+            'source': 'ChatGPT',
+            'query': f"My cat drinks a lot - case {i}",
+            'guidance': "Check kidney values with your vet. " * 20,
+            'similar_journeys_referenced': []
+        },
+        'consent': {'data_usage': True, 'follow_up': False},
+        'outcome': None,
+        'metadata': {'app_version': '0.1'}
+    }
+
+
+def test_ndjson_import_export_roundtrip():
+    """Valid journeys round-trip through NDJSON; invalid and repeated lines are skipped"""
+    with fresh_memory_dir() as tmp:
+        documents = [health_journey(i) for i in range(120)]
+        dump = tmp / "journeys.ndjson"
+        with open(dump, 'w') as f:
+            for i, document in enumerate(documents):
+                f.write(json.dumps(document) + "\n")
+                if i == 10:
+                    f.write("{not json\n")
+                    f.write(json.dumps(dict(document, id="not-a-uuid")) + "\n")
+
+        capture = QuickJourneyCapture()
+        capture.capture_journey("quick one", {}, "answer")
+        report = import_journeys(dump, capture, batch_size=50)
+        assert report['imported'] == 120 and report['invalid'] == 2
+        assert report['errors'][0].startswith("Line 12: not JSON")
+        assert "does not match" in report['errors'][1]
+        assert capture.get_stats()['sources']['ChatGPT'] == 120
+
+        assert import_journeys(dump, capture)['duplicates'] == 120
+
+        capture.compress_bodies()
+        out = tmp / "export.ndjson"
+        report = export_journeys(out, capture)
+        assert report == {'exported': 120, 'skipped': 1}
+        exported = [json.loads(line) for line in out.read_text().splitlines()]
+        by_id = {document['id']: document for document in documents}
+        assert all(document == by_id[document['id']] for document in exported)
+
+
+def test_import_counts_every_rejected_line():
+    """A line the fast check rejects is reported even if jsonschema finds no error"""
+    with fresh_memory_dir() as tmp:
+        documents = [health_journey(i) for i in range(3)]
+        dump = tmp / "journeys.ndjson"
+        dump.write_text("".join(json.dumps(document) + "\n" for document in documents))
+
+        validator = load_validator(JOURNEY_SCHEMA_PATH)
+        check = validator._check
+        validator._check = lambda document: document['id'] != documents[1]['id']
+        try:
+            report = import_journeys(dump, QuickJourneyCapture())
+        finally:
+            validator._check = check
+
+        assert report['imported'] == 2 and report['invalid'] == 1
+        assert report['errors'] == ["Line 2: does not match the journey schema"]
+
+
+def test_time_ordered_ids():
+    """IDs are UUIDv7, unique and increasing even within one millisecond"""
+    ids = [uuid7() for _ in range(20000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(i[14] == '7' and i[19] in '89ab' for i in ids[:100])
+    assert abs((uuid7_datetime(ids[0]) - datetime.now()).total_seconds()) < 5
+    assert uuid7_datetime('70176757a84d') is None
+
+
+def test_rollup_backfilled_by_migration():
+    """An existing database gets its rollup built from the rows it already has"""
+    with fresh_memory_dir() as tmp:
+        conn = sqlite3.connect(tmp / "journeys.db")
+        conn.execute("""
+            CREATE TABLE journeys (
+                id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, context TEXT NOT NULL,
+                query TEXT NOT NULL, response TEXT NOT NULL, source TEXT DEFAULT 'direct',
+                outcome TEXT, metadata TEXT
+            )
+        """)
+        conn.executemany("INSERT INTO journeys VALUES (?, ?, '{}', 'q', 'r', 'direct', NULL, NULL)",
+                         [(f"{i:012x}", f"2025-03-01T09:00:0{4 - i}") for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        capture = QuickJourneyCapture()
+        assert capture.db.connection().execute("PRAGMA user_version").fetchone()[0] >= 1
+        assert capture.get_daily_counts() == {'2025-03-01': 5}
+
+        # Legacy IDs are re-keyed in time order and still resolve
+        rows = capture.db.connection().execute("SELECT id, timestamp FROM journeys ORDER BY id").fetchall()
+        assert [timestamp for _, timestamp in rows] == sorted(timestamp for _, timestamp in rows)
+        assert all(uuid7_datetime(journey_id) for journey_id, _ in rows)
+        newest = capture.resolve_journey_id(f"{0:012x}")
+        assert newest == rows[-1][0]
+        assert capture.resolve_journey_id(newest) == newest
+
+
+if __name__ == "__main__":
+    print("🧪 Journey capture tests")
+    test_queued_capture_batches_and_counts()
+    print("  ✓ Queued captures batch and count")
+    test_queued_journeys_flushed_at_exit()
+    print("  ✓ Queued journeys flushed at exit")
+    test_flush_after_close_returns()
+    print("  ✓ Flush after close returns")
+    test_writer_samples_records()
+    print("  ✓ Writer samples records")
+    test_writer_drops_when_full()
+    print("  ✓ Writer drops when full")
+    test_writer_blocks_when_full()
+    print("  ✓ Writer blocks when full")
+    test_writer_close_races_submit()
+    print("  ✓ Close never loses an accepted record")
+    test_daily_rollup_tracks_writes()
+    print("  ✓ Daily rollup tracks inserts, updates and deletes")
+    test_compressed_bodies_read_lazily()
+    print("  ✓ Compressed bodies read lazily")
+    test_ndjson_import_export_roundtrip()
+    print("  ✓ NDJSON import/export round trip")
+    test_import_counts_every_rejected_line()
+    print("  ✓ Every rejected import line is counted")
+    test_time_ordered_ids()
+    print("  ✓ Time-ordered IDs")
+    test_rollup_backfilled_by_migration()
+    print("  ✓ Rollup backfilled and legacy IDs re-keyed by migration")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test that boot queries stay index-driven as memories accumulate
+Uses EXPLAIN QUERY PLAN so a missing index fails loudly
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import memory_loader
+from internal_memory import OrganizationalMemory, MIGRATIONS, LINEAGE_SQL, CROSS_MODE_FLOWS_SQL
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+
+@contextmanager
+def fresh_memory_dir():
+    """Run inside a throwaway directory with its own memory database"""
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(SCHEMA_DIR, Path(tmp) / "schemas")
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(previous)
+
+
+def query_plan(conn, sql, params=()):
+    """Flatten EXPLAIN QUERY PLAN output into its detail strings"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def assert_uses_index(plan, sql):
+    """Every access to memories must go through an index, never a bare scan"""
+    memory_steps = [step for step in plan if 'memories' in step]
+    assert memory_steps, f"No memories access in plan for: {sql}"
+    for step in memory_steps:
+        assert 'INDEX' in step, f"Full table scan ({step}) for: {sql}"
+
+
+def test_migrations_recorded():
+    """Fresh databases end up at the latest schema version"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        conn = memory.db.connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        assert version == MIGRATIONS[-1][0]
+
+        # Re-opening must not re-run or fail migrations
+        OrganizationalMemory()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+
+
+def test_boot_query_uses_indexes():
+    """Every slice of the single boot query is served by an index"""
+    with fresh_memory_dir():
+        conn = OrganizationalMemory().db.connection()
+        params = {'since': "2025-01-01T00:00:00", 'mode': "CTO", 'project': "Studio-001"}
+        sql = memory_loader.BOOT_MEMORIES_SQL
+
+        plan = query_plan(conn, sql, params)
+        assert_uses_index(plan, sql)
+
+        # Tables are only ever searched - the one scan is the ordered walk of
+        # the partial significance index, which LIMIT cuts short
+        table_scans = [step for step in plan
+                       if step.startswith('SCAN') and step.split()[1] in ('memories', 'connections', 'c', 'a', 'b')]
+        assert table_scans == ["SCAN memories USING INDEX idx_memories_significant_timestamp"], plan
+
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        details = {row[0]: row[3] for row in rows}
+        sorted_in = [details.get(row[1]) for row in rows if 'TEMP B-TREE' in row[3]]
+        assert 'MATERIALIZE high_significance' not in sorted_in, plan
+
+
+def test_related_memory_queries_use_indexes():
+    """find_related_memories uses an index for every filter combination"""
+    with fresh_memory_dir():
+        conn = OrganizationalMemory().db.connection()
+
+        filters = [
+            {},
+            {'entity_name': "Pompey"},
+            {'entity_name': "Pompey", 'entity_mode': "CTO"},
+            {'entity_mode': "CTO"},
+            {'project': "OS-001"},
+            {'entity_name': "Caesar", 'entity_mode': "Founder", 'project': "OS-001"},
+        ]
+        for kwargs in filters:
+            sql, params = OrganizationalMemory._related_memories_query(**kwargs)
+            assert_uses_index(query_plan(conn, sql, params), sql)
+
+
+def test_graph_traversal_uses_connection_indexes():
+    """Recursive graph steps look edges up by index, not by scanning"""
+    with fresh_memory_dir():
+        conn = OrganizationalMemory().db.connection()
+
+        queries = [
+            (OrganizationalMemory._neighborhood_query(direction), ("seed", 2, "seed", 10))
+            for direction in ('out', 'in', 'both')
+        ]
+        queries.append((LINEAGE_SQL, ("seed", 5, 10)))
+        queries.append((CROSS_MODE_FLOWS_SQL, ('["seed"]', 3)))
+
+        for sql, params in queries:
+            plan = query_plan(conn, sql, params)
+            edge_steps = [step for step in plan if step.startswith(('SCAN c', 'SEARCH c', 'MULTI-INDEX'))]
+            assert edge_steps, plan
+            assert all('INDEX' in step and 'AUTOMATIC' not in step for step in edge_steps), plan
+
+
+if __name__ == "__main__":
+    print("🧪 Memory index tests")
+    test_migrations_recorded()
+    print("  ✓ Migrations recorded in user_version")
+    test_boot_query_uses_indexes()
+    print("  ✓ Boot query uses indexes")
+    test_related_memory_queries_use_indexes()
+    print("  ✓ Related-memory queries use indexes")
+    test_graph_traversal_uses_connection_indexes()
+    print("  ✓ Graph traversal uses connection indexes")
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Test the organizational memory write and query paths
+Bulk ingestion, validation and stored relationships
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import jsonschema
+
+from claude_session_init import run_session_boot
+from db_connection import ConnectionManager
+from internal_memory import MIGRATIONS, OrganizationalMemory, _create_tables
+from memory_graph import MemoryGraph
+from memory_loader import MemoryLoader, MemoryRecord
+import memory_scoring
+from memory_scoring import DEFAULT_WEIGHTS, MemoryScorer
+from schema_validation import CompiledValidator
+from test_memory_indexes import fresh_memory_dir
+
+VECTOR_SEARCH_DIR = Path(__file__).parent.parent / "os_modules" / "os_002_1_vector_search"
+
+
+def sample_memory(description, mode="CTO", **extra):
+    """Minimal schema-valid create_memory arguments"""
+    item = {
+        'entity': {"type": "pompey", "name": "Pompey", "mode": mode},
+        'event': {"type": "discovery", "category": "technical", "description": description},
+        'context': {"session_id": "test", "project": "OS-001"}
+    }
+    item.update(extra)
+    return item
+
+
+def test_connection_per_thread():
+    """One shared manager per file; each thread reuses its own connection"""
+    with fresh_memory_dir() as tmp:
+        manager = ConnectionManager.for_path("connections.db")
+        assert ConnectionManager.for_path(tmp / "connections.db") is manager
+        assert ConnectionManager.for_path("other.db") is not manager
+
+        conn = manager.connection()
+        assert manager.connection() is conn
+
+        seen = []
+        def worker():
+            seen.append(manager.connection())
+            seen.append(manager.connection())
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert seen[0] is seen[1] and seen[0] is not conn
+
+
+def test_connection_pragmas_applied():
+    """WAL journaling and the tuned pragmas are live on every connection"""
+    with fresh_memory_dir():
+        conn = ConnectionManager.for_path("pragmas.db").connection()
+        pragma = lambda name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('cache_size') == -8000
+        assert pragma('temp_store') == 2  # MEMORY
+        assert pragma('busy_timeout') == 5000
+        assert conn.isolation_level is None
+
+
+def test_nested_transaction_savepoints():
+    """A failing inner transaction rolls back only its own writes"""
+    with fresh_memory_dir():
+        manager = ConnectionManager.for_path("nested.db")
+        with manager.transaction() as conn:
+            conn.execute("CREATE TABLE items (name TEXT)")
+
+        with manager.transaction() as conn:
+            conn.execute("INSERT INTO items VALUES ('outer')")
+            try:
+                with manager.transaction():
+                    conn.execute("INSERT INTO items VALUES ('inner')")
+                    raise ValueError("inner failed")
+            except ValueError:
+                pass
+            with manager.transaction():
+                conn.execute("INSERT INTO items VALUES ('second inner')")
+        names = [row[0] for row in conn.execute("SELECT name FROM items ORDER BY rowid")]
+        assert names == ['outer', 'second inner'] and not conn.in_transaction
+
+        try:
+            with manager.transaction():
+                conn.execute("INSERT INTO items VALUES ('lost')")
+                with manager.transaction():
+                    conn.execute("INSERT INTO items VALUES ('also lost')")
+                raise ValueError("outer failed")
+        except ValueError:
+            pass
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+
+
+def test_create_memories_bulk():
+    """A batch lands in one transaction with edges and relationships"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        first_id = memory.new_memory_id()
+
+        batch = [sample_memory("Root discovery", id=first_id)]
+        batch += [
+            sample_memory(
+                f"Follow-up {i}",
+                mode="Creative_Director",
+                connections={
+                    "influences": [],
+                    "influenced_by": [first_id],
+                    "related_entities": [{"entity": "Crassus", "relationship": "reviewer"}]
+                }
+            )
+            for i in range(20)
+        ]
+        ids = memory.create_memories(batch)
+
+        assert ids[0] == first_id
+        assert len(set(ids)) == 21
+
+        conn = memory.db.connection()
+        assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 21
+        assert conn.execute(
+            "SELECT COUNT(*) FROM connections WHERE from_memory = ?", (first_id,)
+        ).fetchone()[0] == 20
+        assert conn.execute("SELECT COUNT(*) FROM entity_relationships").fetchone()[0] == 20
+
+
+def test_create_memories_is_atomic():
+    """One invalid item rejects the whole batch"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        batch = [sample_memory("Valid"), sample_memory("Invalid")]
+        batch[1]['event'] = dict(batch[1]['event'], type="not_a_type")
+
+        try:
+            memory.create_memories(batch)
+        except jsonschema.ValidationError:
+            pass
+        else:
+            raise AssertionError("Invalid batch was accepted")
+
+        conn = memory.db.connection()
+        assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 0
+
+
+def test_compiled_validator_matches_jsonschema():
+    """The fast check agrees with jsonschema on valid and invalid memories"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        validator = CompiledValidator(memory.schema)
+        reference = jsonschema.Draft7Validator(memory.schema)
+
+        valid = memory._build_memory(**sample_memory(
+            "Validator parity",
+            metadata={"confidence": 0.5, "tags": ["a"]},
+            outcome={"status": "validated", "lessons": ["x"]}
+        ))
+        mutations = [
+            lambda m: m.pop("entity"),
+            lambda m: m["entity"].update(type="assistant"),
+            lambda m: m["event"].update(significance="major"),
+            lambda m: m.update(version="0.2.0"),
+            lambda m: m["connections"].update(influences="not-a-list"),
+            lambda m: m["connections"].update(influences=[1]),
+            lambda m: m["metadata"].update(confidence=1.5),
+            lambda m: m["metadata"].update(confidence=True),
+            lambda m: m["content"].update(insight=None),
+            lambda m: m["content"].update(extra="allowed"),
+        ]
+
+        assert validator.is_valid(valid) and reference.is_valid(valid)
+        for mutate in mutations:
+            document = copy.deepcopy(valid)
+            mutate(document)
+            assert validator.is_valid(document) == reference.is_valid(document)
+
+
+def test_metrics_counters_follow_writes():
+    """Trigger-maintained counters match a full GROUP BY"""
+    with fresh_memory_dir() as tmp:
+        memory = OrganizationalMemory()
+        memory.create_memories(
+            [sample_memory(f"CTO {i}") for i in range(5)]
+            + [sample_memory(f"CD {i}", mode="Creative_Director") for i in range(3)]
+        )
+
+        conn = memory.db.connection()
+        with memory.db.transaction():
+            conn.execute("DELETE FROM memories WHERE event_description = 'CD 0'")
+            # Re-attributed and re-typed memories move between buckets
+            conn.execute("UPDATE memories SET entity_mode = 'CFO', event_type = 'decision' "
+                         "WHERE event_description IN ('CTO 0', 'CTO 1')")
+            conn.execute("UPDATE memories SET insight = 'unchanged buckets' WHERE event_description = 'CTO 2'")
+
+        metrics = memory.get_metrics()
+        assert metrics['total'] == 7
+        assert metrics['by_entity'] == conn.execute("""
+            SELECT entity_name, entity_mode, COUNT(*) FROM memories
+            GROUP BY entity_name, entity_mode ORDER BY entity_name, entity_mode
+        """).fetchall()
+        assert ("Pompey", "CFO", 2) in metrics['by_entity']
+        assert metrics['by_type'] == [("decision", 2), ("discovery", 5)]
+
+        memory.flush_metrics()
+        assert "Total Memories: 7" in (tmp / "MEMORY_METRICS.txt").read_text()
+
+
+def test_search_memories_full_text():
+    """Text search is ranked, filterable and stays in sync with inserts and deletes"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        memory.create_memories([
+            sample_memory("Vector embeddings power semantic recall",
+                          content={"insight": "Meaning beats keywords"}),
+            sample_memory("Collective soul stops organizational amnesia", mode="Founder",
+                          content={"data": {"quote": "one collective soul"}}),
+            sample_memory("Quarterly budget review", mode="CFO"),
+        ])
+        assert memory.has_text_index()
+
+        hits = memory.search_memories("collective soul", match='phrase')
+        assert [m['entity']['mode'] for m in hits] == ["Founder"]
+
+        hits = memory.search_memories("keywords budget")
+        assert {m['entity']['mode'] for m in hits} == {"CTO", "CFO"}
+
+        assert memory.search_memories("keywords budget", match='all') == []
+        assert memory.search_memories("budget", entity_mode="CTO") == []
+        assert memory.search_memories("semantic recall", match='all')[0]['content']['insight'] == \
+            "Meaning beats keywords"
+
+        # Deletes go through the FTS5 'delete' command, keyed by rowid
+        conn = memory.db.connection()
+        with memory.db.transaction():
+            conn.execute("DELETE FROM memories WHERE event_description LIKE 'Quarterly%'")
+        assert {m['entity']['mode'] for m in memory.search_memories("keywords budget")} == {"CTO"}
+        conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('integrity-check')")
+
+
+def test_graph_traversal():
+    """Neighborhood, lineage and cross-mode flows follow connection edges"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        root, middle, leaf = (memory.new_memory_id() for _ in range(3))
+        memory.create_memories([
+            sample_memory("Root", id=root),
+            sample_memory("Middle", mode="Creative_Director", id=middle,
+                          connections={"influences": [], "influenced_by": [root]}),
+            sample_memory("Leaf", mode="CFO", id=leaf,
+                          connections={"influences": [], "influenced_by": [middle]}),
+        ])
+
+        hood = memory.get_neighborhood(root, hops=2, direction='out')
+        assert [(m['id'], m['depth']) for m in hood] == [(middle, 1), (leaf, 2)]
+        assert [m['id'] for m in memory.get_neighborhood(root, hops=1)] == [middle]
+        assert memory.get_neighborhood(root, direction='in') == []
+        assert {m['id'] for m in memory.get_neighborhood(middle, hops=1)} == {root, leaf}
+
+        lineage = memory.get_lineage(leaf)
+        assert [(a['id'], a['depth']) for a in lineage] == [(middle, 1), (root, 2)]
+        assert lineage[-1]['path'] == [root, middle, leaf]
+
+        flows = {(f['from_id'], f['to_id'], f['depth']) for f in memory.get_cross_mode_flows()}
+        assert flows == {(root, middle, 1), (middle, leaf, 1), (root, leaf, 2)}
+
+        try:
+            memory.get_neighborhood(root, direction='sideways')
+            assert False, "unknown direction accepted"
+        except ValueError:
+            pass
+
+
+def test_graph_traversal_dense_and_cyclic():
+    """Walks visit each memory once per level - no path blow-up, no id-prefix mix-ups"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        modes = ["CTO", "CFO", "Creative_Director"]
+        # Five fully connected layers of six, plus an edge from the last layer back to the first
+        layers = [[f"m{layer}{i}" for i in range(6)] for layer in range(5)]
+        memory.create_memories([
+            sample_memory(f"Layer {layer}", mode=modes[layer % 3], id=memory_id,
+                          connections={"influences": [],
+                                       "influenced_by": layers[layer - 1] if layer else [layers[-1][0]]})
+            for layer, ids in enumerate(layers) for memory_id in ids
+        ], validate=False)
+
+        lineage = memory.get_lineage("m40", max_depth=10)
+        assert len(lineage) == len({a['id'] for a in lineage}) == 24
+        assert {a['id']: a['depth'] for a in lineage}["m00"] == 4
+        assert all(len(a['path']) == a['depth'] + 1 and a['path'][-1] == "m40" for a in lineage)
+
+        # "m1" is a prefix of "m10".."m15" - it must still be found as an ancestor
+        memory.create_memories([
+            sample_memory("Prefix", mode="CTO", id="m1",
+                          connections={"influences": [], "influenced_by": ["m15"]}),
+        ], validate=False)
+        assert [a['depth'] for a in memory.get_lineage("m1") if a['id'] == "m15"] == [1]
+
+        flows = memory.get_cross_mode_flows(max_depth=6, limit=1000)
+        pairs = [(f['from_id'], f['to_id']) for f in flows]
+        assert len(pairs) == len(set(pairs))
+        assert {(f['from_id'], f['depth']) for f in flows if f['to_id'] == "m1"} >= {("m40", 3), ("m20", 5)}
+        assert len(memory.get_cross_mode_flows(limit=5)) == 5
+
+
+def test_graph_traversal_mixed_id_schemes():
+    """v4 IDs from before UUIDv7 stay put - traversals order them by timestamp, not ID"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        # Sorts ahead of any UUIDv7 but was stored a year earlier
+        legacy = "00000000-1111-4222-8333-444444444444"
+        newer, leaf = memory.new_memory_id(), memory.new_memory_id()
+        memory.create_memories([
+            sample_memory("Legacy", id=legacy),
+            sample_memory("Newer", id=newer),
+            sample_memory("Leaf", mode="CFO", id=leaf,
+                          connections={"influences": [], "influenced_by": [legacy, newer]}),
+        ])
+        with memory.db.transaction() as conn:
+            conn.execute("UPDATE memories SET timestamp = ? WHERE id = ?",
+                         ((datetime.now() - timedelta(days=365)).isoformat(), legacy))
+
+        assert [a['id'] for a in memory.get_lineage(leaf)] == [newer, legacy]
+        assert [m['id'] for m in memory.get_neighborhood(leaf, direction='in')] == [newer, legacy]
+        assert [f['from_id'] for f in memory.get_cross_mode_flows()] == [newer, legacy]
+
+
+def test_boot_slices_single_query():
+    """Boot slices come back from one query with memories shared, not repeated"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        root = memory.new_memory_id()
+        memory.create_memories([
+            sample_memory("Critical CTO call", id=root,
+                          event={"type": "decision", "category": "technical",
+                                 "description": "Critical CTO call", "significance": "critical"}),
+            sample_memory("Design follow-up", mode="Creative_Director",
+                          connections={"influences": [], "influenced_by": [root]}),
+            sample_memory("Budget", mode="CFO"),
+        ])
+
+        slices = MemoryLoader()._load_boot_memories({'current_mode': "CTO", 'active_project': "OS-001"})
+
+        assert len(slices['recent']) == 3
+        assert [m.description for m in slices['mode_specific']] == ["Critical CTO call"]
+        assert len(slices['project_specific']) == 3
+        assert [m.id for m in slices['high_significance']] == [root]
+        assert len(slices['cross_mode_flows']) == 2
+        assert slices['high_significance'][0] is slices['mode_specific'][0]
+
+
+def test_boot_cache_warm_start():
+    """Unchanged boots reuse the cache; a new memory forces a reload"""
+    with fresh_memory_dir():
+        memory = OrganizationalMemory()
+        memory.create_memories([sample_memory("First")])
+
+        loader = MemoryLoader()
+        cold = loader.load_session_context()
+        warm = loader.load_session_context()
+        assert warm['timestamp'] == cold['timestamp']
+
+        memory.create_memories([sample_memory("Second")])
+        reloaded = loader.load_session_context()
+        assert reloaded['timestamp'] != cold['timestamp']
+        assert reloaded['total_memories'] == 2
+
+        assert loader.load_session_context(use_cache=False)['timestamp'] != reloaded['timestamp']
+
+
+def test_full_boot_warm_starts():
+    """The memory each boot records doesn't cost the next boot its cache"""
+    with fresh_memory_dir() as tmp:
+        home = os.environ.get('HOME')
+        os.environ['HOME'] = str(tmp)
+        try:
+            (tmp / "CURRENT_CONTEXT.md").write_text("# Current Context\n\nActive project: Studio-001\n")
+            OrganizationalMemory().create_memories([sample_memory("First")])
+            first = run_session_boot()
+            second = run_session_boot()
+        finally:
+            if home is None:
+                del os.environ['HOME']
+            else:
+                os.environ['HOME'] = home
+
+        assert second['timestamp'] == first['timestamp']
+        conn = OrganizationalMemory().db.connection()
+        assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 3
+
+        # Any other write still invalidates it
+        OrganizationalMemory().create_memories([sample_memory("Second")])
+        assert MemoryLoader().load_session_context()['timestamp'] != first['timestamp']
+
+
+def test_loader_migrates_baseline_database():
+    """A database never opened by a newer writer still boots with its memories"""
+    with fresh_memory_dir():
+        conn = sqlite3.connect("organizational_memory.db")
+        _create_tables(conn)
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT INTO memories (id, timestamp, version, entity_type, entity_name, entity_mode, "
+            "event_type, event_category, event_description, event_significance, session_id, project, memory_json) "
+            "VALUES (?, ?, '0.1.0', 'pompey', 'Pompey', 'CTO', 'decision', 'technical', ?, 'critical', 's', 'OS-001', ?)",
+            [(f"m{i}", now, f"Legacy call {i}", json.dumps({'content': {'insight': f"Lesson {i}"}}))
+             for i in range(3)]
+        )
+        conn.commit()
+
+        context = MemoryLoader().load_session_context(use_cache=False)
+        assert context['total_memories'] == 3
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+        assert {row[0] for row in conn.execute("SELECT insight FROM memories")} == {"Lesson 0", "Lesson 1", "Lesson 2"}
+        conn.close()
+
+
+def test_fts_migrations_replay_as_shipped():
+    """Migration 4 still builds the id-keyed index it shipped with; 7 replaces it"""
+    with fresh_memory_dir():
+        conn = sqlite3.connect("organizational_memory.db")
+        _create_tables(conn)
+        for version, steps in MIGRATIONS:
+            if version > 4:
+                break
+            for step in steps:
+                step(conn) if callable(step) else conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version}")
+        conn.execute(
+            "INSERT INTO memories (id, timestamp, version, entity_type, entity_name, entity_mode, "
+            "event_type, event_category, event_description, memory_json) "
+            "VALUES ('m1', ?, '0.1.0', 'pompey', 'Pompey', 'CTO', 'decision', 'technical', 'Legacy kiln notes', ?)",
+            (datetime.now().isoformat(), json.dumps({"id": "m1"}))
+        )
+        conn.commit()
+        columns = lambda: [row[1] for row in conn.execute("PRAGMA table_info(memories_fts)")]
+        assert columns()[0] == 'memory_id'
+
+        memory = OrganizationalMemory()
+        assert 'memory_id' not in columns()
+        assert [m['id'] for m in memory.search_memories("kiln")] == ['m1']
+        conn.close()
+
+
+def test_memory_graph_incremental():
+    """The graph artifact appends new rows and replays to the same state"""
+    with fresh_memory_dir() as tmp:
+        memory = OrganizationalMemory()
+        root, later = memory.new_memory_id(), memory.new_memory_id()
+        memory.create_memories([
+            sample_memory("Root", id=root),
+            # Points at a memory that does not exist yet
+            sample_memory("Design", mode="Creative_Director",
+                          connections={"influences": [later], "influenced_by": [root]}),
+        ])
+
+        graph = MemoryGraph()
+        assert graph.sync() == {'nodes': 2, 'edges': 2}
+        assert root in graph and later not in graph
+
+        memory.create_memories([sample_memory("Later", mode="CFO", id=later)])
+        assert graph.sync() == {'nodes': 1, 'edges': 0}
+        assert graph.sync() == {'nodes': 0, 'edges': 0}
+        assert later in graph and len(graph) == 3
+
+        # A fresh process replays the file and agrees with the live loader weights
+        replayed = MemoryGraph()
+        loader = MemoryLoader()
+        for row in memory.db.connection().execute("SELECT memory_json FROM memories"):
+            loaded = MemoryRecord.from_memory(json.loads(row[0]))
+            assert abs(replayed.weight(loaded.id) - loader._calculate_memory_weight(loaded)) < 1e-9
+        assert len(list(replayed.edges_between([root, later]))) == 0
+        assert len(list(replayed.edges_between(replayed.ids))) == 2
+
+        # Two stale instances syncing the same rows append them only once
+        memory.create_memories([sample_memory("Fourth", mode="CFO",
+                                              connections={"influences": [], "influenced_by": [later]})])
+        assert replayed.sync() == {'nodes': 1, 'edges': 1}
+        assert graph.sync() == {'nodes': 0, 'edges': 0}
+        assert len(graph) == len(replayed) == len(MemoryGraph()) == 4
+        assert len(list(MemoryGraph().edges_between(graph.ids))) == 3
+
+        # Deleted memories or edges force a rebuild
+        with memory.db.transaction() as conn:
+            conn.execute("DELETE FROM connections WHERE to_memory = ?", (later,))
+        replayed.sync()
+        assert len(list(replayed.edges_between(replayed.ids))) == 2
+        with memory.db.transaction() as conn:
+            conn.execute("DELETE FROM memories WHERE id = ?", (later,))
+        replayed.sync()
+        assert later not in replayed and replayed.memory_count == 3
+
+        # A torn append is dropped on load; a repeated block discards the file
+        path = tmp / "MEMORY_GRAPH.bin"
+        with open(path, 'ab') as f:
+            f.write(b'BLK2partial')
+        assert MemoryGraph().memory_count == 3
+        data = path.read_bytes()
+        path.write_bytes(data + data[16:])
+        assert len(MemoryGraph()) == 0 and not path.exists()
+        assert MemoryGraph().sync() == {'nodes': 3, 'edges': 2}
+
+
+class StaticKnowledgeIndexer:
+    """Knowledge index with one chunk - stands in for the ChromaDB-backed indexer"""
+
+    def get_index_stats(self):
+        return {'status': 'active', 'total_chunks': 1}
+
+    def query_knowledge(self, question, top_k=3, category_filter=None):
+        return [{'text': "Memories live in SQLite", 'source': "README.md", 'score': 0.1}]
+
+
+def test_query_telemetry_is_queued():
+    """query_knowledge hands telemetry to the background writer instead of writing it"""
+    if str(VECTOR_SEARCH_DIR) not in sys.path:
+        sys.path.insert(0, str(VECTOR_SEARCH_DIR))
+    import memory_integration
+
+    installed = memory_integration.KnowledgeIndexer
+    memory_integration.KnowledgeIndexer = StaticKnowledgeIndexer
+    try:
+        with fresh_memory_dir():
+            memory = memory_integration.EnhancedOrganizationalMemory()
+            count = lambda: memory.db.connection().execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+            start = time.perf_counter()
+            for i in range(20):
+                assert memory.query_knowledge(f"where do memories live {i}")[0]['source'] == "README.md"
+            assert time.perf_counter() - start < 1.0
+            assert count() == 0 and memory.query_log.get_stats()['submitted'] == 20
+
+            assert memory.flush_query_log(timeout=10)
+            stats = memory.query_log.get_stats()
+            assert stats['written'] == 20 and stats['failed'] == 0 and stats['batches'] == 1
+            assert count() == 20
+            assert memory.search_memories("where do memories live 7")[0]['content']['top_source'] == "README.md"
+            memory.query_log.close()
+    finally:
+        memory_integration.KnowledgeIndexer = installed
+
+
+def test_vectorized_scorer_matches_fallback():
+    """NumPy and pure-Python scoring agree, including custom weights and top-k"""
+    now = datetime(2025, 8, 10, 12, 0, 0)
+    timestamps = [(now - timedelta(hours=h)).isoformat() for h in (1, 30, 100, 5, 80, 23.9)]
+    codes = [0, 2, 1, -1, 2, 1]
+    degrees = [0, 3, 1, 4, 0, 2]
+    custom = {'connection': 0.5, 'recency': ((12, 2.0),)}
+
+    installed = memory_scoring.np
+    results = {}
+    try:
+        for label, module in (('numpy', installed), ('python', None)):
+            memory_scoring.np = module
+            results[label] = []
+            for weights in (None, custom):
+                scorer = MemoryScorer(weights)
+                scores = [float(x) for x in scorer.score_timestamps(timestamps, codes, degrees, now)]
+                results[label].append((scores, scorer.top_k(scores, 3)))
+    finally:
+        memory_scoring.np = installed
+
+    for (fast, fast_top), (slow, slow_top) in zip(results['numpy'], results['python']):
+        assert all(abs(a - b) < 1e-9 for a, b in zip(fast, slow))
+        assert fast_top == slow_top
+
+    default_scores, default_top = results['numpy'][0]
+    assert all(abs(a - b) < 1e-9 for a, b in zip(
+        default_scores, [1.5, 3.0 * 1.3 * 1.2, 2.0 * 1.1, 0.0, 3.0, 2.0 * 1.2 * 1.5]))
+    assert default_top == [1, 5, 4]
+
+
+def test_scorer_merges_nested_weights():
+    """A partial significance table overrides only the levels it names"""
+    scorer = MemoryScorer({'significance': {'critical': 5.0}})
+    assert scorer.significance_table == [1.0, 2.0, 5.0]
+    assert scorer.recency == DEFAULT_WEIGHTS['recency'] and scorer.connection == 0.1
+    assert DEFAULT_WEIGHTS['significance']['critical'] == 3.0
+
+
+if __name__ == "__main__":
+    print("🧪 Memory store tests")
+    test_connection_per_thread()
+    print("  ✓ One connection per thread")
+    test_connection_pragmas_applied()
+    print("  ✓ Connection pragmas applied")
+    test_nested_transaction_savepoints()
+    print("  ✓ Nested transactions roll back only their own scope")
+    test_create_memories_bulk()
+    print("  ✓ Bulk ingestion")
+    test_create_memories_is_atomic()
+    print("  ✓ Batch validation is atomic")
+    test_compiled_validator_matches_jsonschema()
+    print("  ✓ Compiled validator matches jsonschema")
+    test_metrics_counters_follow_writes()
+    print("  ✓ Metrics counters follow writes")
+    test_search_memories_full_text()
+    print("  ✓ Full-text memory search")
+    test_graph_traversal()
+    print("  ✓ Graph traversal")
+    test_graph_traversal_dense_and_cyclic()
+    print("  ✓ Dense and cyclic graph traversal")
+    test_graph_traversal_mixed_id_schemes()
+    print("  ✓ Mixed ID schemes traverse in timestamp order")
+    test_boot_slices_single_query()
+    print("  ✓ Boot slices in one query")
+    test_boot_cache_warm_start()
+    print("  ✓ Warm start from boot cache")
+    test_full_boot_warm_starts()
+    print("  ✓ Full boots warm start")
+    test_loader_migrates_baseline_database()
+    print("  ✓ Loader migrates a baseline database")
+    test_fts_migrations_replay_as_shipped()
+    print("  ✓ FTS migrations replay as shipped")
+    test_memory_graph_incremental()
+    print("  ✓ Incremental memory graph")
+    test_query_telemetry_is_queued()
+    print("  ✓ Query telemetry is queued")
+    test_vectorized_scorer_matches_fallback()
+    print("  ✓ Vectorized scorer matches fallback")
+    test_scorer_merges_nested_weights()
+    print("  ✓ Nested scorer weights merge one level deep")
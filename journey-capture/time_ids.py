@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Time-Ordered IDs - UUIDv7 identifiers for journeys and memories
+IDs sort by creation time, so inserts append to the primary key index
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+# 12-bit counter (rand_a) orders IDs minted within the same millisecond
+COUNTER_MAX = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def _pack(ms: int, counter: int) -> str:
+    rand_b = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    value = ((ms & ((1 << 48) - 1)) << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+def uuid7() -> str:
+    """New UUIDv7, strictly increasing within this process
+
+    Within one millisecond the counter is incremented from a random start;
+    if it runs out the timestamp borrows the next millisecond.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # Leave headroom in the counter for a burst
+            _counter = int.from_bytes(os.urandom(2), 'big') & (COUNTER_MAX >> 1)
+        else:
+            ms = _last_ms
+            _counter += 1
+            if _counter > COUNTER_MAX:
+                ms += 1
+                _counter = 0
+        _last_ms = ms
+        counter = _counter
+    return _pack(ms, counter)
+
+
+def uuid7_at(moment: datetime) -> str:
+    """UUIDv7 for an earlier moment - used to re-key legacy rows in time order"""
+    ms = int(moment.timestamp() * 1000)
+    return _pack(ms, int.from_bytes(os.urandom(2), 'big') & COUNTER_MAX)
+
+
+def uuid7_datetime(value: str) -> Optional[datetime]:
+    """Creation time encoded in a UUIDv7, or None for any other ID"""
+    try:
+        parsed = uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if parsed.version != 7:
+        return None
+    return datetime.fromtimestamp((parsed.int >> 80) / 1000)
@@ -14,6 +14,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent / "journey-capture"))
 
 from knowledge_indexer import KnowledgeIndexer
 from internal_memory import OrganizationalMemory
+from background_writer import BackgroundBatchWriter
 
 
 class EnhancedOrganizationalMemory(OrganizationalMemory):
@@ -22,10 +23,23 @@ class EnhancedOrganizationalMemory(OrganizationalMemory):
     Inherits from OS-002 and adds OS-002.1 features
     """
     
-    def __init__(self):
+    def __init__(self, query_log_sample_rate: float = 1.0,
+                 query_log_max_queue: int = 1000,
+                 query_log_overflow: str = 'drop'):
         """Initialize with both memory and knowledge systems"""
         super().__init__()
         
+        # Query telemetry is buffered and written in batches off the read path
+        self.query_log = BackgroundBatchWriter(
+            self._write_query_log,
+            batch_size=50,
+            flush_interval=2.0,
+            max_queue=query_log_max_queue,
+            sample_rate=query_log_sample_rate,
+            overflow=query_log_overflow,
+            name='query-telemetry'
+        )
+        
         # Initialize knowledge indexer
         self.knowledge_indexer = KnowledgeIndexer()
         
@@ -82,29 +96,39 @@ class EnhancedOrganizationalMemory(OrganizationalMemory):
             category_filter=category_filter
         )
         
-        # Log the query as a memory event
+        # Queue the query for the background telemetry writer
         if results:
-            self.create_memory(
-                entity={
-                    "type": "assistant",
+            self.query_log.submit({
+                'entity': {
+                    "type": "specialist",
                     "name": "claude",
                     "mode": self._get_current_mode()
                 },
-                event={
-                    "type": "knowledge_query",
-                    "category": "retrieval",
+                'event': {
+                    "type": "observation",
+                    "category": "operational",
                     "description": f"Successfully retrieved {len(results)} results for: {question}",
                     "significance": "routine"
                 },
-                content={
+                'content': {
                     "query": question,
                     "result_count": len(results),
-                    "top_source": results[0]['source'] if results else None
-                }
-            )
+                    "top_source": results[0]['source']
+                },
+                'context': {},
+                'metadata': {"tags": ["knowledge_query"]}
+            })
             
         return results
         
+    def _write_query_log(self, batch: List[Dict[str, Any]]):
+        """Persist a batch of queued query telemetry records"""
+        self.create_memories(batch)
+            
+    def flush_query_log(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued query telemetry has been written"""
+        return self.query_log.flush(timeout)
+        
     def _get_current_mode(self) -> str:
         """Get current department mode from context"""
         # This would be enhanced to read from CURRENT_CONTEXT.md
@@ -145,9 +169,10 @@ class EnhancedOrganizationalMemory(OrganizationalMemory):
         # Get semantic results from knowledge base
         knowledge_results = self.query_knowledge(query, top_k=top_k)
         
-        # Get relevant memories from SQL queries
+        # Get relevant memories from the full-text memory index
         # This could be enhanced to use embeddings for memories too
         memory_results = self.search_memories(
+            query,
             entity_name=None,
             event_type=None,
             time_range=None,
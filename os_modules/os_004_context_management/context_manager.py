@@ -22,6 +22,8 @@ class ContextManager:
     
     # Token estimation (rough approximation)
     CHARS_PER_TOKEN = 4  # Conservative estimate
+    CODE_CHARS_PER_TOKEN = 3.5
+    CODE_PATTERN = re.compile(r'```|def |class |import |function |const |let |var ')
     
     def __init__(self, member_name: str):
         """Initialize context manager for a triumvirate member"""
@@ -49,20 +51,18 @@ class ContextManager:
         # Initialize from saved state if exists
         self._load_state()
     
-    def estimate_tokens(self, text: str) -> int:
-        """Estimate token count from text"""
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Estimate token count from text - usable without an instance"""
         if not text:
             return 0
         
         # More accurate estimation based on content type
         # Code tends to have more tokens per character
-        code_patterns = r'```|def |class |import |function |const |let |var '
-        is_code_heavy = bool(re.search(code_patterns, text))
-        
-        if is_code_heavy:
-            chars_per_token = 3.5
+        if cls.CODE_PATTERN.search(text):
+            chars_per_token = cls.CODE_CHARS_PER_TOKEN
         else:
-            chars_per_token = self.CHARS_PER_TOKEN
+            chars_per_token = cls.CHARS_PER_TOKEN
             
         return int(len(text) / chars_per_token)
     